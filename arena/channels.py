@@ -0,0 +1,131 @@
+'''Where a game's conversation with the player goes: the terminal, a script, a socket or nowhere.
+
+The games talk to the player through a conversation (see dukedom.terminal()), a generator that yields each
+line to show and a Prompt for each line the player types. hold() holds a conversation over a channel, which is
+anything with a write(line) method for the lines and a read(msg) method that shows msg and returns the line the
+player types, without its newline, raising EOFError if there are no more:
+
+    >>> script = channels.Script(['0', '0', '-1'])
+    >>> channels.hold(hammurabi.conversation(random.Random(1)), script)
+    >>> print(script.transcript())
+    Try your hand at governing ancient Sumeria
+    ...
+    Land is trading at 19 bushels per acre.
+    How many acres do you wish to buy (0-147)? 0
+    How many acres do you wish to sell (0-1000)? 0
+    How many bushels do you wish to feed your people (0-2800)? -1
+
+    Hammurabi: I cannot do what you wish.
+    Get yourself another steward!!!
+
+- Stdin is the terminal, as each game's own terminal() is.
+- Script answers from a list of lines, and keeps a transcript of the conversation as it would look at the
+  terminal, with the answers echoed.
+- Null answers from a list of lines and throws the output away, for playing scripts as fast as they'll go.
+- Socket is a connected socket, a line at a time (for one player at a time; arena/server.py holds many).
+
+hold() takes a turn() at a time, running the conversation on to its next prompt, as the server does when each of
+its players answers.
+'''
+
+import tournament  # Puts the games on the path.
+
+import dukedom
+import hammurabi
+import wumpus
+
+
+# The conversation for each game, given the random number generator.
+GAMES = {
+    'dukedom':   lambda rng: dukedom.session(False, rng),
+    'hammurabi': hammurabi.conversation,
+    'wumpus':    wumpus.conversation}
+
+
+def hold(conversation, channel):
+    """Hold a conversation over a channel, until it ends (or raises, as Dukedom's do with EndGame)."""
+    msg = turn(conversation, None, channel.write)
+    while msg is not None:
+        msg = turn(conversation, channel.read(msg), channel.write)
+
+
+def turn(conversation, line, write):
+    """Send line (the player's answer to the last prompt, or None to start) to a conversation, and run it on to
+    its next prompt, passing each line it shows to write. Returns the prompt's msg, or None if the conversation
+    ends."""
+    while True:
+        try:
+            x = conversation.send(line)
+        except StopIteration:
+            return None
+        if type(x) is str:
+            write(x)
+            line = None
+        else:
+            return x.msg
+
+
+class Stdin:
+
+    def read(self, msg):
+        return input(msg)
+
+    def write(self, line):
+        print(line)
+
+
+class Script:
+
+    """Answers from lines (any iterable of strings), keeping a transcript."""
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.out   = []
+
+    def read(self, msg):
+        self.out.append(msg)
+        line = next(self.lines, None)
+        if line is None:
+            raise EOFError
+        self.out.append(line + '\n')
+        return line
+
+    def write(self, line):
+        self.out.append(line + '\n')
+
+    def transcript(self):
+        """What the terminal would show: the output, the prompts and the answers."""
+        return ''.join(self.out)
+
+
+class Null:
+
+    """Answers from lines, and shows nothing."""
+    def __init__(self, lines):
+        self.lines = iter(lines)
+
+    def read(self, msg):
+        line = next(self.lines, None)
+        if line is None:
+            raise EOFError
+        return line
+
+    def write(self, line):
+        pass
+
+
+class Socket:
+
+    """A connected socket (which the channel doesn't close), talking UTF-8 a line at a time."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.file = sock.makefile('rb')
+
+    def read(self, msg):
+        self.sock.sendall(msg.encode())
+        line = self.file.readline()
+        if not line.endswith(b'\n'):
+            raise EOFError
+        return line.decode(errors='replace').rstrip('\r\n')
+
+    def write(self, line):
+        self.sock.sendall(line.encode() + b'\n')
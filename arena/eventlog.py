@@ -0,0 +1,130 @@
+'''An append-only binary log of what happens in games, for audits, analytics and replays.
+
+A log is a stream of records, each a tuple whose first item names the kind of record, and whose other items
+are ints, floats, strings, bytes, booleans, None or tuples of them. The games write their records to anything
+with a write(record) method, such as a Writer, and read() streams them back:
+
+    >>> with eventlog.Writer('games.log') as log:
+    ...     while True:
+    ...         dukedom.step(game, policy(game), log=log)
+    >>> for record in eventlog.read('games.log'):
+    ...     print(record[:4])
+    ('dukedom start', (100, 4177, 600, 0, 3.95, 0, 0, 0, 0, (216, 200, 184, 0, 0, 0), b'`\x00...'))
+    ('dukedom year', 1, (('food', 14), ('buy', 0), ('sell', 0), ('plant', 400)), ((1, 5), (2, 9), (3, 7), ...))
+
+The records the games write are:
+
+- 'dukedom start', from dukedom.step() and dukedom() before the first year: the GameState.snapshot().
+- 'dukedom year', for each year: the year, the (question, answer) pairs, the (curve, value) draws, the
+  (event, args) pairs, the figures of the report (as the bytes of an array('q')), and the reason the game
+  ended. The figures are None if the game ended during the year, and the reason None if it didn't. Playing
+  the answers with the draws from the start gives the same game again, draw for draw. To a brief log (one
+  whose brief attribute is true, such as Writer(path, brief=True)) dukedom.step() writes only what it takes to
+  play the year again with the game's own distributions, made the way they were for the game (as from its
+  seed): the values of the Decisions, in the order of its arguments, in place of the answers, and None for the
+  draws, the events and the figures.
+- 'wumpus start', from WumpusEnv.reset(): the rooms of the wumpus, the hunter, the bats and the pits.
+- 'wumpus step', from WumpusEnv.step(): the action ('move' or 'shoot') and its rooms, the events, the rooms
+  of the hunter and the wumpus after it, the arrows left and the reward.
+- 'hammurabi year', from hammurabi.next_year(): the City before, the decisions (buy, sell, feed, plant), the
+  draws (yield, rats, births and plague, which is None if the people impeached you) and the City after.
+
+Format
+------
+A log file starts with MAGIC, followed by blocks, each a 4-byte little-endian length and then that many bytes
+of zlib-compressed data: a list of records serialised by marshal (format version 4). A Writer keeps records in
+memory until it has a block of them, so writing one is appending it to a list, and the serialising and
+compressing is done in C a block at a time. Blocks are only ever added to the end, so a log can be opened
+again to add to it, and read while it's being written up to the last whole block. Read only logs you trust:
+like marshal, read() isn't meant for data made to attack it.
+
+Cost
+----
+A headless year of Dukedom (step() with test_tournament.steady) takes about 35us. On one core, a Writer adds
+about 8% to it on the game's thread and 22% all told, with the serialising and compressing; a brief Writer
+adds under 5% all told, which is what it's for. With a second core, zlib runs beside the game.
+'''
+
+import concurrent.futures
+import marshal
+import struct
+import zlib
+
+
+MAGIC = b'GAMELOG\x01'
+BLOCK = 1024  # Records
+LEVEL = 1     # Of zlib compression, the fastest
+
+_LENGTH = struct.Struct('<I')
+
+
+class Writer:
+
+    """Appends records to the log at path, a block at a time. The blocks are serialised, compressed and written
+    by a thread of their own, so that the game goes on meanwhile (zlib lets go of the GIL as it compresses).
+    flush() writes the records so far as a block of their own and waits for them to be written, and close()
+    flushes. An error writing a block is raised by the first write() to start a block once it's happened, or by
+    flush(). brief asks the games for brief records (see above)."""
+    def __init__(self, path, block=BLOCK, level=LEVEL, brief=False):
+        self.file    = open(path, 'ab')
+        self.block   = block
+        self.level   = level
+        self.brief   = brief
+        self.records = []
+        self._thread = concurrent.futures.ThreadPoolExecutor(1)
+        self._blocks = [] # Being written
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def write(self, record):
+        self.records.append(record)
+        if len(self.records) >= self.block:
+            self._submit()
+
+    def flush(self):
+        self._submit()
+        blocks, self._blocks = self._blocks, []
+        for future in blocks:
+            future.result()
+        self.file.flush()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._thread.shutdown()
+            self.file.close()
+
+    def _submit(self):
+        if self.records:
+            self._blocks.append(self._thread.submit(self._write_block, self.records))
+            self.records = []
+        # The blocks are written in turn, so those done come first; raise what went wrong with any of them.
+        while self._blocks and self._blocks[0].done():
+            self._blocks.pop(0).result()
+
+    def _write_block(self, records):
+        data = zlib.compress(marshal.dumps(records, 4), self.level)
+        self.file.write(_LENGTH.pack(len(data)) + data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read(path):
+    """The records in the log at path, in the order they were written, read a block at a time."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} isn\'t a game log'.format(path))
+        while True:
+            header = f.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            size, = _LENGTH.unpack(header)
+            data = f.read(size)
+            if len(data) < size:
+                return # The block still being written
+            yield from marshal.loads(zlib.decompress(data))
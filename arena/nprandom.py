@@ -0,0 +1,88 @@
+'''A drop-in for random.Random that draws its numbers in blocks from a NumPy Generator.
+
+The games take their random numbers from any object with the methods of random.Random they use (random, gauss,
+randint, randrange, choice and shuffle, and getstate and setstate for snapshots), so each game can have its own
+generator, and many games can be played in one process without sharing the state of the random module.
+NumpyRandom is such an object, backed by numpy.random.Generator. Drawing a single number from a Generator costs
+more than from random.Random, so it draws a block of uniform and of normal numbers at a time, and hands them out
+one by one. The blocks start small, since a game may only need a few dozen numbers, and double in size each time
+they run out:
+
+    >>> rng = NumpyRandom(7)
+    >>> game = dukedom.GameState(rng=rng)
+    >>> env = wumpus.WumpusEnv(rng=NumpyRandom(8))
+
+The same seed always gives the same numbers, but not the same numbers as random.Random with that seed.
+Integers are drawn by scaling a uniform number, which is biased by less than one part in 2**40 for the ranges
+the games use.
+'''
+
+import numpy as np
+
+
+FIRST_BLOCK = 64
+BLOCK = 4096
+
+
+class NumpyRandom:
+
+    """The subset of random.Random used by the games, drawing from numpy.random.default_rng(seed)."""
+    def __init__(self, seed=None, block=BLOCK):
+        self.generator = np.random.default_rng(seed)
+        self.block = block
+        self._uniform = iter(())
+        self._normal  = iter(())
+        self._sizes   = {'random': min(FIRST_BLOCK, block), 'standard_normal': min(FIRST_BLOCK, block)}
+
+    def random(self):
+        try:
+            return next(self._uniform)
+        except StopIteration:
+            self._uniform = self._draw('random')
+            return next(self._uniform)
+
+    def gauss(self, mu=0.0, sigma=1.0):
+        try:
+            z = next(self._normal)
+        except StopIteration:
+            self._normal = self._draw('standard_normal')
+            z = next(self._normal)
+        return mu + sigma * z
+
+    def randrange(self, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        if stop <= start:
+            raise ValueError('empty range for randrange() ({}, {})'.format(start, stop))
+        return start + int(self.random() * (stop - start))
+
+    def randint(self, a, b):
+        return self.randrange(a, b + 1)
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError('Cannot choose from an empty sequence')
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, x):
+        # Fisher-Yates, as random.shuffle does it.
+        for i in reversed(range(1, len(x))):
+            j = int(self.random() * (i + 1))
+            x[i], x[j] = x[j], x[i]
+
+    def getstate(self):
+        """The state of the generator, with the numbers left over from the last blocks, for setstate()."""
+        uniform, normal = tuple(self._uniform), tuple(self._normal)
+        self._uniform, self._normal = iter(uniform), iter(normal)
+        return self.generator.bit_generator.state, uniform, normal, dict(self._sizes)
+
+    def setstate(self, state):
+        generator, uniform, normal, sizes = state
+        self.generator.bit_generator.state = generator
+        self._uniform, self._normal = iter(uniform), iter(normal)
+        self._sizes = dict(sizes)
+
+    def _draw(self, method):
+        size = self._sizes[method]
+        self._sizes[method] = min(2 * size, self.block)
+        return iter(getattr(self.generator, method)(size).tolist())
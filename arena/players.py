@@ -0,0 +1,278 @@
+'''Players for the three games, which make the player's decisions one at a time, and head-to-head matches
+between them.
+
+A player is anything with an answer(state, question) method. Each game's headless loop calls it at every
+decision point with the state as the player would see it and the Question (a namedtuple whose name is the
+decision and args are whatever the prompt shows), and carries on with its answer:
+
+- dukedom.play(game, player):   the GameState, and dukedom.Question 'food', 'buy' or 'sell' (at a price), 'plant',
+                                'mercs', or the yes/no questions 'pay_tax', 'supply_levy' and 'attack_first'.
+- hammurabi.play(player, rng):  the hammurabi.City, and hammurabi.Question 'buy' or 'sell' (at a price), 'feed'
+                                or 'plant'.
+- wumpus.play(player, rng):     the wumpus.Observation, and wumpus.Question 'action' (with the events of the
+                                last action), answered with a Move or a Shoot.
+
+An answer that isn't allowed ends the game (with the outcome 'invalid decision', or for Wumpus 'invalid
+action'); the games don't ask again as they do at the terminal. advisor.Plan is a Dukedom player too.
+
+Each game has three baselines, a class of each that's made with a random.Random for each game:
+
+- random: any answer that's allowed, chosen uniformly.
+- greedy: the most for this year or this move - for Dukedom the most grain, for Hammurabi the most land, and
+  for Wumpus a shot as soon as the wumpus can be smelled.
+- rules:  a rule of thumb - trading land on its price, resting poor land, or keeping to the rooms known to be
+  safe.
+
+match() plays players head to head in the same seeded games, with tournament.py (which plays players as well
+as its own policies), and counts the decisions each made and the time spent in play:
+
+    >>> match('hammurabi', BASELINES['hammurabi'], games=1000)
+    {'random': Standing(outcomes=Counter({'national fink': 1000}), decisions=..., seconds=...), ...}
+
+    $ python3 arena/players.py hammurabi --games 10000
+    player        decisions/s  outcomes
+    random            179,477  national fink 100.0%
+    greedy            318,887  national fink 96.5%, fantastic 3.2%, not too bad 0.2%, hated 0.1%
+    rules             382,966  national fink 68.7%, hated 16.5%, fantastic 8.2%, not too bad 6.6%
+
+Wumpus runs at 110,000 to 180,000 decisions a second, and Dukedom at 45,000 to 100,000, where playing out the year
+takes most of the time.
+'''
+
+import argparse
+
+import tournament  # Puts the games on the path.
+
+import wumpus
+
+
+class RandomDuke:
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def answer(self, game, question):
+        if not question.valid:
+            return self.rng.random() < 0.5
+        return self.rng.randint(0, _most(game, question))
+
+
+class GreedyDuke:
+
+    """Feeds the peasants just enough not to starve, never trades land, plants all it can, and never spends
+    grain it could keep: refusing the King's doubled tax, supplying his levy with peasants, and hiring no
+    mercenaries."""
+    def __init__(self, rng):
+        pass
+
+    def answer(self, game, question):
+        name = question.name
+        if name == 'food':
+            return min(13, game.grain // game.peasants)
+        if name == 'plant':
+            return _most(game, question)
+        if name == 'supply_levy':
+            return True
+        if name == 'pay_tax' or name == 'attack_first':
+            return False
+        return 0
+
+
+class SteadyDuke:
+
+    """Feeds the peasants a little more than they need, buys a tenth more land when it's cheap for the yield
+    and sells a tenth when it's dear, plants only the good land, and hires 40 mercenaries for a war."""
+    def __init__(self, rng):
+        pass
+
+    def answer(self, game, question):
+        name = question.name
+        if name == 'food':
+            return min(14, game.grain // game.peasants)
+        if name == 'buy':
+            # The price is usually about twice last year's yield, plus one.
+            if question.args[0] > 2 * game.crop_yield:
+                return 0
+            return min(game.land // 10, max(0, game.grain - 2 * game.land) // max(1, question.args[0] + 2))
+        if name == 'sell':
+            if question.args[0] < 2 * game.crop_yield + 3:
+                return 0
+            return min(game.land // 10, _most(game, question))
+        if name == 'plant':
+            return min(game.buckets.good(), _most(game, question))
+        if name == 'mercs':
+            return 40
+        return name != 'attack_first'
+
+
+def _most(game, question):
+    """The most that can be answered to a Dukedom question with a number."""
+    name = question.name
+    if name == 'food':
+        return min(100, game.grain // game.peasants)
+    if name == 'buy':
+        bid = question.args[0]
+        return game.grain // bid if bid > 0 else game.land
+    if name == 'sell':
+        offer = question.args[0]
+        return min(game.buckets.good(), 4000 // offer) if offer > 0 else game.buckets.good()
+    if name == 'plant':
+        return max(0, min(game.land, game.grain // 2, 4 * game.peasants))
+    return 75 # Mercenaries
+
+
+class RandomSteward:
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def answer(self, city, question):
+        name = question.name
+        if name == 'buy':
+            return self.rng.randint(0, city.grain // city.price)
+        if name == 'sell':
+            return self.rng.randint(0, city.acres)
+        if name == 'feed':
+            return self.rng.randint(0, city.grain)
+        return self.rng.randint(0, _plantable(city))
+
+
+class GreedySteward:
+
+    """Feeds everyone, and spends the rest of the grain on land, keeping the seed for what can be planted."""
+    def __init__(self, rng):
+        pass
+
+    def answer(self, city, question):
+        name = question.name
+        if name == 'buy':
+            seed = (min(city.acres, 10 * city.pop) + 1) // 2
+            return max(0, (city.grain - 20 * city.pop - seed) // city.price)
+        if name == 'sell':
+            return 0
+        if name == 'feed':
+            return min(20 * city.pop, city.grain)
+        return _plantable(city)
+
+
+class TradingSteward:
+
+    """Feeds everyone and plants all it can, buying land when it's cheap (19 or less) and selling what's over
+    ten acres a person when it's dear (25 or more)."""
+    def __init__(self, rng):
+        pass
+
+    def answer(self, city, question):
+        name = question.name
+        if name == 'buy':
+            if city.price > 19:
+                return 0
+            seed = (min(city.acres, 10 * city.pop) + 1) // 2
+            return max(0, min(10 * city.pop - city.acres, (city.grain - 20 * city.pop - seed) // city.price))
+        if name == 'sell':
+            return max(0, city.acres - 10 * city.pop) if city.price >= 25 else 0
+        if name == 'feed':
+            return min(20 * city.pop, city.grain)
+        return _plantable(city)
+
+
+def _plantable(city):
+    return min(city.acres, 2 * city.grain, 10 * city.pop)
+
+
+class RandomHunter:
+
+    """Moves through a tunnel three times out of four, otherwise shoots an arrow along a path of 1 to 5 rooms,
+    chosen at random (but not crooked)."""
+    def __init__(self, rng):
+        self.rng = rng
+
+    def answer(self, observation, question):
+        rng = self.rng
+        if rng.random() < 0.75:
+            return wumpus.Move(rng.choice(observation.tunnels))
+        path = []
+        for _ in range(rng.randint(1, 5)):
+            room = rng.randint(1, 20)
+            while wumpus.crooked(observation.room, path, room):
+                room = rng.randint(1, 20)
+            path.append(room)
+        return wumpus.Shoot(path)
+
+
+class GreedyHunter:
+
+    """Shoots into a room next door as soon as it smells the wumpus, and otherwise wanders."""
+    def __init__(self, rng):
+        self.rng = rng
+
+    def answer(self, observation, question):
+        if observation.wumpus:
+            return wumpus.Shoot([self.rng.choice(observation.tunnels)])
+        return wumpus.Move(self.rng.choice(observation.tunnels))
+
+
+class CautiousHunter:
+
+    """Keeps to the rooms known to be free of bats and pits (those it has been in, and those next to a room where
+    it felt no draught and heard no bats), going somewhere new when it can. When it smells the wumpus it shoots
+    into each room next door in turn, unless it has been there. With nowhere new that's safe, it takes its
+    chances on any room one move in RISK, rather than wander the safe rooms for ever."""
+    RISK = 0.02
+
+    def __init__(self, rng):
+        self.rng     = rng
+        self.visited = 0
+        self.safe    = 0
+        self.shot    = 0
+
+    def answer(self, observation, question):
+        here = 1 << observation.room
+        self.visited |= here
+        self.safe    |= here
+        if not observation.bats and not observation.pits:
+            self.safe |= wumpus.TUNNELS[observation.room]
+        if observation.wumpus:
+            rooms = [room for room in observation.tunnels if not (self.visited | self.shot) & (1 << room)]
+            if rooms:
+                room = self.rng.choice(rooms)
+                self.shot |= 1 << room
+                return wumpus.Shoot([room])
+        # The wumpus has moved on, or moves after a shot, so any room may hide it again.
+        self.shot = 0
+        rooms = [room for room in observation.tunnels if self.safe & ~self.visited & (1 << room)]
+        if not rooms and self.rng.random() >= self.RISK:
+            rooms = [room for room in observation.tunnels if self.safe & (1 << room)]
+        return wumpus.Move(self.rng.choice(rooms or observation.tunnels))
+
+
+BASELINES = {
+    'dukedom':   {'random': RandomDuke,    'greedy': GreedyDuke,    'rules': SteadyDuke},
+    'hammurabi': {'random': RandomSteward, 'greedy': GreedySteward, 'rules': TradingSteward},
+    'wumpus':    {'random': RandomHunter,  'greedy': GreedyHunter,  'rules': CautiousHunter}}
+
+
+def match(game, players, games, seed=0, processes=1):
+    """Play each of players (a dict of classes of player by name, as BASELINES has, one of which is made with a
+    random.Random for each game) in the same games, returning the Standing of each by name. The games are
+    played as tournament.run() plays them with the same seed, in this process unless processes says otherwise."""
+    return {name: tournament.standing(game, player, games, seed, processes) for name, player in players.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play the baseline players head to head.')
+    parser.add_argument('game', choices=sorted(BASELINES))
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=1)
+    args = parser.parse_args()
+
+    print('{:<12}{:>13}  {}'.format('player', 'decisions/s', 'outcomes'))
+    for name, standing in match(args.game, BASELINES[args.game], args.games, args.seed, args.processes).items():
+        outcomes = ', '.join('{} {:.1%}'.format(outcome, count / args.games)
+                             for outcome, count in standing.outcomes.most_common())
+        print('{:<12}{:>13,.0f}  {}'.format(name, standing.decisions / standing.seconds, outcomes))
+
+
+if __name__ == '__main__':
+    main()
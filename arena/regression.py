@@ -0,0 +1,151 @@
+'''Play recorded input scripts through the games across a pool of processes, checking them against golden
+transcripts.
+
+A case is a JSON object: the game (a name in channels.GAMES), the seed of its random number generator (a
+random.Random), the lines the player typed, and optionally the transcript the game should show for them (the
+output, prompts and answers, as at the terminal) and how it should end:
+
+    {"game": "hammurabi", "seed": 1, "input": ["0", "0", "-1"], "transcript": "Try your hand at...", "ending": null}
+
+The ending is null if the game ended of its own accord, "EOFError" if the input ran out first, or the name of
+the exception the game raised (such as Dukedom's ZeroDivisionError). Cases come a line each from a JSONL file,
+or a file each from a directory of .json files. Each game is played with a channels.Script, which keeps the
+transcript as a list of strings, so playing a case costs little more than the game itself:
+
+    $ python3 arena/regression.py cases.jsonl
+    3000 games in 1.8s: 1638 games/s, latency p50 0.2ms p99 2.7ms
+    1 diverged:
+      cases.jsonl:17: line 27, expected 'So long for' but got 'So long for now.'
+
+With --record, the cases are written out again with the transcripts and endings they have now, to make goldens
+of (after checking them).
+'''
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import channels
+
+
+# The outcome of playing a case: where it came from, the seconds it took, how it diverged from its golden
+# transcript (None if it didn't, or had none), and the transcript and ending if they were asked for.
+Result = collections.namedtuple('Result', ['name', 'seconds', 'divergence', 'transcript', 'ending'])
+
+
+def load(path):
+    """The (name, case) of each case in a JSONL file or a directory of JSON files."""
+    if os.path.isdir(path):
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith('.json'):
+                with open(os.path.join(path, filename)) as f:
+                    yield filename, json.load(f)
+        return
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                yield '{}:{}'.format(os.path.basename(path), number), json.loads(line)
+
+
+def play(case):
+    """Play a case, returning its transcript, its ending and the seconds it took."""
+    script = channels.Script(case['input'])
+    start  = time.perf_counter()
+    ending = None
+    try:
+        channels.hold(channels.GAMES[case['game']](random.Random(case['seed'])), script)
+    except Exception as e:
+        ending = type(e).__name__
+    seconds = time.perf_counter() - start
+    return script.transcript(), ending, seconds
+
+
+def divergence(case, transcript, ending):
+    """How a transcript and ending differ from the case's golden ones, or None if they don't (or it has none)."""
+    if 'transcript' not in case:
+        return None
+    if transcript != case['transcript']:
+        expected, got = case['transcript'].split('\n'), transcript.split('\n')
+        for number, (a, b) in enumerate(zip(expected + [None], got + [None]), 1):
+            if a != b:
+                return 'line {}, expected {!r} but got {!r}'.format(number, a, b)
+    if ending != case.get('ending'):
+        return 'expected the game to end with {} but it ended with {}'.format(case.get('ending'), ending)
+    return None
+
+
+def run(cases, processes=None, chunk=100, record=False):
+    """Play (name, case) pairs, yielding the Result of each as its chunk is finished. processes is the size of
+    the pool (all the cores by default, 1 to play in this process). With record, the Results keep the
+    transcripts and endings."""
+    chunks, cases = [], list(cases)
+    for start in range(0, len(cases), chunk):
+        chunks.append((cases[start:start + chunk], record))
+    if processes == 1:
+        for job in chunks:
+            yield from _play_chunk(job)
+        return
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        for future in concurrent.futures.as_completed([pool.submit(_play_chunk, job) for job in chunks]):
+            yield from future.result()
+
+
+def _play_chunk(job):
+    cases, record = job
+    results = []
+    for name, case in cases:
+        transcript, ending, seconds = play(case)
+        result = Result(name, seconds, divergence(case, transcript, ending), transcript, ending)
+        results.append(result if record else result._replace(transcript=None, ending=None))
+    return results
+
+
+def summary(results, seconds):
+    """The games a second and the median and 99th percentile of the time a game took, as a line of text."""
+    latencies = sorted(result.seconds for result in results)
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p99 = percentiles[49], percentiles[98]
+    else:
+        p50 = p99 = sum(latencies)
+    return '{} games in {:.1f}s: {:.0f} games/s, latency p50 {:.1f}ms p99 {:.1f}ms'.format(
+        len(latencies), seconds, len(latencies) / seconds if seconds else 0, p50 * 1000, p99 * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play input scripts through the games, checking the transcripts.')
+    parser.add_argument('cases', help='a JSONL file of cases, or a directory of JSON files')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk', type=int, default=100)
+    parser.add_argument('--record', metavar='JSONL', help='write the cases with their transcripts now to JSONL')
+    args = parser.parse_args()
+
+    cases = list(load(args.cases))
+    start = time.perf_counter()
+    results = list(run(cases, args.processes, args.chunk, args.record is not None))
+    print(summary(results, time.perf_counter() - start))
+
+    order = {name: i for i, (name, _) in enumerate(cases)}
+    diverged = sorted((r for r in results if r.divergence), key=lambda r: order[r.name])
+    if diverged:
+        print('{} diverged:'.format(len(diverged)))
+        for result in diverged:
+            print('  {}: {}'.format(result.name, result.divergence))
+
+    if args.record:
+        transcripts = {r.name: r for r in results}
+        with open(args.record, 'w') as f:
+            for name, case in cases:
+                case = dict(case, transcript=transcripts[name].transcript, ending=transcripts[name].ending)
+                f.write(json.dumps(case) + '\n')
+    sys.exit(1 if diverged else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+'''Replay recorded games of Dukedom, and put them in the state they were in after any year.
+
+A game is replayed from its start and its decisions for each year, taking the draws either from the draws
+recorded with it in an event log (see eventlog.py), or from the game's own distributions, started in the state
+they were in at the start of the game (as when the game's seed is known):
+
+    >>> replays = list(replay.from_log(eventlog.read('games.log')))
+    >>> game = replays[3].seek(20)
+    >>> game.year, game.peasants, game.grain, game.report['Births']
+    (20, 121, 4249, 9)
+
+    >>> played = replay.Replay(start, decisions, distributions=dukedom.Gaussian(random.Random(seed)))
+
+Replaying takes a snapshot of the game (including its report, the King's mood, the resentment and, for a game
+with its own distributions, their means or table and the state of their generator) every interval years. A seek
+starts from the last checkpoint before the year, so it plays at most interval years; checkpoints are taken as
+seeks pass them, so the first seek to a late year plays all the years up to it once.
+
+From the shell, print the report after year 20 of game 3 of a log (counting from 0):
+
+    $ python3 arena/replay.py games.log 3 20
+'''
+
+import argparse
+import bisect
+
+import tournament  # Puts the games on the path.
+
+import dukedom
+import eventlog
+
+
+INTERVAL = 5 # Years between checkpoints
+
+
+class Replay:
+
+    """A recorded game. start is the GameState.snapshot() it started from, and decisions are the decisions of
+    each year: dukedom.Decisions, or the (question, answer) pairs of a 'dukedom year' record. draws are the
+    recorded draws of each year; or distributions are the game's own, in their state at the start."""
+    def __init__(self, start, decisions, draws=None, distributions=None, interval=INTERVAL):
+        if (draws is None) == (distributions is None):
+            raise ValueError('Replay either the draws or the distributions')
+        self.decisions = [x if isinstance(x, dukedom.Decisions) else dukedom.Decisions(**dict(x)) for x in decisions]
+        self.draws = draws
+        self.distributions = distributions
+        self.interval = interval
+        game = self._game()
+        game.restore(start)
+        self.checkpoints = {game.year: game.snapshot(rng=self._rng)}
+        self._years = [game.year]
+
+    @property
+    def _rng(self):
+        return self.distributions is not None
+
+    @property
+    def first(self):
+        return self._years[0]
+
+    @property
+    def last(self):
+        """The last year recorded."""
+        return self.first + len(self.decisions)
+
+    def _game(self):
+        return dukedom.GameState(self.distributions.fork() if self._rng else dukedom.Scripted())
+
+    def seek(self, year):
+        """A new GameState in the state the game was in at the end of year. Raises EndGame (or
+        ZeroDivisionError) if the game ended during year."""
+        if not self.first <= year <= self.last:
+            raise ValueError('The game was recorded from year {} to {}'.format(self.first, self.last))
+        game = self._game()
+        game.restore(self.checkpoints[self._years[bisect.bisect_right(self._years, year) - 1]])
+        while game.year < year:
+            i = game.year - self.first
+            if not self._rng:
+                game.distributions = dukedom.Scripted(self.draws[i])
+            dukedom.step(game, self.decisions[i])
+            if game.year % self.interval == 0 and game.year not in self.checkpoints:
+                self.checkpoints[game.year] = game.snapshot(rng=self._rng)
+                bisect.insort(self._years, game.year)
+        return game
+
+
+def from_log(records, distributions=()):
+    """A Replay of each game of Dukedom in an iterable of event log records. distributions are each game's own in
+    turn, in their state at its start, which replaying a brief log takes."""
+    distributions = iter(distributions)
+    start = None
+    for record in records:
+        if record[0] == 'dukedom start':
+            if start is not None:
+                yield _replay(start, decisions, draws, distributions)
+            start, decisions, draws = record[1], [], []
+        elif record[0] == 'dukedom year':
+            decisions.append(record[2] if record[3] is not None else dukedom.Decisions(*record[2]))
+            draws.append(record[3])
+    if start is not None:
+        yield _replay(start, decisions, draws, distributions)
+
+
+def _replay(start, decisions, draws, distributions):
+    own = next(distributions, None)
+    if None in draws:
+        return Replay(start, decisions, distributions=own)
+    return Replay(start, decisions, draws)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show a recorded game of Dukedom after any year.')
+    parser.add_argument('log', help='an event log')
+    parser.add_argument('game', type=int, help='the number of the game in the log, from 0')
+    parser.add_argument('year', type=int)
+    args = parser.parse_args()
+
+    games = 0
+    for played in from_log(eventlog.read(args.log)):
+        if games == args.game:
+            try:
+                for line in dukedom.report(played.seek(args.year)):
+                    print(line)
+            except dukedom.EndGame as e:
+                print(e)
+            return
+        games += 1
+    parser.error('There are only {} games in the log'.format(games))
+
+
+if __name__ == '__main__':
+    main()
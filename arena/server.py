@@ -0,0 +1,189 @@
+'''Play the games over TCP, a line at a time, with many players at once.
+
+    $ python3 arena/server.py --port 7777
+    $ telnet localhost 7777
+    Play dukedom, hammurabi or wumpus? wumpus
+    Instructions (y-n)?
+
+Each connection is a session: the player picks a game, and the server then holds the game's conversation with
+them (see dukedom.terminal()), the same conversation as at the terminal. The conversation is a generator, which
+waits for the player's next line without holding on to anything but its own frames, so the sessions don't need
+a thread or even a task each: the event loop hands each line to its session as it arrives, and the session runs
+the conversation on to its next prompt. All the sessions draw from the random module, which they can share as
+only one runs at a time.
+
+A session is closed when the game ends, the player hangs up or sends a line longer than LINE, or nothing comes
+from the player for idle seconds. Output for a player is buffered up to high_water bytes; beyond that, the
+server stops reading from them until they've read it.
+
+A session of Dukedom takes about 5KB (Wumpus and Hammurabi about 3KB), more than half of it the game itself,
+so a process holds 10,000 sessions in 50MB.
+'''
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import channels
+
+
+PORT       = 7777
+IDLE       = 300   # Seconds
+LINE       = 256   # Bytes
+HIGH_WATER = 4096  # Bytes
+SESSIONS   = 20000
+
+MENU = 'Play dukedom, hammurabi or wumpus? '
+
+
+class Session(asyncio.Protocol):
+
+    """A player's connection, and the conversation for the game they're playing."""
+    __slots__ = ['server', 'transport', 'conversation', 'buffer', 'since', 'paused']
+
+    def __init__(self, server):
+        self.server       = server
+        self.transport    = None
+        self.conversation = None
+        self.buffer       = b''
+        self.since        = time.monotonic() # When the player last sent a line
+        self.paused       = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        if len(self.server.sessions) >= self.server.limit:
+            transport.write(b'Sorry, there are too many players. Try again later.\n')
+            transport.close()
+            return
+        self.server.sessions.add(self)
+        transport.set_write_buffer_limits(self.server.high_water)
+        transport.write(MENU.encode())
+
+    def data_received(self, data):
+        self.buffer += data
+        self.since = time.monotonic()
+        self._answer()
+
+    def _answer(self):
+        while not self.paused and not self.transport.is_closing():
+            line, newline, rest = self.buffer.partition(b'\n')
+            if len(line) > LINE:
+                self.transport.close()
+                return
+            if not newline:
+                return
+            self.buffer = rest
+            line = line.decode(errors='replace').rstrip('\r')
+            if self.conversation is None:
+                self._start(line.strip().lower())
+            else:
+                self._converse(line)
+
+    def _start(self, name):
+        if name not in channels.GAMES:
+            self.transport.write(MENU.encode())
+            return
+        self.conversation = channels.GAMES[name](random)
+        self._converse(None)
+
+    def _converse(self, line):
+        """Run the conversation on to its next prompt, with the player's answer to the last one."""
+        write = self.transport.write
+        try:
+            msg = channels.turn(self.conversation, line, lambda x: write(x.encode() + b'\n'))
+        except Exception:
+            # Such as a ZeroDivisionError from curve 8 in Dukedom, or Hammurabi being sent a plant that isn't a
+            # number, which end the game at the terminal too.
+            logging.exception('The game crashed')
+            write(b'The game has crashed - sorry.\n')
+            self.transport.close()
+            return
+        if msg is None:
+            self.transport.close()
+        else:
+            write(msg.encode())
+
+    def pause_writing(self):
+        self.paused = True
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.paused = False
+        self.transport.resume_reading()
+        self._answer()
+
+    def connection_lost(self, exc):
+        self.server.sessions.discard(self)
+        if self.conversation is not None:
+            self.conversation.close()
+            self.conversation = None
+
+
+class Server:
+
+    """Sessions for at most limit players at once, closed when the player is idle for idle seconds. aclose() stops
+    listening and stops the timer for idle sessions, leaving the sessions to finish."""
+    def __init__(self, idle=IDLE, limit=SESSIONS, high_water=HIGH_WATER):
+        self.idle       = idle
+        self.limit      = limit
+        self.high_water = high_water
+        self.sessions   = set()
+        self._listening = None
+        self._sweeper   = None
+
+    async def start(self, host=None, port=PORT):
+        """Start listening, returning the asyncio.Server."""
+        loop = asyncio.get_running_loop()
+        self._listening = await loop.create_server(lambda: Session(self), host, port)
+        self._sweeper   = loop.create_task(self._sweep())
+        return self._listening
+
+    async def aclose(self):
+        if self._listening is not None:
+            self._listening.close()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+        self._listening = self._sweeper = None
+
+    async def _sweep(self):
+        # One timer for all the sessions, rather than one each.
+        while True:
+            await asyncio.sleep(self.idle / 10)
+            late = time.monotonic() - self.idle
+            for session in [s for s in self.sessions if s.since < late]:
+                session.transport.write(b'\nToo slow - goodbye.\n')
+                if session.paused:
+                    session.transport.abort()  # They aren't reading what's already been sent
+                else:
+                    session.transport.close()
+
+
+async def serve(host, port, idle):
+    server = Server(idle)
+    try:
+        listening = await server.start(host, port)
+        await listening.serve_forever()
+    finally:
+        await server.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play the games over TCP.')
+    parser.add_argument('--host', default=None, help='the address to listen on (all of them by default)')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--idle', type=float, default=IDLE, help='seconds to wait for a player to answer')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.idle))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import channels
+import random
+import socket
+import threading
+import unittest
+
+import dukedom
+import hammurabi
+
+
+RESIGN = ['0', '0', '-1']
+
+
+def played(channel, seed=1):
+    channels.hold(hammurabi.conversation(random.Random(seed)), channel)
+    return channel
+
+
+class ChannelTests(unittest.TestCase):
+
+    def test_script(self):
+        transcript = played(channels.Script(RESIGN)).transcript()
+        self.assertTrue(transcript.startswith('Try your hand at governing ancient Sumeria\n'))
+        self.assertTrue(transcript.endswith('How many bushels do you wish to feed your people (0-2800)? -1\n'
+                                            '\nHammurabi: I cannot do what you wish.\n'
+                                            'Get yourself another steward!!!\n'))
+
+        # Running out of lines is like the end of input at the terminal.
+        script = channels.Script(['n', '14'])
+        self.assertRaises(EOFError, channels.hold, dukedom.session(False, random.Random(1)), script)
+        self.assertTrue(script.transcript().endswith('Grain for food = 14\nLand to buy at 8 HL./HA. = '))
+
+    def test_turn(self):
+        conversation, shown = hammurabi.conversation(random.Random(1)), []
+        msg = channels.turn(conversation, None, shown.append)
+        self.assertEqual(msg, 'How many acres do you wish to buy (0-147)? ')
+        self.assertEqual(shown[0], 'Try your hand at governing ancient Sumeria\nfor a ten-year term of office.')
+        msg = channels.turn(conversation, '0', shown.append)
+        self.assertEqual(msg, 'How many acres do you wish to sell (0-1000)? ')
+        channels.turn(conversation, '0', shown.append)
+        self.assertIsNone(channels.turn(conversation, '-1', shown.append))
+        self.assertEqual(shown[-1], '\nHammurabi: I cannot do what you wish.\nGet yourself another steward!!!')
+
+    def test_null(self):
+        # Null plays the same game as Script, taking the same lines, just without keeping the output.
+        rest = iter(RESIGN + ['5', '6'])
+        played(channels.Null(rest))
+        self.assertEqual(list(rest), ['5', '6'])
+
+    def test_socket(self):
+        ours, theirs = socket.socketpair()
+        with ours, theirs:
+            game = threading.Thread(target=played, args=(channels.Socket(theirs),))
+            game.start()
+            ours.sendall(''.join(line + '\n' for line in RESIGN).encode())
+            game.join()
+            theirs.shutdown(socket.SHUT_WR)
+            received = b''.join(iter(lambda: ours.recv(4096), b'')).decode()
+        # The same as the transcript, without the answers echoed.
+        transcript = played(channels.Script(RESIGN)).transcript()
+        self.assertEqual(received, transcript.replace('? 0\n', '? ').replace('? -1\n', '? '))
+
+
+if __name__ == '__main__':
+    unittest.main()
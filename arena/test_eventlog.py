@@ -0,0 +1,114 @@
+import eventlog
+import os
+import random
+import tempfile
+import tournament  # Puts the games on the path.
+import unittest
+
+import dukedom
+import hammurabi
+import wumpus
+
+from test_tournament import steady, wander
+
+
+class Records(list):
+
+    """A log kept in memory."""
+    write = list.append
+
+
+class EventLogTests(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_round_trip(self):
+        records = [('a', 1, -2, 3.5, 'x', b'\x00', None, True, ((1, 2), ())), ('b',), ('c', 2 ** 70)] * 5
+        with eventlog.Writer(self.path, block=4) as log:
+            for record in records[:10]:
+                log.write(record)
+        # Logs are appended to.
+        with eventlog.Writer(self.path, block=4) as log:
+            for record in records[10:]:
+                log.write(record)
+        self.assertEqual(list(eventlog.read(self.path)), records)
+
+        # A block that's still being written is left out.
+        with open(self.path, 'ab') as f:
+            f.write(b'\xff\x00\x00\x00abc')
+        self.assertEqual(list(eventlog.read(self.path)), records)
+
+    def test_errors(self):
+        # A block that can't be written is reported, even when blocks after it are written.
+        log = eventlog.Writer(self.path, block=1)
+        with self.assertRaises(ValueError):
+            log.write(('a', object())) # Which marshal can't write
+            log.write(('b',))
+            log.flush()
+        log.close()
+        self.assertTrue(log.file.closed)
+
+    def test_not_a_log(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'Year 1 Peasants 100')
+        self.assertRaises(ValueError, list, eventlog.read(self.path))
+
+    def test_dukedom(self):
+        with eventlog.Writer(self.path) as log:
+            for seed in range(20):
+                game = dukedom.GameState(rng=random.Random(seed))
+                try:
+                    while True:
+                        dukedom.step(game, steady(game), log=log)
+                except (dukedom.EndGame, ZeroDivisionError):
+                    pass
+        records = list(eventlog.read(self.path))
+        self.assertEqual(sum(r[0] == 'dukedom start' for r in records), 20)
+
+        # Playing each year's answers with its draws plays the same year again.
+        for record in records:
+            if record[0] == 'dukedom start':
+                game = dukedom.GameState()
+                game.restore(record[1])
+                continue
+            _, year, answers, draws, events, figures, end = record
+            game.distributions = dukedom.Scripted(draws)
+            replayed = Records()
+            try:
+                dukedom.step(game, dukedom.Decisions(**dict(answers)), log=replayed)
+            except (dukedom.EndGame, ZeroDivisionError):
+                pass
+            self.assertEqual(replayed[-1][:4], (record[0], year, answers, draws))
+            self.assertEqual(replayed[-1][4:], (events, figures, end))
+        self.assertTrue(all(r[-1] for r in records if r[0] == 'dukedom year' and r[-2] is None))
+
+    def test_wumpus(self):
+        records = Records()
+        env = wumpus.WumpusEnv(seed=1, log=records)
+        observation, done = env.reset(), False
+        while not done:
+            observation, reward, done = env.step(wander(observation))
+        self.assertEqual(records[0], ('wumpus start', env._setup.wumpus, env._setup.hunter, env._setup.bats,
+                                      env._setup.pits))
+        self.assertEqual(records[-1][3:], (tuple(env.events), env.game.hunter, env.game.wumpus, env.game.arrows,
+                                           reward))
+
+    def test_hammurabi(self):
+        records = Records()
+        rng = random.Random(2)
+        city = hammurabi.start(rng)
+        while not city.over:
+            city = hammurabi.next_year(city, 0, 0, city.pop * 20, min(city.acres, 10 * city.pop), rng, log=records)
+        self.assertEqual(records[-1][-1], tuple(city))
+        self.assertEqual([r[1] for r in records[1:]], [r[-1] for r in records[:-1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import collections
+import nprandom
+import tournament  # Puts the games on the path.
+import unittest
+
+import dukedom
+import wumpus
+
+
+class NumpyRandomTests(unittest.TestCase):
+
+    def test_seeded(self):
+        first, second = nprandom.NumpyRandom(3), nprandom.NumpyRandom(3)
+        self.assertEqual([first.gauss(5, 2) for _ in range(300)], [second.gauss(5, 2) for _ in range(300)])
+        self.assertEqual([first.random() for _ in range(300)], [second.random() for _ in range(300)])
+
+    def test_ranges(self):
+        rng = nprandom.NumpyRandom(1)
+        self.assertEqual(set(rng.randint(1, 6) for _ in range(2000)), set(range(1, 7)))
+        self.assertEqual(set(rng.randrange(1, 21) for _ in range(2000)), set(range(1, 21)))
+        self.assertEqual(set(rng.randrange(4) for _ in range(2000)), set(range(4)))
+        self.assertEqual(set(rng.choice('abc') for _ in range(2000)), set('abc'))
+        self.assertRaises(ValueError, rng.randrange, 3, 3)
+        self.assertRaises(IndexError, rng.choice, [])
+
+    def test_shuffle(self):
+        rng = nprandom.NumpyRandom(2)
+        firsts = collections.Counter()
+        for _ in range(4000):
+            rooms = list(range(1, 21))
+            rng.shuffle(rooms)
+            self.assertEqual(sorted(rooms), list(range(1, 21)))
+            firsts[rooms[0]] += 1
+        self.assertEqual(len(firsts), 20)
+        self.assertLess(max(firsts.values()), 300)
+
+    def test_state(self):
+        rng = nprandom.NumpyRandom(6)
+        rng.random(), rng.gauss()
+        state = rng.getstate()
+        first = [(rng.random(), rng.gauss()) for _ in range(300)]
+        rng.setstate(state)
+        self.assertEqual([(rng.random(), rng.gauss()) for _ in range(300)], first)
+
+    def test_games(self):
+        game = dukedom.GameState(rng=nprandom.NumpyRandom(4))
+        dukedom.step(game, dukedom.Decisions(food=14, plant=300))
+        self.assertEqual(game.year, 1)
+        env = wumpus.WumpusEnv(rng=nprandom.NumpyRandom(5))
+        self.assertEqual(env.reset(), wumpus.WumpusEnv(rng=nprandom.NumpyRandom(5)).reset())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import players
+import random
+import tournament
+import unittest
+
+import dukedom
+import hammurabi
+import test_tournament
+import wumpus
+
+
+class Answering:
+
+    """A player that answers from a policy for tournament.py's Hammurabi or Wumpus."""
+    def __init__(self, policy):
+        self.policy = policy
+
+    def answer(self, state, question):
+        if question.name == 'action':
+            return self.policy(state)
+        if question.name == 'buy':
+            # The advice is for the city at the start of the year.
+            self.advice = self.policy.advise(state.year, state.pop, state.grain, state.acres, state.price,
+                                             state.mortality)
+        return getattr(self.advice, question.name)
+
+
+class PlayerTests(unittest.TestCase):
+
+    def test_same_as_tournament(self):
+        # Asking one question at a time plays the same games as the policies that decide a year at once.
+        for game in ['hammurabi', 'wumpus']:
+            policy = {'hammurabi': test_tournament.Frugal(), 'wumpus': test_tournament.wander}[game]
+            for i in range(20):
+                self.assertEqual(tournament.GAMES[game](Answering(policy), random.Random(i)),
+                                 tournament.GAMES[game](policy, random.Random(i)), msg='{} {}'.format(game, i))
+
+        class Steady:
+            def answer(self, game, question):
+                if question.name == 'food':
+                    self.decisions = test_tournament.steady(game)
+                return getattr(self.decisions, question.name)
+        for i in range(20):
+            played, stepped = dukedom.GameState(rng=random.Random(i)), dukedom.GameState(rng=random.Random(i))
+            try:
+                dukedom.play(played, Steady())
+            except ZeroDivisionError:
+                pass
+            try:
+                while True:
+                    dukedom.step(stepped, test_tournament.steady(stepped))
+            except (dukedom.EndGame, ZeroDivisionError):
+                pass
+            self.assertEqual(played.snapshot(), stepped.snapshot(), msg=i)
+
+    def test_baselines(self):
+        for game, baselines in players.BASELINES.items():
+            standings = players.match(game, baselines, 30, seed=1)
+            self.assertEqual(set(standings), {'random', 'greedy', 'rules'})
+            for name, standing in standings.items():
+                self.assertEqual(sum(standing.outcomes.values()), 30)
+                self.assertNotIn('invalid decision', standing.outcomes, msg='{} {}'.format(game, name))
+                self.assertNotIn('invalid action', standing.outcomes, msg='{} {}'.format(game, name))
+                self.assertGreater(standing.decisions, 30)
+            self.assertEqual(standings['rules'].outcomes, players.match(game, baselines, 30, seed=1)['rules'].outcomes)
+            # The same games as a tournament, in any number of processes.
+            pooled = players.match(game, baselines, 30, seed=1, processes=2)
+            self.assertEqual({name: x.outcomes for name, x in pooled.items()},
+                             {name: x.outcomes for name, x in standings.items()})
+            self.assertEqual(standings['rules'].outcomes, tournament.run(game, baselines['rules'], 30, seed=1))
+
+    def test_invalid(self):
+        class Spendthrift:
+            def answer(self, city, question):
+                return city.grain
+        self.assertRaises(hammurabi.InvalidDecision, hammurabi.play, Spendthrift(), random.Random(1))
+
+        class Lost:
+            def answer(self, observation, question):
+                return wumpus.Move(observation.room)
+        self.assertRaises(wumpus.InvalidAction, wumpus.play, Lost(), random.Random(1))
+        self.assertEqual(tournament.play_wumpus(Lost(), random.Random(1)), 'invalid action')
+
+        class Glutton:
+            def answer(self, game, question):
+                return 10000
+        self.assertEqual(tournament.play_dukedom(Glutton(), random.Random(1)), 'invalid decision')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import regression
+import shutil
+import tempfile
+import unittest
+
+
+SCRIPTS = [
+    ('dukedom',   ['n'] + ['14', '0', '0', '400', 'y', '0'] * 30),
+    ('hammurabi', ['0', '0', '2000', '900'] * 10),
+    ('wumpus',    ['n'] + ['m', '1', 'm', '5', 's', '1', '2', 'y'] * 5)]
+
+
+class RegressionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def cases(self):
+        return [('case {}'.format(i), {'game': game, 'seed': i, 'input': lines})
+                for i, (game, lines) in enumerate(SCRIPTS * 4)]
+
+    def test_goldens(self):
+        cases = self.cases()
+        recorded = list(regression.run(cases, processes=1, chunk=5, record=True))
+        self.assertEqual([r.name for r in recorded], [name for name, _ in cases])
+        self.assertTrue(all(r.divergence is None for r in recorded))
+        goldens = [(name, dict(case, transcript=r.transcript, ending=r.ending))
+                   for (name, case), r in zip(cases, recorded)]
+
+        # The same again, in a pool of processes.
+        results = list(regression.run(goldens, processes=2, chunk=5))
+        self.assertEqual(sorted(r.name for r in results), sorted(name for name, _ in cases))
+        self.assertTrue(all(r.divergence is None and r.transcript is None for r in results))
+
+        name, case = goldens[1]
+        lines = case['transcript'].split('\n')
+        lines[4] = lines[4].replace('starved', 'died')
+        changed = dict(case, transcript='\n'.join(lines))
+        self.assertEqual(regression.divergence(changed, case['transcript'], case['ending']),
+                         'line 5, expected {!r} but got {!r}'.format(lines[4], case['transcript'].split('\n')[4]))
+        self.assertIn('to end with', regression.divergence(dict(case, ending='ValueError'), case['transcript'],
+                                                           case['ending']))
+
+    def test_load(self):
+        cases = self.cases()
+        path = os.path.join(self.directory, 'cases.jsonl')
+        with open(path, 'w') as f:
+            for _, case in cases:
+                f.write(json.dumps(case) + '\n')
+        for i, (_, case) in enumerate(cases):
+            with open(os.path.join(self.directory, '{:03}.json'.format(i)), 'w') as f:
+                json.dump(case, f)
+        self.assertEqual([case for _, case in regression.load(path)], [case for _, case in cases])
+        self.assertEqual(list(regression.load(self.directory))[0], ('000.json', cases[0][1]))
+        self.assertEqual(len(list(regression.load(self.directory))), len(cases))
+
+    def test_summary(self):
+        results = [regression.Result(str(i), i / 1000, None, None, None) for i in range(1, 101)]
+        self.assertEqual(regression.summary(results, 2.0),
+                         '100 games in 2.0s: 50 games/s, latency p50 50.5ms p99 99.0ms')
+
+
+if __name__ == '__main__':
+    unittest.main()
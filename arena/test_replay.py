@@ -0,0 +1,88 @@
+import random
+import replay
+import unittest
+
+import dukedom
+
+from test_eventlog import Records
+from test_tournament import steady
+
+
+def record(seed, log=None):
+    """Play a game with steady, returning its decisions and its snapshot at the end of each year."""
+    game = dukedom.GameState(rng=random.Random(seed))
+    decisions, states = [], [game.snapshot()]
+    try:
+        while True:
+            decisions.append(steady(game))
+            dukedom.step(game, decisions[-1], log=log)
+            states.append(game.snapshot())
+    except (dukedom.EndGame, ZeroDivisionError):
+        pass
+    return decisions, states
+
+
+class ReplayTests(unittest.TestCase):
+
+    def test_from_log(self):
+        log, games = Records(), []
+        for seed in range(5):
+            games.append(record(seed, log)[1])
+        replays = list(replay.from_log(log))
+        self.assertEqual(len(replays), 5)
+        for played, states in zip(replays, games):
+            self.assertEqual((played.first, played.last), (0, len(states)))
+            # Backwards, so that most seeks start from a checkpoint.
+            for year in reversed(range(len(states))):
+                self.assertEqual(played.seek(year).snapshot(), states[year])
+
+    def test_brief(self):
+        log, games = Records(), []
+        log.brief = True
+        for seed in range(3):
+            games.append(record(seed, log)[1])
+        self.assertTrue(all(r[3:6] == (None, None, None) for r in log if r[0] == 'dukedom year'))
+        replays = replay.from_log(log, (dukedom.Gaussian(random.Random(seed)) for seed in range(3)))
+        for played, states in zip(replays, games):
+            for year in reversed(range(len(states))):
+                self.assertEqual(played.seek(year).snapshot(), states[year])
+
+    def test_distributions(self):
+        decisions, states = record(3)
+        start = dukedom.GameState().snapshot()
+        played = replay.Replay(start, decisions, distributions=dukedom.Gaussian(random.Random(3)), interval=4)
+        for year in (7, 2, 9, len(states) - 1, 0, 5):
+            self.assertEqual(played.seek(year).snapshot(), states[year])
+        self.assertRaises(ValueError, replay.Replay, start, decisions)
+
+    def test_checkpoints(self):
+        decisions, states = record(3)
+        start = dukedom.GameState().snapshot()
+        played = replay.Replay(start, decisions, distributions=dukedom.Gaussian(random.Random(3)), interval=3)
+        played.seek(11)
+        self.assertEqual(sorted(played.checkpoints), [0, 3, 6, 9])
+
+        years = []
+        step = dukedom.step
+        def counted(game, decisions):
+            years.append(game.year)
+            return step(game, decisions)
+        replay.dukedom.step = counted
+        try:
+            played.seek(11)
+            played.seek(8)
+        finally:
+            replay.dukedom.step = step
+        self.assertEqual(years, [9, 10, 6, 7])
+
+    def test_end(self):
+        decisions, states = record(4)
+        played = replay.Replay(dukedom.GameState().snapshot(), decisions,
+                               distributions=dukedom.Gaussian(random.Random(4)))
+        self.assertRaises(dukedom.EndGame, played.seek, played.last)
+        self.assertRaises(ValueError, played.seek, played.last + 1)
+        self.assertRaises(ValueError, played.seek, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import random
+import server
+import unittest
+
+
+async def connect(port):
+    return await asyncio.open_connection('127.0.0.1', port)
+
+
+async def until(reader, prompt):
+    """What the server sends up to and including prompt."""
+    return (await reader.readuntil(prompt.encode())).decode()
+
+
+class ServerTests(unittest.TestCase):
+
+    def run_server(self, test, **kwargs):
+        async def main():
+            game_server = server.Server(**kwargs)
+            listening = await game_server.start('127.0.0.1', 0)
+            try:
+                await test(game_server, listening.sockets[0].getsockname()[1])
+            finally:
+                await game_server.aclose()
+            self.assertFalse(listening.is_serving())
+            # Nothing is left running: not even the timer for idle sessions.
+            self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+        asyncio.run(main())
+
+    def test_sessions(self):
+        async def test(game_server, port):
+            random.seed(1)
+            players = [await connect(port) for _ in range(20)]
+            for reader, writer in players:
+                await until(reader, server.MENU)
+                writer.write(b'chess\nWumpus\n')
+                self.assertEqual(await until(reader, server.MENU), server.MENU)
+                self.assertIn('Instructions (y-n)? ', await until(reader, '? '))
+            self.assertEqual(len(game_server.sessions), 20)
+
+            # The players take turns, each getting to their first move.
+            for reader, writer in players:
+                writer.write(b'n\n')
+                text = await until(reader, 'Shoot, Move or Quit (s-m-q)? ')
+                self.assertIn('Hunt the Wumpus', text)
+                self.assertIn('You are in room', text)
+
+            for reader, writer in players:
+                writer.write(b'q\n')
+                self.assertEqual(await reader.read(), b'')
+                writer.close()
+            self.assertEqual(len(game_server.sessions), 0)
+        self.run_server(test)
+
+    def test_game(self):
+        async def test(game_server, port):
+            reader, writer = await connect(port)
+            await until(reader, server.MENU)
+            writer.write(b'hammurabi\n')
+            text = await until(reader, '? ')
+            self.assertIn('Try your hand at governing ancient Sumeria', text)
+            self.assertIn('How many acres do you wish to buy', text)
+            writer.write(b'-1\n')
+            self.assertIn('Get yourself another steward!!!', (await reader.read()).decode())
+            writer.close()
+        self.run_server(test)
+
+    def test_idle(self):
+        async def test(game_server, port):
+            reader, writer = await connect(port)
+            await until(reader, server.MENU)
+            self.assertEqual(await reader.read(), b'\nToo slow - goodbye.\n')
+            writer.close()
+            self.assertEqual(len(game_server.sessions), 0)
+        self.run_server(test, idle=0.1)
+
+    def test_limits(self):
+        async def test(game_server, port):
+            reader, writer = await connect(port)
+            await until(reader, server.MENU)
+            full, _ = await connect(port)
+            self.assertIn(b'too many players', await full.read())
+
+            writer.write(b'x' * (2 * server.LINE) + b'\n')
+            self.assertEqual(await reader.read(), b'')
+            writer.close()
+        self.run_server(test, limit=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
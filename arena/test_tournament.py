@@ -0,0 +1,73 @@
+import collections
+import random
+import tournament
+import unittest
+
+import dukedom
+import solver
+import wumpus
+
+
+def steady(game):
+    """Feed everyone 14 HL and plant what can be planted."""
+    food = min(14, game.grain // game.peasants)
+    return dukedom.Decisions(food=food, plant=min(game.land, (game.grain - food * game.peasants) // 2,
+                                                  game.peasants * 4), mercs=20)
+
+
+class Frugal:
+
+    """Feed everyone and plant everything, never trading land."""
+    def advise(self, year, pop, grain, acres, price, mortality=0):
+        feed = min(pop * 20, grain)
+        return solver.Advice(0, 0, feed, min(acres, 2 * (grain - feed), 10 * pop), None)
+
+
+def wander(observation):
+    """Shoot at the wumpus when it's near, otherwise walk down the first tunnel."""
+    if observation.wumpus:
+        return wumpus.Shoot([observation.tunnels[0]])
+    return wumpus.Move(observation.tunnels[0])
+
+
+class TournamentTests(unittest.TestCase):
+
+    def test_same_for_any_number_of_processes(self):
+        for game, policy in [('dukedom', steady), ('hammurabi', Frugal()), ('wumpus', wander)]:
+            alone  = tournament.run(game, policy, 60, seed=3, processes=1, chunk=7)
+            pooled = tournament.run(game, policy, 60, seed=3, processes=2, chunk=7)
+            self.assertEqual(alone, pooled, msg=game)
+            self.assertEqual(sum(alone.values()), 60)
+
+    def test_numpy(self):
+        alone  = tournament.run('dukedom', steady, 20, seed=3, processes=1, chunk=7, numpy=True)
+        pooled = tournament.run('dukedom', steady, 20, seed=3, processes=2, chunk=7, numpy=True)
+        self.assertEqual(alone, pooled)
+
+    def test_chunks(self):
+        chunks = list(tournament.tournament('wumpus', wander, 25, processes=1, chunk=10))
+        self.assertEqual([sum(x.values()) for x in chunks], [10, 10, 5])
+
+    def test_seeded(self):
+        first  = tournament.run('dukedom', steady, 30, seed=1, processes=1)
+        second = tournament.run('dukedom', steady, 30, seed=1, processes=1)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, tournament.run('dukedom', steady, 30, seed=2, processes=1))
+
+    def test_outcomes(self):
+        self.assertLessEqual(set(tournament.run('dukedom', steady, 30, processes=1)),
+                             {'pop loss', 'land loss', 'deposed', 'retirement', 'overrun', 'defeat', 'victory',
+                              'beggared', 'error', 'invalid decision'})
+        self.assertLessEqual(set(tournament.run('hammurabi', Frugal(), 30, processes=1)), set(tournament.RATINGS))
+        self.assertLessEqual(set(tournament.run('wumpus', wander, 30, processes=1)), {'won', 'lost', 'unfinished'})
+
+    def test_global_random_not_used(self):
+        # Each game is seeded from its own generator, whatever the random module was seeded with before.
+        random.seed(5)
+        first = tournament.run('dukedom', steady, 10, processes=1)
+        random.seed(6)
+        self.assertEqual(first, tournament.run('dukedom', steady, 10, processes=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+'''Score a policy by playing it in many games of Hammurabi, Dukedom or Wumpus, across a pool of processes.
+
+A policy is a picklable object that makes the player's decisions:
+
+- dukedom:   called with the GameState at the start of each year, returns the dukedom.Decisions for the year.
+- hammurabi: has an advise(year, pop, grain, acres, price, mortality) method, like solver.Solver.
+- wumpus:    called with each wumpus.Observation, returns a wumpus.Move or wumpus.Shoot.
+
+or a player, which answers each question as it comes up (see players.py): anything with an answer(state,
+question) method, or a class of them, of which one is made for each game with its own random.Random.
+
+Every game gets its own random number generator seeded from the master seed, the game and the game's number,
+so the outcome of each game (and so the totals) doesn't depend on how many processes play them or in what
+order. The generators are random.Random, or nprandom.NumpyRandom with numpy=True. Games are handed out to the
+processes in chunks, and the outcomes of each chunk come back as soon as it's played:
+
+    >>> for counts in tournament('dukedom', policy, games=100000, seed=1):
+    ...     totals.update(counts)
+    >>> run('dukedom', test_tournament.steady, games=100000, seed=1)
+    Counter({'deposed': 55209, 'beggared': 40767, 'error': 3838, 'overrun': 129, 'retirement': 55, 'land loss': 2})
+
+or from the shell, naming the policy as module:attribute:
+
+    $ python3 arena/tournament.py dukedom test_tournament:steady --games 100000 --seed 1
+'''
+
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for name in ('dukedom', 'hammurabi', 'wumpus'):
+    sys.path.insert(0, os.path.join(ROOT, name))
+
+import dukedom
+import hammurabi
+import nprandom
+import solver
+import wumpus
+
+
+# The rating hammurabi.rating() gives, by name.
+RATINGS = ['national fink', 'hated', 'not too bad', 'fantastic']
+
+# Wumpus games in which the hunter is still wandering after this many actions are called off.
+MAX_ACTIONS = 1000
+
+
+# How a policy or player did: a Counter of the outcomes of its games, the decisions it made (counted for
+# players only), and the seconds spent playing them.
+Standing = collections.namedtuple('Standing', ['outcomes', 'decisions', 'seconds'])
+
+
+def play_dukedom(policy, rng):
+    """Play a game of Dukedom, returning the reason it ended."""
+    game = dukedom.GameState(rng=rng)
+    try:
+        if hasattr(policy, 'answer'):
+            return dukedom.play(game, policy)
+        while True:
+            dukedom.step(game, policy(game))
+    except dukedom.EndGame as e:
+        return e.reason
+    except ZeroDivisionError:
+        # See the TODO about curve 8 in dukedom.
+        return 'error'
+    except ValueError:
+        return 'invalid decision'
+
+
+def play_hammurabi(policy, rng):
+    """Play a game of Hammurabi, returning the name of its rating."""
+    if hasattr(policy, 'answer'):
+        try:
+            return RATINGS[hammurabi.play(policy, rng).rating()]
+        except hammurabi.InvalidDecision:
+            return 'invalid decision'
+    return RATINGS[solver.play(policy, rng)]
+
+
+def play_wumpus(policy, rng):
+    """Play a game of Hunt the Wumpus, returning 'won', 'lost' or 'unfinished'."""
+    if hasattr(policy, 'answer'):
+        try:
+            reward = wumpus.play(policy, rng, MAX_ACTIONS)
+        except wumpus.InvalidAction:
+            return 'invalid action'
+        return 'won' if reward > 0 else 'lost' if reward < 0 else 'unfinished'
+    env = wumpus.WumpusEnv(rng=rng)
+    observation = env.reset()
+    try:
+        for _ in range(MAX_ACTIONS):
+            observation, reward, done = env.step(policy(observation))
+            if done:
+                return 'won' if reward > 0 else 'lost'
+    except wumpus.InvalidAction:
+        return 'invalid action'
+    return 'unfinished'
+
+
+GAMES = {
+    'dukedom':   play_dukedom,
+    'hammurabi': play_hammurabi,
+    'wumpus':    play_wumpus}
+
+
+def tournament(game, policy, games, seed=0, processes=None, chunk=1000, numpy=False):
+    """Play policy in the given number of games, yielding a Counter of the outcomes of each chunk of games as
+    it's finished. processes is the size of the pool (all the cores by default, 1 to play in this process)."""
+    for played in _standings(game, policy, games, seed, processes, chunk, numpy):
+        yield played.outcomes
+
+
+def run(game, policy, games, seed=0, processes=None, chunk=1000, numpy=False):
+    """The total Counter of outcomes from tournament()."""
+    totals = collections.Counter()
+    for counts in tournament(game, policy, games, seed, processes, chunk, numpy):
+        totals.update(counts)
+    return totals
+
+
+def standing(game, policy, games, seed=0, processes=None, chunk=1000, numpy=False):
+    """The Standing of policy over the games tournament() plays, with the seconds spent in each process
+    added up."""
+    outcomes, decisions, seconds = collections.Counter(), 0, 0.0
+    for played in _standings(game, policy, games, seed, processes, chunk, numpy):
+        outcomes.update(played.outcomes)
+        decisions += played.decisions
+        seconds   += played.seconds
+    return Standing(outcomes, decisions, seconds)
+
+
+def _standings(game, policy, games, seed, processes, chunk, numpy):
+    chunks = [(game, policy, seed, start, min(start + chunk, games), numpy) for start in range(0, games, chunk)]
+    if processes == 1:
+        for job in chunks:
+            yield _play_chunk(job)
+        return
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        for future in concurrent.futures.as_completed([pool.submit(_play_chunk, job) for job in chunks]):
+            yield future.result()
+
+
+class _Counted:
+
+    """A player that counts its decisions."""
+    __slots__ = ['player', 'decisions']
+
+    def __init__(self, player):
+        self.player    = player
+        self.decisions = 0
+
+    def answer(self, state, question):
+        self.decisions += 1
+        return self.player.answer(state, question)
+
+
+def _play_chunk(job):
+    game, policy, seed, start, stop, numpy = job
+    play = GAMES[game]
+    outcomes, decisions, seconds = collections.Counter(), 0, 0.0
+    for i in range(start, stop):
+        rng = _rng(seed, game, i, numpy)
+        if isinstance(policy, type):
+            player = _Counted(policy(random.Random('{}:{}:{}:player'.format(seed, game, i))))
+        elif hasattr(policy, 'answer'):
+            player = _Counted(policy)
+        else:
+            player = policy
+        begun = time.perf_counter()
+        outcomes[play(player, rng)] += 1
+        seconds += time.perf_counter() - begun
+        decisions += getattr(player, 'decisions', 0)
+    return Standing(outcomes, decisions, seconds)
+
+
+def _rng(seed, game, i, numpy):
+    rng = random.Random('{}:{}:{}'.format(seed, game, i))
+    return nprandom.NumpyRandom(rng.getrandbits(128)) if numpy else rng
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a policy over many games.')
+    parser.add_argument('game', choices=sorted(GAMES))
+    parser.add_argument('policy', help='the policy or player to play, as module:attribute')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk', type=int, default=1000)
+    parser.add_argument('--numpy', action='store_true', help='draw the random numbers with NumPy')
+    args = parser.parse_args()
+
+    module, _, name = args.policy.partition(':')
+    policy = getattr(importlib.import_module(module), name)
+    totals = run(args.game, policy, args.games, args.seed, args.processes, args.chunk, args.numpy)
+    for outcome, count in totals.most_common():
+        print('{:<20}{:>10}  {:.2%}'.format(outcome, count, count / args.games))
+
+
+if __name__ == '__main__':
+    main()
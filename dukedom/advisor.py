@@ -0,0 +1,271 @@
+'''An advisor for the Duke, which searches the years ahead with Monte Carlo tree search.
+
+Each year the advisor chooses one of a few dozen plans for the year: how much to feed each peasant, whether to
+buy or sell a tenth of the land, how much of the land that can be planted to plant, and how many mercenaries to
+hire if it comes to war. A plan answers each question of the year as it comes up, from the state of the game at
+the time, so it can be played with step()'s generator, year():
+
+    >>> with Advisor(budget=0.1, processes=4) as advisor:
+    ...     plan = advisor.advise(game)
+    >>> plan
+    Plan(food=14, land=0.1, plant=1.0, mercs=40)
+    >>> plan.answer(game, question)
+    380
+
+The search plays each plan on from the state at the start of the year, choosing plans by UCT and then playing
+ROLLOUT to the horizon, and values a game by whether the Duke retires or defeats the King (1), is deposed or
+loses the dukedom (0), or, if it's still going at the horizon, by the size of the dukedom. The Duke doesn't
+know the means of the curves the game draws from, so neither does the search: it draws each year from the
+distribution of a curve in a game yet to start (see curves.pmf).
+
+The states it reaches are kept in a transposition table, keyed on the state of the game, so a state reached by
+different years shares its statistics, and the table is kept from one year to the next: the search for next
+year starts from whatever it had already found out about the state the year led to. With more than one process
+each runs its own search from the same state until the time is up, and the counts for the root are added up.
+The search looks at the clock before playing each year, and drops the game it's playing when the time is up
+(the budget, less a margin for collecting the results), so advise() returns within the budget and a year.
+'''
+
+import collections
+import concurrent.futures
+import math
+import multiprocessing
+import random
+import threading
+import time
+
+import curves
+import dukedom
+
+
+BUDGET  = 0.1  # Seconds for each piece of advice
+MARGIN  = 0.01 # Of the budget, to collect the results from the processes
+HORIZON = 6    # Years played ahead
+EXPLORATION = 0.7
+
+# The plans considered each year: grain for each peasant, the fraction of the land to buy (or sell, if
+# negative), the fraction of the land that could be planted to plant, and mercenaries to hire.
+FOOD  = (13, 14, 16)
+LAND  = (-0.1, 0, 0.1)
+PLANT = (0.6, 1.0)
+MERCS = (0, 40)
+
+
+class Plan(collections.namedtuple('Plan', ['food', 'land', 'plant', 'mercs'])):
+
+    """What to do in a year, which answers each question as it's asked."""
+    __slots__ = ()
+
+    def answer(self, game, question):
+        name = question.name
+        if name == 'food':
+            return min(self.food, game.grain // game.peasants)
+        if name == 'buy':
+            bid = question.args[0]
+            if self.land <= 0:
+                return 0
+            bought = round(self.land * game.land)
+            # Keep the grain to seed the land.
+            return min(bought, max(0, (game.grain - 2 * game.land) // (bid + 2))) if bid > 0 else bought
+        if name == 'sell':
+            offer = question.args[0]
+            if self.land >= 0 or offer <= 0:
+                return 0
+            return min(round(-self.land * game.land), sum(game.buckets[:3]), 4000 // offer)
+        if name == 'plant':
+            return int(self.plant * min(game.land, game.grain // 2, 4 * game.peasants))
+        if name == 'mercs':
+            return self.mercs
+        return name != 'attack_first' # Pay the tax and supply the levy, but don't strike first.
+
+
+PLANS   = [Plan(*x) for x in [(f, l, p, m) for f in FOOD for l in LAND for p in PLANT for m in MERCS]]
+ROLLOUT = Plan(14, 0, 1.0, 40)
+
+
+def play(game, plan):
+    """Play a year of game on plan, as step() does."""
+    play, answer = dukedom.year(game), None
+    while True:
+        try:
+            x = play.send(answer)
+        except StopIteration:
+            return game
+        if type(x) is dukedom.Question:
+            answer = plan.answer(game, x)
+            if x.valid:
+                answer = x.valid(answer)
+        else:
+            answer = None
+
+
+class Prior:
+
+    """Stands in for Gaussian or Talbot, drawing each curve from its distribution in a game yet to start."""
+    def __init__(self, talbot=False, rng=random):
+        self.samplers = {c: curves.pmf(c, talbot).sampler(rng) for c in (1, 2, 3, 4, 5, 6, 8)}
+
+    def random(self, curve):
+        return self.samplers[curve].random()
+
+
+class _Node:
+
+    __slots__ = ['visits', 'counts', 'totals']
+
+    def __init__(self):
+        self.visits = 0
+        self.counts = [0] * len(PLANS)
+        self.totals = [0.0] * len(PLANS)
+
+    def select(self):
+        """The plan to try next: each plan once, then by UCT."""
+        if self.visits < len(PLANS):
+            return self.visits
+        scale = EXPLORATION * math.sqrt(math.log(self.visits))
+        return max(range(len(PLANS)),
+                   key=lambda a: self.totals[a] / self.counts[a] + scale / math.sqrt(self.counts[a]))
+
+    def update(self, a, value):
+        self.visits    += 1
+        self.counts[a] += 1
+        self.totals[a] += value
+
+
+def _key(game):
+    """The state of the game, less the report, which makes no difference to what happens next."""
+    return game.snapshot()[:10]
+
+
+def _value(game):
+    """How well a game that's still going is doing, from 0 to 1: a half for a dukedom of the starting size."""
+    size = (game.land / 600) * (game.peasants / 100)
+    return size / (1 + size)
+
+
+ENDINGS = {'retirement': 1, 'victory': 1}
+
+
+class Search:
+
+    """A tree search, whose table is kept from one search to the next."""
+    def __init__(self, talbot=False, horizon=HORIZON, seed=None):
+        self.horizon = horizon
+        self.table   = {}
+        self.scratch = dukedom.GameState(Prior(talbot, random.Random(seed)))
+
+    def run(self, snapshot, deadline):
+        """Search from the state in snapshot until time.monotonic() reaches deadline, returning the number of
+        times each plan was tried from it and the total of their values."""
+        game = self.scratch
+        game.restore(snapshot)
+        # Forget the states of years gone by.
+        self.table = {k: v for k, v in self.table.items() if k[3] >= game.year}
+        root = self.table.setdefault(_key(game), _Node())
+        while time.monotonic() < deadline:
+            game.restore(snapshot)
+            self._iterate(game, deadline)
+        return root.counts, root.totals
+
+    def _iterate(self, game, deadline):
+        """Play a game on from the root to the horizon and count its value, unless the time is up first."""
+        path, depth = [], 0
+        try:
+            while True:
+                key  = _key(game)
+                node = self.table.get(key)
+                if node is None:
+                    self.table[key] = _Node()
+                    value = self._rollout(game, depth, deadline)
+                    break
+                if depth >= self.horizon:
+                    value = _value(game)
+                    break
+                if time.monotonic() >= deadline:
+                    return
+                a = node.select()
+                path.append((node, a))
+                play(game, PLANS[a])
+                depth += 1
+        except dukedom.EndGame as e:
+            value = ENDINGS.get(e.reason, 0)
+        except ZeroDivisionError:
+            value = 0
+        if value is None:
+            return
+        for node, a in path:
+            node.update(a, value)
+
+    def _rollout(self, game, depth, deadline):
+        """The value of playing ROLLOUT to the horizon, or None if the time is up first."""
+        for _ in range(depth, self.horizon):
+            if time.monotonic() >= deadline:
+                return None
+            play(game, ROLLOUT)
+        return _value(game)
+
+
+_search  = None
+_barrier = None
+
+
+def _start_worker(talbot, horizon, barrier):
+    global _search, _barrier
+    _search, _barrier = Search(talbot, horizon), barrier
+
+
+def _run(job):
+    """Search in this worker, once every worker has a job (so that no worker takes two), or return None if they
+    don't all have one by the deadline."""
+    snapshot, deadline = job
+    try:
+        _barrier.wait(max(0.0, deadline - time.monotonic()))
+    except threading.BrokenBarrierError:
+        return None
+    return _search.run(snapshot, deadline)
+
+
+class Advisor:
+
+    """Advice for each year, searched for budget seconds in processes processes. Playing with the Talbot
+    distributions, talbot should be True."""
+    def __init__(self, budget=BUDGET, processes=1, talbot=False, horizon=HORIZON, seed=None):
+        self.budget    = budget
+        self.processes = processes
+        self.pool = None
+        if processes > 1:
+            self.barrier = multiprocessing.Barrier(processes)
+            self.pool = concurrent.futures.ProcessPoolExecutor(processes, initializer=_start_worker,
+                                                               initargs=(talbot, horizon, self.barrier))
+            # Start the workers now, rather than in the first piece of advice.
+            for x in [self.pool.submit(time.sleep, 0.05) for _ in range(processes)]:
+                x.result()
+        else:
+            self.search = Search(talbot, horizon, seed)
+
+    def advise(self, game):
+        """The best plan for the year, from the state at the start of it."""
+        deadline = time.monotonic() + self.budget - MARGIN
+        job = (game.snapshot(), deadline)
+        if self.pool:
+            results = [x for x in self.pool.map(_run, [job] * self.processes) if x is not None]
+            if len(results) < self.processes:
+                self.barrier.reset()
+        else:
+            results = [self.search.run(*job)]
+        if not results:
+            return PLANS[0]
+        counts = [sum(x) for x in zip(*[counts for counts, _ in results])]
+        totals = [sum(x) for x in zip(*[totals for _, totals in results])]
+        best = max(range(len(PLANS)), key=lambda a: (counts[a], totals[a]))
+        return PLANS[best]
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,221 @@
+'''Check Dukedom's random number generators against the exact distributions of its curves, and time them.
+
+Each generator is sampled for each curve, one draw from each of many new games, so that the draws should follow
+curves.pmf(curve) (for Talbot's generators, curves.pmf(curve, talbot=True)). The vectorised generators in
+batch.py draw tens of millions of samples a curve a block at a time; the scalar ones in dukedom.py, a draw at a
+time, far fewer. Each sample is compared with its exact distribution by Pearson's chi-square test (merging the
+values too unlikely to be expected five times) and by the Kolmogorov-Smirnov distance, the largest difference
+between the sample's cumulative distribution and the exact one. A generator that draws what curves.py says it
+does gets p-values spread evenly over [0, 1], and a distance that shrinks with the square root of the samples.
+
+It also compares each curve as the Gaussian generators draw it with the curve Talbot's generator draws (the
+curves the module docstring of dukedom describes, such as a yield of 2 to 12 before the 9 is added), and gives
+the chance of a draw from curve 8 of -1, which is the chance of outbreak of zero that the TODO in dukedom
+mentions (see year()). Finally it times each generator drawing from games that have begun, in samples a second:
+
+    $ python3 dukedom/calibration.py --samples 10000000
+    curve 1           samples   mean  exact  range   exact    chi2  dof       p      KS  Talbot KS
+    batch.Gaussian   10000000  6.386  6.386  1..10   1..10     9.0    9   0.439  0.0001      0.051
+    ...
+
+All four generators draw what curves.py says they do. The Gaussian curves run one lower than Talbot's at both
+ends, as their offset is clamped to [-3, 2] where fnr(-2, 2) gives -2 to 3, and their means are about 0.11
+lower; the drawing of curve 1 isn't what puts the land price off.
+
+The chi-square p-value is computed here with the regularised incomplete gamma function, as SciPy isn't a
+dependency.
+'''
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+import batch
+import curves
+import dukedom
+
+
+SAMPLES        = 10 ** 7
+SCALAR_SAMPLES = 10 ** 5
+BLOCK          = 10 ** 6
+CURVES         = [1, 2, 3, 4, 5, 6, 8] # Curve 7 is never drawn from
+
+# The generators, by name, and whether each draws Talbot's curves.
+GENERATORS = {
+    'batch.Gaussian':  False,
+    'batch.Talbot':    True,
+    'Gaussian':        False,
+    'Talbot':          True,
+    'Buffered':        False,
+    'Buffered Talbot': True}
+
+VECTORISED = ['batch.Gaussian', 'batch.Talbot']
+
+
+def sample(generator, curve, n, seed=0):
+    """n draws from curve, each from a new game, as a NumPy array."""
+    if generator in VECTORISED:
+        cls = batch.Talbot if GENERATORS[generator] else batch.Gaussian
+        rng = np.random.default_rng(seed)
+        blocks = []
+        for start in range(0, n, BLOCK):
+            size = min(BLOCK, n - start)
+            blocks.append(cls(size, rng).random(curve, np.arange(size)))
+        return np.concatenate(blocks) if blocks else np.zeros(0, dtype=int)
+    if generator in ('Gaussian', 'Talbot'):
+        cls = dukedom.Talbot if GENERATORS[generator] else dukedom.Gaussian
+        rng = random.Random(seed)
+        return np.array([cls(rng).random(curve) for _ in range(n)])
+    raise ValueError('{} draws from a game a block at a time, so is only timed'.format(generator))
+
+
+def rate(generator, curve, n, seed=0):
+    """Samples a second drawn from curve by a generator in games already begun (n games at once, for the
+    vectorised generators, otherwise n draws from one)."""
+    talbot = GENERATORS[generator]
+    if generator in VECTORISED:
+        games = (batch.Talbot if talbot else batch.Gaussian)(n, np.random.default_rng(seed))
+        index = np.arange(n)
+        start = time.perf_counter()
+        games.random(curve, index)
+        return n / (time.perf_counter() - start)
+    if generator in ('Gaussian', 'Talbot'):
+        game = (dukedom.Talbot if talbot else dukedom.Gaussian)(random.Random(seed))
+    else:
+        game = batch.Buffered(seed, talbot)
+    draw = game.random
+    start = time.perf_counter()
+    for _ in range(n):
+        draw(curve)
+    return n / (time.perf_counter() - start)
+
+
+def counts(draws):
+    """How many times each value was drawn, as a dict."""
+    values, counted = np.unique(draws, return_counts=True)
+    return dict(zip(values.tolist(), counted.tolist()))
+
+
+def chi_square(counted, pmf):
+    """Pearson's chi-square statistic, its degrees of freedom and its p-value, for counts of draws from a
+    distribution. Values expected fewer than five times are merged with their neighbours; a value the
+    distribution can't take makes the statistic infinite."""
+    n = sum(counted.values())
+    if any(not pmf[x] for x in counted):
+        return math.inf, 0, 0.0
+    bins, observed, expected = [], 0, 0.0
+    for x, p in pmf.items():
+        observed += counted.get(x, 0)
+        expected += float(p) * n
+        if expected >= 5:
+            bins.append([observed, expected])
+            observed, expected = 0, 0.0
+    if bins:
+        bins[-1][0] += observed
+        bins[-1][1] += expected
+    statistic = sum((o - e) ** 2 / e for o, e in bins)
+    dof = len(bins) - 1
+    return statistic, dof, gammaq(dof / 2, statistic / 2) if dof else 1.0
+
+
+def ks(counted, pmf):
+    """The Kolmogorov-Smirnov distance between counts of draws and a distribution."""
+    n = sum(counted.values())
+    seen, distance = 0, 0.0
+    for x in sorted(set(counted) | set(pmf.values)):
+        seen += counted.get(x, 0)
+        distance = max(distance, abs(seen / n - float(pmf.cdf(x))))
+    return distance
+
+
+def distance(a, b):
+    """The Kolmogorov-Smirnov distance between two distributions."""
+    return max(abs(float(a.cdf(x)) - float(b.cdf(x))) for x in set(a.values) | set(b.values))
+
+
+def gammaq(a, x):
+    """The regularised upper incomplete gamma function Q(a, x), by its series for x < a + 1 and its continued
+    fraction otherwise."""
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        for k in range(1, 1000):
+            term *= x / (a + k)
+            total += term
+            if term < total * 1e-15:
+                break
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    # Lentz's method
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def calibrate(generator, curve, n, seed=0):
+    """The statistics of n samples of curve from generator, as a dict."""
+    talbot  = GENERATORS[generator]
+    exact   = curves.pmf(curve, talbot)
+    counted = counts(sample(generator, curve, n, seed))
+    statistic, dof, p = chi_square(counted, exact)
+    return {'samples': n,
+            'mean':    sum(x * k for x, k in counted.items()) / n,
+            'exact':   float(exact.mean()),
+            'range':   (min(counted), max(counted)),
+            'exact range': (exact.values[0], exact.values[-1]),
+            'chi2':    statistic,
+            'dof':     dof,
+            'p':       p,
+            'KS':      ks(counted, exact),
+            'Talbot KS': distance(exact, curves.pmf(curve, talbot=True))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibrate the random number generators of Dukedom.')
+    parser.add_argument('--samples', type=int, default=SAMPLES, help='for each curve from the vectorised generators')
+    parser.add_argument('--scalar-samples', type=int, default=SCALAR_SAMPLES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    row = '{:<16}{:>9}{:>7.3f}{:>7.3f}{:>7}{:>8}{:>8.1f}{:>5}{:>8.3f}{:>8.4f}{:>11.3f}'
+    for curve in CURVES:
+        print('curve {:<10}{:>9}{:>7}{:>7}{:>7}{:>8}{:>8}{:>5}{:>8}{:>8}{:>11}'.format(
+            curve, 'samples', 'mean', 'exact', 'range', 'exact', 'chi2', 'dof', 'p', 'KS', 'Talbot KS'))
+        for generator in ['batch.Gaussian', 'batch.Talbot', 'Gaussian', 'Talbot']:
+            n = args.samples if generator in VECTORISED else args.scalar_samples
+            s = calibrate(generator, curve, n, args.seed)
+            print(row.format(generator, n, s['mean'], s['exact'], '{}..{}'.format(*s['range']),
+                             '{}..{}'.format(*s['exact range']), s['chi2'], s['dof'], s['p'], s['KS'],
+                             s['Talbot KS']))
+        print()
+
+    print('Chance of a draw from curve 8 of -1 (a chance of outbreak of zero): Gaussian {:.5f}, Talbot {:.5f}'.format(
+        curves.pmf(8)[-1], float(curves.pmf(8, talbot=True)[-1])))
+    print()
+    print('Samples a second, drawing from curve 2 in games begun:')
+    for generator in GENERATORS:
+        n = BLOCK if generator in VECTORISED else args.scalar_samples
+        print('  {:<16}{:>14,.0f}'.format(generator, rate(generator, 2, n, args.seed)))
+
+
+if __name__ == '__main__':
+    main()
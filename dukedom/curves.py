@@ -0,0 +1,178 @@
+'''The exact probability distributions of the eight curves that Dukedom's random numbers are drawn from.
+
+Both of the game's generators draw small integers, so the chance of each value can be worked out exactly rather
+than estimated by drawing from them many times:
+
+- Gaussian draws the mean of each curve once at the start of the game, as a normal number rounded and clamped to
+  a range, and then each draw from the curve is the mean plus a normal number rounded and clamped to [-3, 2].
+
+- Talbot's fnr(a, b) rounds a uniform number in [a, b + 1), so b + 1 - a values are equally likely, except for
+  a and b + 1 which are half as likely. The table entry that shifts each curve is r1 = fnr(a, b) if a second
+  draw fnr(a, b) is at most 5, and otherwise r1 and a third draw averaged and rounded (to even). Each draw from
+  the curve is fnr(-2, 2) plus the table entry.
+
+The Talbot distributions are Fractions; the Gaussian ones are floats, accurate to a few ulps:
+
+    >>> curves.table(5)
+    PMF({5: Fraction(7, 64), 6: Fraction(25, 32), 7: Fraction(7, 64)})
+    >>> curves.pmf(2, talbot=True).mean()
+    Fraction(6993, 1000)
+    >>> curves.pmf(2).cdf(6)
+    0.3982617698501727
+
+pmf() is the distribution of a draw from a curve in a game yet to start, averaged over the mean (or table
+entry) it will have; draw() is the distribution given the mean, as in a game that has begun. Within a game the
+draws from a curve aren't independent, since they share a mean. A PMF makes an Alias sampler, which draws from
+it in constant time:
+
+    >>> sampler = curves.pmf(8).sampler()
+    >>> sampler.random(), sampler.sample(1000, np.random.default_rng(1))
+
+The distributions are cached, so they shouldn't be changed. (The chance that a uniform float lands exactly on
+a rounding tie is ignored, which is at most 2**-50.)
+'''
+
+import bisect
+import collections
+import fractions
+import functools
+import itertools
+import math
+import random
+
+import numpy as np
+
+import batch
+
+
+class PMF:
+
+    """A probability mass function over integers, as a dict from each value to its probability."""
+    def __init__(self, probabilities):
+        self.values = sorted(x for x, p in probabilities.items() if p)
+        self.probabilities = [probabilities[x] for x in self.values]
+        self._cdf = list(itertools.accumulate(self.probabilities))
+
+    def __repr__(self):
+        return 'PMF({!r})'.format(dict(self.items()))
+
+    def __eq__(self, other):
+        return isinstance(other, PMF) and list(self.items()) == list(other.items())
+
+    def __getitem__(self, x):
+        i = bisect.bisect_left(self.values, x)
+        return self.probabilities[i] if i < len(self.values) and self.values[i] == x else 0
+
+    def items(self):
+        return zip(self.values, self.probabilities)
+
+    def cdf(self, x):
+        """The probability of a value of at most x."""
+        i = bisect.bisect_right(self.values, x)
+        return self._cdf[i-1] if i else 0
+
+    def mean(self):
+        return self.expect(lambda x: x)
+
+    def expect(self, f):
+        """The expected value of f of the value."""
+        return sum(p * f(x) for x, p in self.items())
+
+    def shift(self, k):
+        """The distribution of the value plus k."""
+        return PMF({x + k: p for x, p in self.items()})
+
+    def sampler(self, rng=random):
+        return Alias(self, rng)
+
+
+class Alias:
+
+    """Draws from a PMF in constant time with Vose's alias method, taking its uniform numbers from rng (the random
+    module by default), or for sample() from a NumPy Generator."""
+    def __init__(self, pmf, rng=random):
+        self.rng = rng
+        self.values = pmf.values
+        n = len(self.values)
+        scaled = [float(p) * n for p in pmf.probabilities]
+        self.accept = [1.0] * n
+        self.alias  = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.accept[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+
+    def random(self):
+        u = self.rng.random() * len(self.values)
+        i = int(u)
+        return self.values[i if u - i < self.accept[i] else self.alias[i]]
+
+    def sample(self, size, generator):
+        """size draws, as a NumPy array."""
+        u = generator.random(size) * len(self.values)
+        i = u.astype(int)
+        i = np.where(u - i < np.take(self.accept, i), i, np.take(self.alias, i))
+        return np.take(self.values, i)
+
+
+def mixture(components):
+    """The distribution of drawing from each of the PMFs in components, a list of (probability, PMF) pairs."""
+    probabilities = collections.defaultdict(int)
+    for weight, pmf in components:
+        for x, p in pmf.items():
+            probabilities[x] += weight * p
+    return PMF(probabilities)
+
+
+def rounded_normal(mean, dev, a, b):
+    """The distribution of a normal number rounded to an integer and clamped to [a, b]."""
+    def below(x):
+        return (1 + math.erf((x - mean) / (dev * math.sqrt(2)))) / 2
+    return PMF({k: (below(k + 0.5) if k < b else 1) - (below(k - 0.5) if k > a else 0) for k in range(a, b + 1)})
+
+
+def fnr(a, b):
+    """The distribution of Talbot.fnr(a, b)."""
+    n = b + 1 - a
+    return PMF({k: fractions.Fraction(2 if a < k <= b else 1, 2 * n) for k in range(a, b + 2)})
+
+
+@functools.lru_cache(maxsize=None)
+def mean(curve):
+    """The distribution of the mean of a Gaussian curve."""
+    if not batch.Gaussian.CURVES[curve-1]:
+        raise ValueError('Curve {} is never drawn from.'.format(curve))
+    return rounded_normal(*batch.Gaussian.CURVES[curve-1])
+
+
+@functools.lru_cache(maxsize=None)
+def table(curve):
+    """The distribution of the entry for curve in Talbot's table."""
+    a, b = batch.Talbot.PAIRS[curve-1]
+    r = fnr(a, b)
+    averaged = fractions.Fraction(1) - r.cdf(5)
+    probabilities = collections.defaultdict(int)
+    for r1, p1 in r.items():
+        probabilities[r1] += p1 * (1 - averaged)
+        for r3, p3 in r.items():
+            probabilities[int(round((r1 + r3) / 2))] += p1 * averaged * p3
+    return PMF(probabilities)
+
+
+OFFSET = {False: rounded_normal(0.5, 1.5, -3, 2), True: fnr(-2, 2)}
+
+
+@functools.lru_cache(maxsize=None)
+def draw(mean, talbot=False):
+    """The distribution of a draw from a curve, once its mean (or Talbot's table entry) is known."""
+    return OFFSET[talbot].shift(mean)
+
+
+@functools.lru_cache(maxsize=None)
+def pmf(curve, talbot=False):
+    """The distribution of a draw from curve in a game that hasn't started."""
+    means = table(curve) if talbot else mean(curve)
+    return mixture([(p, draw(m, talbot)) for m, p in means.items()])
@@ -46,85 +46,229 @@ Differences from the original
 TODO
 ----
 - Check the land price probability distribution / calc, it's way off.
-- Co-routines to separate UI and simulation logic?
 - Occasionally get pdfs producing 0 when they shouldn't: curve 8
 - What happened to curve 7 - not used?
 '''
 
 import argparse
+import array
 import collections
-from itertools import chain
+import copy
 import math
+import operator
+import os
 import random
-import textwrap
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--talbot', dest='talbot', action='store_true')
+    parser.add_argument('--advisor', dest='advisor', action='store_true',
+                        help='suggest an answer to each question, searching for a tenth of a second')
     args = parser.parse_args()
-    print('')
-    print('D U K E D O M')
-    print('')
-    show_report = prompt_key('Do you want to skip detailed reports?', 'yn') == 'n'
+    if args.advisor:
+        import advisor # Which imports this module
+        args.advisor = advisor.Advisor(talbot=args.talbot, processes=os.cpu_count() or 1)
+    terminal(session(args.talbot, advisor=args.advisor or None))
+
+
+# A line of input for the player to type, after being shown msg.
+Prompt = collections.namedtuple('Prompt', ['msg'])
+
+
+def terminal(conversation):
+    """Hold a conversation (a generator, such as session()) with the player at the terminal. The conversation
+    yields each line to show as a string, and a Prompt for each line the player types, which is sent back to
+    it. Nothing else in the game reads or writes the terminal, so the same conversation can be held over a
+    network (see arena/server.py), or with a script (see arena/channels.py)."""
+    line = None
+    while True:
+        try:
+            x = conversation.send(line)
+        except StopIteration:
+            return
+        if type(x) is Prompt:
+            line = input(x.msg)
+        else:
+            print(x)
+            line = None
+
+
+def session(use_talbot, rng=random, advisor=None, log=None):
+    """The whole conversation with a player, from the title to not playing again."""
+    yield ''
+    yield 'D U K E D O M'
+    yield ''
+    show_report = (yield from prompt_key('Do you want to skip detailed reports?', 'yn')) == 'n'
     while True:
         try:
-            dukedom(show_report, args.talbot)
+            yield from conversation(show_report, use_talbot, rng, advisor, log)
         except EndGame as e:
-            print(e)
-        if prompt_key('Do you wish to play again?', 'yn') == 'n':
+            yield str(e)
+        if (yield from prompt_key('Do you wish to play again?', 'yn')) == 'n':
             break
 
 
 class GameReport:
 
+    """The figures for the year's detailed report, in the order they're shown, as an array of integers. Each
+    figure is recorded by its index, which is a constant of the class named after it (STARVATIONS, ROYAL_TAX and
+    so on), or by its label."""
+    __slots__ = ['_data']
+
+    STATS = [
+        ('Peasants at start',    96  ),
+        ('Starvations',          0   ),
+        ('King\'s levy',         0   ),
+        ('War casualties',       0   ),
+        ('Looting victims',      0   ),
+        ('Disease victims',      0   ),
+        ('Natural deaths',      -4   ),
+        ('Births',               8   ),
+        ('Peasants at end',      100 ),
+
+        ('Land at start',        600 ),
+        ('Bought/sold',          0   ),
+        ('Annexed land',         0   ),
+        ('Land at end of year',  600 ),
+
+        ('Grain at start',       5193),
+        ('Used for food',       -1344),
+        ('Land deals',           0   ),
+        ('Seeding',             -768 ),
+        ('Rat losses',           0   ),
+        ('Mercenary hire',       0   ),
+        ('Captured grain',       0   ),
+        ('Crop yield',           1516),
+        ('Castle expense',      -120 ),
+        ('Royal tax',           -300 ),
+        ('Grain at end of year', 4177)]
+
+    LABELS = [label for label, _ in STATS]
+    INDEX  = {label: i for i, label in enumerate(LABELS)}
+
+    (PEASANTS_AT_START, STARVATIONS, KINGS_LEVY, WAR_CASUALTIES, LOOTING_VICTIMS, DISEASE_VICTIMS, NATURAL_DEATHS,
+     BIRTHS, PEASANTS_AT_END, LAND_AT_START, BOUGHT_SOLD, ANNEXED_LAND, LAND_AT_END, GRAIN_AT_START, USED_FOR_FOOD,
+     LAND_DEALS, SEEDING, RAT_LOSSES, MERCENARY_HIRE, CAPTURED_GRAIN, CROP_YIELD, CASTLE_EXPENSE, ROYAL_TAX,
+     GRAIN_AT_END) = range(24)
+
+    ZERO_EACH_YEAR = [STARVATIONS, KINGS_LEVY, DISEASE_VICTIMS, BOUGHT_SOLD, LAND_DEALS, RAT_LOSSES, CASTLE_EXPENSE,
+                      WAR_CASUALTIES, LOOTING_VICTIMS, ANNEXED_LAND, CAPTURED_GRAIN, ROYAL_TAX]
+
     def __init__(self):
-        self._data = collections.OrderedDict([
-            ('Peasants at start',    96  ),
-            ('Starvations',          0   ),
-            ('King\'s levy',         0   ),
-            ('War casualties',       0   ),
-            ('Looting victims',      0   ),
-            ('Disease victims',      0   ),
-            ('Natural deaths',      -4   ),
-            ('Births',               8   ),
-            ('Peasants at end',      100 ),
-
-            ('Land at start',        600 ),
-            ('Bought/sold',          0   ),
-            ('Annexed land',         0   ),
-            ('Land at end of year',  600 ),
-
-            ('Grain at start',       5193),
-            ('Used for food',       -1344),
-            ('Land deals',           0   ),
-            ('Seeding',             -768 ),
-            ('Rat losses',           0   ),
-            ('Mercenary hire',       0   ),
-            ('Captured grain',       0   ),
-            ('Crop yield',           1516),
-            ('Castle expense',      -120 ),
-            ('Royal tax',           -300 ),
-            ('Grain at end of year', 4177)])
+        self._data = array.array('q', [x for _, x in self.STATS])
 
     def record(self, stat, x):
-        self._data[stat] = x
-
-    ZERO_EACH_YEAR = ['Starvations', 'King\'s Levy', 'Disease victims', 'Bought/sold',
-                      'Land deals', 'Rat losses', 'Castle expense', 'War casualties',
-                      'Looting victims', 'Annexed land', 'Captured grain', 'Royal tax']
+        self._data[stat if type(stat) is int else self.INDEX[stat]] = x
 
     def reset(self):
-        for x in self.ZERO_EACH_YEAR:
-            self._data[x] = 0
+        data = self._data
+        for i in self.ZERO_EACH_YEAR:
+            data[i] = 0
+
+    def copy(self):
+        report = GameReport.__new__(GameReport)
+        report._data = self._data[:]
+        return report
+
+    def __getitem__(self, stat):
+        return self._data[stat if type(stat) is int else self.INDEX[stat]]
 
     def __iter__(self):
-        return iter(self._data.items())
+        return zip(self.LABELS, self._data)
+
+
+class Buckets(list):
+
+    """The land by fertility: 100%, 80%, 60%, 40%, 20% and depleted, as a list of six numbers of hectares. The
+    year's changes to it are made in place, with the same results as allocate() gives: sell() takes land sold from
+    the good land, 60% first; sow() plants and rotates the land, depleting what was sown by a bucket and letting the
+    fallow recover; annex() shares land won between the good land; and lose() takes land lost from it in proportion.
+    (batch.py has the same for many games at once, as an array of six columns.)"""
+    __slots__ = []
+
+    # The share of a full crop that a hectare sown in each bucket yields.
+    YIELDS = [1.0 - (0.2 * i) for i in range(5)]
+
+    def copy(self):
+        return Buckets(self)
+
+    def good(self):
+        """The good land (60% fertility or more), which is all that can be sold."""
+        return self[0] + self[1] + self[2]
+
+    def sell(self, sold):
+        """Take land sold from the good land, starting with the 60% land and working up to the 100%."""
+        b0, b1, b2 = self[0], self[1], self[2]
+        x2 = min(sold, b2)
+        sold = max(sold - x2, 0)
+        x1 = min(sold, b1)
+        sold = max(sold - x1, 0)
+        x0 = min(sold, b0)
+        self[0], self[1], self[2] = b0 - x0, b1 - x1, b2 - x2
+
+    def sow(self, farmed):
+        """Sow farmed hectares, the most fertile first, and rotate the land for next year. Returns the area sown
+        weighted by its fertility."""
+        b0, b1, b2, b3, b4, b5 = self
+        s0 = min(farmed, b0)
+        farmed = max(farmed - s0, 0)
+        s1 = min(farmed, b1)
+        farmed = max(farmed - s1, 0)
+        s2 = min(farmed, b2)
+        farmed = max(farmed - s2, 0)
+        s3 = min(farmed, b3)
+        farmed = max(farmed - s3, 0)
+        s4 = min(farmed, b4)
+        farmed = max(farmed - s4, 0)
+        s5 = min(farmed, b5)
+        w0, w1, w2, w3, w4 = self.YIELDS
+        weighted = 0 + s0 * w0 + s1 * w1 + s2 * w2 + s3 * w3 + s4 * w4
+        # What was sown drops a bucket; the fallow good land recovers fully, and the rest by a bucket.
+        self[:] = ((b0 - s0) + (b1 - s1) + (b2 - s2), s0 + (b3 - s3), s1 + (b4 - s4), s2 + (b5 - s5), s3, s4 + s5)
+        return weighted
+
+    def annex(self, annexed):
+        """Share land won equally between the buckets of good land."""
+        x0 = round(annexed / 3)
+        annexed -= x0
+        x1 = round(annexed / 2)
+        annexed -= x1
+        self[0] += x0
+        self[1] += x1
+        self[2] += annexed
+
+    def lose(self, lost):
+        """Take land lost from the good land, a bucket at a time, no more than its share of what's left."""
+        b0, b1, b2 = self[0], self[1], self[2]
+        x0 = min(lost, round(b0 / 3))
+        lost = max(lost - x0, 0)
+        x1 = min(lost, round(b1 / 2))
+        lost = max(lost - x1, 0)
+        x2 = min(lost, b2)
+        self[0], self[1], self[2] = b0 - x0, b1 - x1, b2 - x2
 
 
 class GameState:
 
-    def __init__(self):
+    """The state of a dukedom between years. copy() is a quick copy for playing ahead from a state, which shares
+    the distributions (and so the random number generator) with the original; fork() also gives the copy its own
+    distributions, whose generator starts in the same state, so the copy plays out just as the original would.
+
+    snapshot() is the state as a flat tuple, which restore() writes back over a GameState. It doesn't include the
+    distributions unless rng is true, which adds their state (including that of the random number generator):
+
+        >>> before = game.snapshot(rng=True)
+        >>> step(game, decisions)
+        >>> game.restore(before)
+        >>> step(game, decisions)  # Plays the same year again, with the same draws
+
+    A snapshot and restore without the generator take well under a microsecond; the state of a Mersenne Twister is
+    625 numbers, so capturing it costs a few microseconds more."""
+    __slots__ = ['peasants', 'grain', 'land', 'year', 'crop_yield', 'cool_down', 'resentment', 'unrest', 'king',
+                 'buckets', 'report', 'distributions']
+
+    def __init__(self, distributions=None, rng=random):
         self.peasants = 100
         self.grain    = 4177 # Hectolitres
         self.land     = 600  # Hectares
@@ -132,386 +276,690 @@ class GameState:
         self.crop_yield = 3.95
         self.cool_down  = 0
         self.resentment = 0 # long_term resentment trend
-        self.buckets = [216, 200, 184, 0, 0, 0] # 100%, 80%, 60%, 40%, 20% and depleted land.
-
-
-def dukedom(show_report, use_talbot):
+        self.unrest     = 0 # resentment built up over the last year
+        self.king       = 0 # 1: the King is plotting, 2: double tax paid, -1: refused to pay, -2: at war
+        self.buckets = Buckets([216, 200, 184, 0, 0, 0]) # 100%, 80%, 60%, 40%, 20% and depleted land.
+        self.report  = GameReport()
+        self.distributions = distributions if distributions else Gaussian(rng)
+
+    def copy(self):
+        game = GameState.__new__(GameState)
+        game.peasants, game.grain, game.land, game.year = self.peasants, self.grain, self.land, self.year
+        game.crop_yield, game.cool_down, game.resentment = self.crop_yield, self.cool_down, self.resentment
+        game.unrest, game.king, game.distributions = self.unrest, self.king, self.distributions
+        game.buckets = Buckets(self.buckets)
+        game.report  = self.report.copy()
+        return game
+
+    def fork(self):
+        game = self.copy()
+        game.distributions = self.distributions.fork()
+        return game
+
+    def snapshot(self, rng=False):
+        state = (self.peasants, self.grain, self.land, self.year, self.crop_yield, self.cool_down, self.resentment,
+                 self.unrest, self.king, tuple(self.buckets), self.report._data.tobytes())
+        if rng:
+            state += (self.distributions.getstate(),)
+        return state
+
+    def restore(self, snapshot):
+        (self.peasants, self.grain, self.land, self.year, self.crop_yield, self.cool_down, self.resentment,
+         self.unrest, self.king, buckets, report) = snapshot[:11]
+        self.buckets = Buckets(buckets)
+        self.report._data = array.array('q', report)
+        if len(snapshot) > 11:
+            self.distributions.setstate(snapshot[11])
+
+
+def dukedom(show_report, use_talbot, rng=random, advisor=None, log=None):
+    """Play a game at the terminal. With an advisor (an advisor.Advisor), each question comes with the answer
+    it suggests, and with a log (see step) the game is recorded in it."""
+    terminal(conversation(show_report, use_talbot, rng, advisor, log))
+
+
+def conversation(show_report, use_talbot, rng=random, advisor=None, log=None):
+    """The conversation with the player for a game (see terminal()), which ends by raising EndGame."""
     if use_talbot:
-        distributions = Talbot()
+        distributions = Talbot(rng)
     else:
-        distributions = Gaussian()
+        distributions = Gaussian(rng)
 
-    report = GameReport()
-    game   = GameState()
-    resentment = 0
-    king = 0
+    game = GameState(distributions)
 
     while True:
-        report.record('Peasants at end',      game.peasants)
-        report.record('Land at end of year',  game.land)
-        report.record('Grain at end of year', game.grain)
-
-        print('\nYear {} Peasants {} Land {} Grain {}\n'.format(game.year, game.peasants, game.land, game.grain))
-        if show_report:
-            def group(it, n):
-                for _ in range(n):
-                    label, x = next(it)
-                    if x:
-                        print('  {:<22}{}'.format(label, x))
-                print('')
-            stats = iter(report)
-            group(stats, 9)
-            group(stats, 4)
-            print('  100%  80%  60%  40%  20%  Depl')
-            print(('  ' + '{:>5}'*6).format(*game.buckets), '\n')
-            group(stats, 11)
-            if game.year <= 0:
-                print('(Severe crop damage due to seven year locusts.)\n')
-
-        # We start off in game year 0 for the first report. This is presumably to show continuity with
-        # whoever was running the dukedom before, and add history to the game world.
-        game.year = game.year + 1
-        tax  = 0
-        levy = 0
-
-        # Test for end game
-        if game.peasants < 33:
-            raise EndGame('pop loss')
-        if game.land < 200:
-            raise EndGame('land loss')
-        if resentment > 88 or game.resentment > 99 or game.grain < 429:
-            raise EndGame('deposed')
-        if game.year > 45 and king == 0:
-            raise EndGame('retirement')
-
-        resentment = 0
-        if king > 0:
-            pay_tax = prompt_key('The King demands twice the royal tax in\n'
-                                 'THE HOPE TO PROVOKE WAR. WILL YOU PAY?', 'yn')
-            if pay_tax == 'y':
-                king = 2
+        yield from report(game, show_report)
+        plan   = advisor.advise(game) if advisor else None
+        play   = year(game) if log is None else logged_year(game, log)
+        answer = None
+        while True:
+            try:
+                x = play.send(answer)
+            except StopIteration:
+                break
+            if type(x) is Question:
+                if plan:
+                    suggestion = plan.answer(game, x)
+                    if type(suggestion) is bool:
+                        suggestion = 'y' if suggestion else 'n'
+                    yield '(The advisor suggests {})'.format(suggestion)
+                answer = yield from ask(x)
             else:
-                king = -1
+                yield MESSAGES[x.name].format(*x.args)
+                answer = None
+
+
+def report(game, detailed=True):
+    """The lines of the summary of the year just gone, and of the detailed report unless detailed is False."""
+    yield '\nYear {} Peasants {} Land {} Grain {}\n'.format(game.year, game.peasants, game.land, game.grain)
+    if detailed:
+        def group(it, n):
+            for _ in range(n):
+                label, x = next(it)
+                if x:
+                    yield '  {:<22}{}'.format(label, x)
+            yield ''
+        stats = iter(game.report)
+        yield from group(stats, 9)
+        yield from group(stats, 4)
+        yield '  100%  80%  60%  40%  20%  Depl'
+        yield ('  ' + '{:>5}'*6).format(*game.buckets) + ' \n'
+        yield from group(stats, 11)
+        if game.year <= 0:
+            yield '(Severe crop damage due to seven year locusts.)\n'
+
+
+def ask(question):
+    """Put a question from the simulation to the player."""
+    msg = PROMPTS[question.name].format(*question.args)
+    if not question.valid:
+        return (yield from prompt_key(msg, 'yn')) == 'y'
+    if question.name == 'sell':
+        try:
+            return (yield from prompt_int(msg, question.valid, limit=3))
+        except LimitExceeded:
+            yield 'Buyers have lost interest.'
+            return 0
+    return (yield from prompt_int(msg, question.valid))
+
+
+PROMPTS = {
+    'pay_tax':      'The King demands twice the royal tax in\n'
+                    'THE HOPE TO PROVOKE WAR. WILL YOU PAY?',
+    'food':         'Grain for food = ',
+    'buy':          'Land to buy at {0} HL./HA. = ',
+    'sell':         'Land to sell at {0} HL./HA. = ',
+    'plant':        'Land to be planted = ',
+    'supply_levy':  'The king requires {0} peasants for\n'
+                    'his estate and mines. Will you supply\n'
+                    'them? (Y)es or pay {1} HL. of\n'
+                    'grain instead (N)o?',
+    'attack_first': 'Will you attack first?',
+    'mercs':        'How many mercenaries will you hire at 40HL. each = '}
+
+
+MESSAGES = {
+    'demonstration':       'The peasants demonstrate before the castle.',
+    'starvation':          'Some peasants have starved',
+    'appropriation':       'The High King appropriates half of your earnings\n'
+                           'as punishment for selling at such a low price.',
+    'king_attacks':        'The King\'s army is about to attack your duchy.\n'
+                           'At 100HL each (pay in advance) you have hired\n'
+                           '{0} foreign mercenaries.',
+    'locusts':             'Seven year locusts.',
+    'crop_yield':          'Yield = {0} HL/HA.',
+    'rats':                'Rats infest the grainery',
+    'king_mobilises':      'The High King calls for peasant levies\n'
+                           'and hires many foreign mercenaries.',
+    'war_threat':          'A nearby Duke threatens war.',
+    'ceasefire':           'Peace negotiations successful',
+    'first_strike_failed': 'First strike failed - you need professionals.',
+    'overran_enemy':       'You have overrun the enemy and annexed\n'
+                           'his entire dukedom.',
+    'king_fears':          '\nThe King fears for his throne and\n'
+                           'may be planning direct action.',
+    'won_war':             'You have won the war.',
+    'lost_war':            'You have lost the war.',
+    'unpaid_mercenaries':  'There isn\'t enough grain to pay the mercenaries.',
+    'plague':              'The BLACK PLAGUE has struck the area',
+    'pox':                 'A POX EPIDEMIC has broken out'}
+
+
+class Decisions:
+
+    """A fixed set of decisions for one year of the dukedom, for playing the game headlessly with step().
+
+        - food:         grain per peasant if 100 or less, otherwise the total grain to give (as at the prompt).
+        - buy, sell:    hectares of land to buy, or to sell if none is bought.
+        - plant:        hectares of land to plant.
+        - pay_tax:      whether to pay the King's doubled tax when he demands it.
+        - supply_levy:  whether to supply peasants to the King's levy, rather than pay in grain.
+        - attack_first: whether to strike first when a neighbouring Duke threatens war.
+        - mercs:        the number of mercenaries to hire if it comes to war.
+    """
+    def __init__(self, food=0, buy=0, sell=0, plant=0, pay_tax=True, supply_levy=True, attack_first=False, mercs=0):
+        self.food  = food
+        self.buy   = buy
+        self.sell  = sell
+        self.plant = plant
+        self.pay_tax      = pay_tax
+        self.supply_levy  = supply_levy
+        self.attack_first = attack_first
+        self.mercs = mercs
 
-        report.record('Peasants at start', game.peasants)
-        report.record('Grain at start',    game.grain)
-        report.record('Land at start',     game.land)
-        report.reset()
+# The values of a set of decisions, in the order of the arguments of Decisions.
+_decided = operator.attrgetter(*vars(Decisions()))
 
-        # Feed the peasants
-        @validate_input
-        def valid_food(x):
-            if x > 100:
-                if x > game.grain:
-                    raise NotEnoughGrain(game.grain)
-            elif (x * game.peasants) > game.grain:
-                raise NotEnoughGrain(game.grain)
 
-        food = prompt_int('Grain for food = ', valid_food)
+# Something that happened during the year that the Duke should be told about.
+Event = collections.namedtuple('Event', ['name', 'args'], defaults=[()])
 
-        # User can enter a number under 100 which represents food per peasant to give,
-        # or a number over 100 which represents the total amount of food to give.
-        if food > 100:
-            food_per_capita = int(food / game.peasants)
-        else:
-            food_per_capita = food
-            food = food * game.peasants
+# A decision for the Duke. valid checks an integer answer, and is None for yes/no questions.
+Question = collections.namedtuple('Question', ['name', 'args', 'valid'], defaults=[(), None])
 
-        if food_per_capita < 11 and food != game.grain:
-            print('The peasants demonstrate before the castle.')
 
-        game.grain -= food
-        report.record('Used for food', -food)
+def step(game, decisions, log=None):
+    """Play one year of the dukedom with a fixed set of decisions and no terminal I/O.
 
-        starved = 0
-        overfed = 0
-        if food_per_capita < 13:
-            starved = game.peasants - int(food / 13)
-            game.peasants  -= starved
-            print('Some peasants have starved')
-            report.record('Starvations', -starved)
-        overfed = min(4, food_per_capita - 14)
-        resentment += (3 * starved) - (2 * overfed)
+    Returns the game, which is updated in place, and the list of events that happened during the year.
+    Raises EndGame if the game ends, or InvalidInput (or ValueError) if one of the decisions isn't allowed.
+    With a log (anything with a write method, such as an arena eventlog.Writer) the year is recorded in it, and
+    only the decisions if the log's brief attribute is true (see arena/eventlog.py).
+    """
+    if log is not None:
+        if getattr(log, 'brief', False):
+            return _brief_step(game, decisions, log)
+        return _logged_step(game, decisions, log)
+    events = []
+    play   = year(game)
+    answer = None
+    while True:
+        try:
+            x = play.send(answer)
+        except StopIteration:
+            return game, events
+        if type(x) is Question:
+            answer = getattr(decisions, x.name)
+            if x.valid:
+                answer = x.valid(answer)
+        else:
+            events.append(x)
+            answer = None
+
+
+def _brief_step(game, decisions, log):
+    """step() with a brief log, keeping the decisions whole rather than each answer and draw as it comes."""
+    if game.year == 0:
+        log.write(('dukedom start', game.snapshot()))
+    end = 'abandoned' # Over a decision that isn't allowed, unless the year finishes
+    try:
+        played = step(game, decisions)
+        end = None
+        return played
+    except EndGame as e:
+        end = e.reason
+        raise
+    except ZeroDivisionError:
+        end = 'error'
+        raise
+    finally:
+        log.write(('dukedom year', game.year, _decided(decisions), None, None, None, end))
+
+
+def _logged_step(game, decisions, log):
+    """step() with a log, recording the year as logged_year() does, without a generator in between."""
+    answers, events = [], []
+    draws   = _start_record(game, log)
+    figures = None
+    end     = 'abandoned' # Over an answer that isn't allowed, unless the year finishes
+    try:
+        play   = year(game)
+        answer = None
+        while True:
+            try:
+                x = play.send(answer)
+            except StopIteration:
+                figures, end = game.report._data.tobytes(), None
+                return game, events
+            if type(x) is Question:
+                answer = getattr(decisions, x.name)
+                if x.valid:
+                    answer = x.valid(answer)
+                answers.append((x.name, answer))
+            else:
+                events.append(x)
+                answer = None
+    except EndGame as e:
+        end = e.reason
+        raise
+    except ZeroDivisionError:
+        end = 'error'
+        raise
+    finally:
+        _end_record(game, log, answers, draws, events, figures, end)
+
+
+def play(game, player, log=None):
+    """Play game to its end with no terminal I/O, player answering each Question as it comes up.
+
+    player is anything with an answer(game, question) method, like an advisor.Plan, that returns the answer to
+    the question given the state of the game at the time (arena/players.py has some). Returns the reason the game
+    ended (see EndGame), or raises InvalidInput (or ValueError) if an answer isn't allowed. log is as for step().
+    """
+    answer = player.answer
+    try:
+        while True:
+            years = year(game) if log is None else logged_year(game, log)
+            try:
+                x = next(years)
+                while True:
+                    if type(x) is Question:
+                        x = years.send(x.valid(answer(game, x)) if x.valid else answer(game, x))
+                    else:
+                        x = next(years)
+            except StopIteration:
+                pass
+    except EndGame as e:
+        return e.reason
 
-        if resentment > 88:
-            raise EndGame('deposed')
-        elif game.peasants < 33:
-            raise EndGame('pop loss')
 
-        # Buy and sell land
-        bid = round(2 * game.crop_yield + distributions.random(1) - 5)
+class _Recorded:
 
-        @validate_input
-        def valid_buy(x):
-            if (x * bid) > game.grain:
-                raise NotEnoughGrain(game.grain)
+    """Distributions that keep a list of the (curve, value) draws from them."""
+    __slots__ = ['distributions', 'draws']
 
-        bought = prompt_int('Land to buy at {0} HL./HA. = '.format(bid), valid_buy)
+    def __init__(self, distributions, draws):
+        self.distributions = distributions
+        self.draws = draws
 
-        if bought == 0:
-            offer    = bid - 1
-            sellable = sum(game.buckets[:3])
+    def random(self, curve):
+        x = self.distributions.random(curve)
+        self.draws.append((curve, x))
+        return x
 
-            @validate_input
-            def valid_sell(x):
-                if x > sellable:
-                    raise NotEnoughGoodLand(sellable)
-                if (x * offer) > 4000:
-                    # You cannot sell more than 4000 HL worth of land in any one year.
-                    # That's all the grain available to pay you with.
-                    raise Overfill('No buyers have that much grain, try less')
 
+def logged_year(game, log):
+    """year(game), writing a 'dukedom year' record of it to log, which is described in arena/eventlog.py (and
+    before the first year, a 'dukedom start' record)."""
+    answers, events = [], []
+    draws   = _start_record(game, log)
+    figures = end = None
+    try:
+        play   = year(game)
+        answer = None
+        while True:
             try:
-                sold = prompt_int('Land to sell at {0} HL./HA. = '.format(offer), valid_sell, limit=3)
-            except LimitExceeded:
-                print('Buyers have lost interest.')
-                sold = 0
+                x = play.send(answer)
+            except StopIteration:
+                break
+            answer = yield x
+            if type(x) is Question:
+                answers.append((x.name, answer))
+            else:
+                events.append(x)
+        figures = game.report._data.tobytes()
+    except EndGame as e:
+        end = e.reason
+        raise
+    except ZeroDivisionError:
+        end = 'error'
+        raise
+    except GeneratorExit:
+        end = 'abandoned' # Usually over an answer that isn't allowed
+        raise
+    finally:
+        _end_record(game, log, answers, draws, events, figures, end)
+
+
+def _start_record(game, log):
+    """Write the start record before the first year, and start keeping the draws of the year, returning the list
+    they're kept in. Gaussian and Talbot keep them themselves; other distributions are wrapped."""
+    if game.year == 0:
+        log.write(('dukedom start', game.snapshot()))
+    draws = []
+    distributions = game.distributions
+    if hasattr(distributions, 'drawn'):
+        distributions.drawn = draws
+    else:
+        game.distributions = _Recorded(distributions, draws)
+    return draws
 
-            if sold:
-                game.land  -= sold
 
-                # allocate sold land from good land starting at 60% and working up to 100% land
-                x = list(reversed(game.buckets[:3]))
-                sold_buckets = list(reversed(list(allocate(x, sold))))
-                game.buckets = [a - b for a, b in zip(game.buckets, chain(sold_buckets, [0, 0, 0]))]
+def _end_record(game, log, answers, draws, events, figures, end):
+    distributions = game.distributions
+    if type(distributions) is _Recorded:
+        game.distributions = distributions.distributions
+    else:
+        distributions.drawn = None
+    # The events as plain (name, args) tuples, which is what they are already but for the class.
+    log.write(('dukedom year', game.year, tuple(answers), tuple(draws), tuple(map(tuple, events)), figures, end))
 
-                received = offer * sold
 
-                if sold and offer < 4:
-                    print('The High King appropriates half of your earnings\nas punishment for selling at such a low price.')
-                    received = round(received / 2)
+def year(game):
+    """Play one year of the dukedom.
 
-                game.grain += received
-                report.record('Bought/sold', -sold)
-                report.record('Land deals', received)
+    This is a generator that yields an Event for everything that happens during the year, and a Question
+    for every decision the Duke has to make, the answer to which must be sent back in. It does no terminal
+    I/O itself so that it can drive both the interactive game and headless simulations. Raises EndGame when
+    the game is over.
+    """
+    report = game.report
+    distributions = game.distributions
+
+    # We start off in game year 0 for the first report. This is presumably to show continuity with
+    # whoever was running the dukedom before, and add history to the game world.
+    game.year = game.year + 1
+    tax  = 0
+    levy = 0
+
+    # Test for end game
+    if game.peasants < 33:
+        raise EndGame('pop loss')
+    if game.land < 200:
+        raise EndGame('land loss')
+    if game.unrest > 88 or game.resentment > 99 or game.grain < 429:
+        raise EndGame('deposed')
+    if game.year > 45 and game.king == 0:
+        raise EndGame('retirement')
+
+    resentment = 0
+    if game.king > 0:
+        if (yield Question('pay_tax')):
+            game.king = 2
         else:
-            game.land       += bought
-            game.buckets[2] += bought
-            game.grain      -= bid * bought
-            report.record('Bought/sold', bought)
-            report.record('Land deals', -bid * bought)
+            game.king = -1
+
+    report.record(report.PEASANTS_AT_START, game.peasants)
+    report.record(report.GRAIN_AT_START,    game.grain)
+    report.record(report.LAND_AT_START,     game.land)
+    report.reset()
+
+    # Feed the peasants
+    @validate_input
+    def valid_food(x):
+        if x > 100:
+            if x > game.grain:
+                raise NotEnoughGrain(game.grain)
+        elif (x * game.peasants) > game.grain:
+            raise NotEnoughGrain(game.grain)
+
+    food = yield Question('food', (), valid_food)
+
+    # User can enter a number under 100 which represents food per peasant to give,
+    # or a number over 100 which represents the total amount of food to give.
+    if food > 100:
+        food_per_capita = int(food / game.peasants)
+    else:
+        food_per_capita = food
+        food = food * game.peasants
+
+    if food_per_capita < 11 and food != game.grain:
+        yield Event('demonstration')
+
+    game.grain -= food
+    report.record(report.USED_FOR_FOOD, -food)
+
+    starved = 0
+    overfed = 0
+    if food_per_capita < 13:
+        starved = game.peasants - int(food / 13)
+        game.peasants  -= starved
+        yield Event('starvation')
+        report.record(report.STARVATIONS, -starved)
+    overfed = min(4, food_per_capita - 14)
+    resentment += (3 * starved) - (2 * overfed)
+
+    if resentment > 88:
+        raise EndGame('deposed')
+    elif game.peasants < 33:
+        raise EndGame('pop loss')
+
+    # Buy and sell land
+    bid = round(2 * game.crop_yield + distributions.random(1) - 5)
+
+    @validate_input
+    def valid_buy(x):
+        if (x * bid) > game.grain:
+            raise NotEnoughGrain(game.grain)
+
+    bought = yield Question('buy', (bid,), valid_buy)
+
+    if bought == 0:
+        offer    = bid - 1
+        sellable = game.buckets.good()
 
-        # Farm land
         @validate_input
-        def valid_farmland(land_to_farm):
-            if land_to_farm > game.land:
-                raise NotEnoughLand(game.land)
-            elif (land_to_farm * 2) > game.grain:
-                raise NotEnoughGrain(game.grain, hint=True)
-            elif land_to_farm > (game.peasants * 4):
-                raise NotEnoughWorkers(game.peasants)
-        farmed = prompt_int('Land to be planted = ', valid_farmland)
-        seeding = -(farmed * 2)
-        game.grain += seeding
-        report.record('Seeding', seeding)
-
-        # War with the king
-        if king == -2:
-            mercs = math.floor(game.grain / 100)
-            text = textwrap.dedent('''
-                The King\'s army is about to attack your duchy.
-                At 100HL each (pay in advance) you have hired
-                {0} foreign mercenaries.
-                '''.format(mercs)).strip()
-            print(text)
-            if (mercs * 8) + game.peasants > 2399:
-                raise EndGame('victory')
-            else:
-                raise EndGame('defeat')
-
-        # Crop gains
-        yld = distributions.random(2) + 9
-        if (game.year % 7) == 0:
-            # Field grain is eaten by seven year locusts. They eat half of all your crop
-            # in the years that they appear.
-            print('Seven year locusts.')
-            yld = round(yld * 0.65) # Hmm, not really half...
-
-        sown     = list(allocate(game.buckets, farmed))
-        fallow   = [a - b for a, b in zip(game.buckets, sown)]
-        weighted = sum(area * (1.0 - (0.2 * i)) for i, area in enumerate(sown[:5]))
-        if farmed > 0:
-            game.crop_yield = round(yld * (weighted / farmed) * 100) / 100
-        else: # avoid division by zero
-            game.crop_yield = 0
-
-        print('Yield = {} HL/HA.'.format(game.crop_yield))
-
-        depletion  = [0] + sown[:4] + [sum(sown[4:])]
-        nutrition  = [sum(fallow[:3])] + fallow[3:] + [0, 0]
-        game.buckets = [a + b for a, b in zip(depletion, nutrition)]
-
-        # Crop losses
-        crop_hazards = distributions.random(3) + 3
-        if crop_hazards > 9:
-            # Sometimes the rats get into the granary and eat up to 10% or so of your
-            # reserve grain. Rats never eat field grain.
-            eaten = round((crop_hazards * game.grain) / 83)
-            print('Rats infest the grainery')
-            game.grain -= eaten
-            report.record('Rat losses', -eaten)
-
-            if game.peasants > 66:
-                levy = distributions.random(4)
-                if levy < (game.peasants / 30):
-                    # Occasionally rats will eat so much of the High King's grain that some of his
-                    # workers starve to death. When this happens, the King will require some
-                    # peasants from each of his Dukes as replacements. You may supply them as
-                    # requested or pay an alternate amount of grain.
-                    or_grain = levy * 100
-                    msg = textwrap.dedent('''
-                        The king requires {} peasants for
-                        his estate and mines. Will you supply
-                        them? (Y)es or pay {} HL. of
-                        grain instead (N)o?''').format(levy, or_grain).lstrip()
-                    if prompt_key(msg, 'yn') == 'n':
-                        game.grain -= or_grain
-                        tax = or_grain
-                    else:
-                        game.peasants -= levy
-                        report.record('King\'s levy', -levy)
+        def valid_sell(x):
+            if x > sellable:
+                raise NotEnoughGoodLand(sellable)
+            if (x * offer) > 4000:
+                # You cannot sell more than 4000 HL worth of land in any one year.
+                # That's all the grain available to pay you with.
+                raise Overfill('No buyers have that much grain, try less')
+
+        sold = yield Question('sell', (offer,), valid_sell)
 
-        harvest = round(game.crop_yield * farmed)
+        if sold:
+            game.land  -= sold
 
-        # war
-        roll = distributions.random(5)
-        desperation = max(2, round(11 - 1.5 * game.crop_yield)) # How badly neighbouring duchies are driven to attack
-        war = War(distributions.random(6), game.peasants, resentment)
+            # allocate sold land from good land starting at 60% and working up to 100% land
+            game.buckets.sell(sold)
 
-        if king == -1:
-            king = -2
-            print('The High King calls for peasant levies\nand hires many foreign mercenaries.')
+            received = offer * sold
+
+            if sold and offer < 4:
+                yield Event('appropriation')
+                received = round(received / 2)
+
+            game.grain += received
+            report.record(report.BOUGHT_SOLD, -sold)
+            report.record(report.LAND_DEALS, received)
+    else:
+        game.land       += bought
+        game.buckets[2] += bought
+        game.grain      -= bid * bought
+        report.record(report.BOUGHT_SOLD, bought)
+        report.record(report.LAND_DEALS, -bid * bought)
+
+    # Farm land
+    @validate_input
+    def valid_farmland(land_to_farm):
+        if land_to_farm > game.land:
+            raise NotEnoughLand(game.land)
+        elif (land_to_farm * 2) > game.grain:
+            raise NotEnoughGrain(game.grain, hint=True)
+        elif land_to_farm > (game.peasants * 4):
+            raise NotEnoughWorkers(game.peasants)
+    farmed = yield Question('plant', (), valid_farmland)
+    seeding = -(farmed * 2)
+    game.grain += seeding
+    report.record(report.SEEDING, seeding)
+
+    # War with the king
+    if game.king == -2:
+        mercs = math.floor(game.grain / 100)
+        yield Event('king_attacks', (mercs,))
+        if (mercs * 8) + game.peasants > 2399:
+            raise EndGame('victory')
         else:
-            if roll < desperation:
-                print('A nearby Duke threatens war.')
-
-                if prompt_key('Will you attack first?', 'yn') == 'y':
-                    war.first_strike(desperation, roll)
-                    if war.ceasefire:
-                        print('Peace negotiations successful')
-                        crop_from_annexed_land = 0
+            raise EndGame('defeat')
+
+    # Crop gains
+    yld = distributions.random(2) + 9
+    if (game.year % 7) == 0:
+        # Field grain is eaten by seven year locusts. They eat half of all your crop
+        # in the years that they appear.
+        yield Event('locusts')
+        yld = round(yld * 0.65) # Hmm, not really half...
+
+    weighted = game.buckets.sow(farmed)
+    if farmed > 0:
+        game.crop_yield = round(yld * (weighted / farmed) * 100) / 100
+    else: # avoid division by zero
+        game.crop_yield = 0
+
+    yield Event('crop_yield', (game.crop_yield,))
+
+    # Crop losses
+    crop_hazards = distributions.random(3) + 3
+    if crop_hazards > 9:
+        # Sometimes the rats get into the granary and eat up to 10% or so of your
+        # reserve grain. Rats never eat field grain.
+        eaten = round((crop_hazards * game.grain) / 83)
+        yield Event('rats')
+        game.grain -= eaten
+        report.record(report.RAT_LOSSES, -eaten)
+
+        if game.peasants > 66:
+            levy = distributions.random(4)
+            if levy < (game.peasants / 30):
+                # Occasionally rats will eat so much of the High King's grain that some of his
+                # workers starve to death. When this happens, the King will require some
+                # peasants from each of his Dukes as replacements. You may supply them as
+                # requested or pay an alternate amount of grain.
+                or_grain = levy * 100
+                if (yield Question('supply_levy', (levy, or_grain))):
+                    game.peasants -= levy
+                    report.record(report.KINGS_LEVY, -levy)
+                else:
+                    game.grain -= or_grain
+                    tax = or_grain
+
+    harvest = round(game.crop_yield * farmed)
+
+    # war
+    roll = distributions.random(5)
+    desperation = max(2, round(11 - 1.5 * game.crop_yield)) # How badly neighbouring duchies are driven to attack
+    war = War(distributions.random(6), game.peasants, resentment)
+
+    if game.king == -1:
+        game.king = -2
+        yield Event('king_mobilises')
+    else:
+        if roll < desperation:
+            yield Event('war_threat')
+
+            if (yield Question('attack_first')):
+                war.first_strike(desperation, roll)
+                if war.ceasefire:
+                    yield Event('ceasefire')
+                    crop_from_annexed_land = 0
+                else:
+                    yield Event('first_strike_failed')
+
+            if not war.ceasefire:
+
+                @validate_input
+                def validate_mercs(x):
+                    if x > 75:
+                        raise Overfill('There are only 75 available for hire.')
+                mercs = yield Question('mercs', (), validate_mercs)
+
+                won = war.campaign(mercs, game.grain)
+                if won:
+                    if war.annexed > 399:
+                        yield Event('overran_enemy')
+                        crop_from_annexed_land = round(war.annexed * 0.55)
+                        if game.king == 0:
+                            yield Event('king_fears')
+                            game.king = 1
                     else:
-                        print('First strike failed - you need professionals.')
-
-                if not war.ceasefire:
-
-                    @validate_input
-                    def validate_mercs(x):
-                        if x > 75:
-                            raise Overfill('There are only 75 available for hire.')
-                    mercs = prompt_int('How many mercenaries will you hire at 40HL. each = ', validate_mercs)
-
-                    won = war.campaign(mercs, game.grain)
-                    if won:
-                        if war.annexed > 399:
-                            print('You have overrun the enemy and annexed\n'
-                                  'his entire dukedom.')
-                            crop_from_annexed_land = round(war.annexed * 0.55)
-                            if king == 0:
-                                print('\nThe King fears for his throne and\n'
-                                      'may be planning direct action.')
-                                king = 1
-                        else:
-                            print('You have won the war.')
-                            # The crop you gain at the end of the year from land gained from the duchy that attacked you
-                            # is set at 0.67, presumably because the optimal way to farm land is to farm two-thirds of it
-                            # and to leave one-third fallow to gain nutrition; so we can assume that's what other duchies
-                            # are doing.
-                            crop_from_annexed_land = round(war.annexed * 0.67 * game.crop_yield)
-
-                        # Allocate annexed land equally between the three buckets of 'good' land.
-                        annexed = war.annexed
-                        res = []
-                        for i in range(0, 3):
-                            x = round(annexed / (3 - i))
-                            res.append(x)
-                            annexed -= x
-                        assert(annexed == 0)
-                        game.buckets = [a+b for a, b in zip(game.buckets, res + [0, 0, 0])]
-
-                        game.grain += war.captured_grain
-                        report.record('Captured grain', war.captured_grain)
+                        yield Event('won_war')
+                        # The crop you gain at the end of the year from land gained from the duchy that attacked you
+                        # is set at 0.67, presumably because the optimal way to farm land is to farm two-thirds of it
+                        # and to leave one-third fallow to gain nutrition; so we can assume that's what other duchies
+                        # are doing.
+                        crop_from_annexed_land = round(war.annexed * 0.67 * game.crop_yield)
+
+                    # Allocate annexed land equally between the three buckets of 'good' land.
+                    game.buckets.annex(war.annexed)
+
+                    game.grain += war.captured_grain
+                    report.record(report.CAPTURED_GRAIN, war.captured_grain)
+
+                else:
+                    if war.annexed < -round(game.land * 0.67):
+                        raise EndGame('overrun')
 
                     else:
-                        if war.annexed < -round(game.land * 0.67):
-                            raise EndGame('overrun')
-
-                        else:
-                            print('You have lost the war.')
-                            annexed_by_bucket = list(allocate(game.buckets[:3], abs(war.annexed), proportional=True))
-                            game.buckets = [a-b for a, b in zip(game.buckets, annexed_by_bucket + [0, 0, 0])]
-
-                            # The amount of annexed land is a negative value here.
-                            crop_from_annexed_land = round(war.annexed * (farmed / game.land) * game.crop_yield)
-
-                    if war.looting_victims:
-                        print('There isn\'t enough grain to pay the mercenaries.')
-
-                    game.grain -= war.mercenary_pay
-
-                game.peasants -= war.casualties + war.looting_victims
-                game.land  += war.annexed
-                resentment += war.resentment
-
-                harvest += crop_from_annexed_land
-
-                report.record('War casualties',  -war.casualties)
-                report.record('Annexed land',     war.annexed)
-                report.record('Mercenary hire',  -war.mercenary_pay)
-                report.record('Looting victims', -war.looting_victims)
-
-        # demographics
-        deaths = 0
-        chance_of_outbreak = distributions.random(8) + 1
-        game.cool_down -= 1
-        if chance_of_outbreak == 1 and game.cool_down == 0:
-            print('The BLACK PLAGUE has struck the area')
-            game.cool_down = 13
-            deaths = -round(game.peasants / 3)
-        elif chance_of_outbreak < 4:
-            print('A POX EPIDEMIC has broken out')
-            deaths = -round(game.peasants / (chance_of_outbreak * 5))
-        game.peasants += deaths
-        report.record('Disease victims', deaths)
-
-        natural_deaths = round(0.3 - game.peasants / 22)
-        report.record('Natural deaths', natural_deaths)
-
-        if war.looting_victims:
-            birth_mod = 4.5
-        else:
-            birth_mod = distributions.random(8) + 4
-        births = round(game.peasants / birth_mod)
+                        yield Event('lost_war')
+                        game.buckets.lose(abs(war.annexed))
+
+                        # The amount of annexed land is a negative value here.
+                        crop_from_annexed_land = round(war.annexed * (farmed / game.land) * game.crop_yield)
+
+                if war.looting_victims:
+                    yield Event('unpaid_mercenaries')
+
+                game.grain -= war.mercenary_pay
+
+            game.peasants -= war.casualties + war.looting_victims
+            game.land  += war.annexed
+            resentment += war.resentment
+
+            harvest += crop_from_annexed_land
+
+            report.record(report.WAR_CASUALTIES,  -war.casualties)
+            report.record(report.ANNEXED_LAND,     war.annexed)
+            report.record(report.MERCENARY_HIRE,  -war.mercenary_pay)
+            report.record(report.LOOTING_VICTIMS, -war.looting_victims)
+
+    # demographics
+    deaths = 0
+    chance_of_outbreak = distributions.random(8) + 1
+    game.cool_down -= 1
+    if chance_of_outbreak == 1 and game.cool_down == 0:
+        yield Event('plague')
+        game.cool_down = 13
+        deaths = -round(game.peasants / 3)
+    elif chance_of_outbreak < 4:
+        yield Event('pox')
+        deaths = -round(game.peasants / (chance_of_outbreak * 5))
+    game.peasants += deaths
+    report.record(report.DISEASE_VICTIMS, deaths)
+
+    natural_deaths = round(0.3 - game.peasants / 22)
+    report.record(report.NATURAL_DEATHS, natural_deaths)
+
+    if war.looting_victims:
+        birth_mod = 4.5
+    else:
+        birth_mod = distributions.random(8) + 4
+    births = round(game.peasants / birth_mod)
 
 
-        # Taxes and expenses
+    # Taxes and expenses
 
-        if harvest > 4000:
-            milling = round((harvest - 4000) * 0.1)
-        else:
-            milling = 0
-        overhead = -120
-        report.record('Castle expense', overhead - milling)
+    if harvest > 4000:
+        milling = round((harvest - 4000) * 0.1)
+    else:
+        milling = 0
+    overhead = -120
+    report.record(report.CASTLE_EXPENSE, overhead - milling)
 
-        if king >= 0:
-            land_tax = round(game.land / 2)
-        else:
-            land_tax = 0
+    if game.king >= 0:
+        land_tax = round(game.land / 2)
+    else:
+        land_tax = 0
 
-        if king >= 2: # royal tax is doubled
-            land_tax *= 2
-        if land_tax > game.grain:
-            raise EndGame('beggared')
+    if game.king >= 2: # royal tax is doubled
+        land_tax *= 2
+    if land_tax > game.grain:
+        raise EndGame('beggared')
 
-        report.record('Royal tax', -tax - land_tax)
+    report.record(report.ROYAL_TAX, -tax - land_tax)
 
-        # end of year
-        game.peasants += births + natural_deaths
-        game.grain    += harvest - milling - land_tax
-        game.resentment = round(game.resentment * 0.85) + resentment
+    # end of year
+    game.peasants += births + natural_deaths
+    game.grain    += harvest - milling - land_tax
+    game.resentment = round(game.resentment * 0.85) + resentment
+    game.unrest     = resentment
 
-        report.record('Births',     births)
-        report.record('Crop yield', harvest)
+    report.record(report.BIRTHS,          births)
+    report.record(report.CROP_YIELD,      harvest)
+    report.record(report.PEASANTS_AT_END, game.peasants)
+    report.record(report.LAND_AT_END,     game.land)
+    report.record(report.GRAIN_AT_END,    game.grain)
 
 
 class War:
@@ -622,16 +1070,16 @@ def prompt_int(msg, valid, limit=None):
         if limit and i > limit:
             raise LimitExceeded
         try:
-            return valid(int(input(msg)))
+            return valid(int((yield Prompt(msg))))
         except InvalidInput as e:
-            print(e)
+            yield str(e)
         except ValueError:
             pass
 
 
 def prompt_key(msg, keys):
     while True:
-        val = input(msg+' ').lower()
+        val = (yield Prompt(msg+' ')).lower()
         if val in keys:
             return val
 
@@ -659,6 +1107,7 @@ class EndGame(RuntimeError):
                           'the royal tax.\n'
             }[reason]
         super().__init__(msg)
+        self.reason = reason
 
 
 class LimitExceeded(RuntimeError):
@@ -704,9 +1153,23 @@ class Overfill(InvalidInput):
         super().__init__(msg)
 
 
+def fork_rng(rng):
+    """A new generator in the same state as rng, which draws the same numbers from here on without affecting it."""
+    if rng is random or type(rng) is random.Random:
+        forked = random.Random.__new__(random.Random) # Skips seeding from the system, as setstate replaces it
+        forked.setstate(rng.getstate())
+        return forked
+    return copy.deepcopy(rng)
+
+
 class Gaussian:
 
-    def __init__(self):
+    """Draws for each curve from a normal distribution, using rng (the random module, a random.Random or
+    anything else with a gauss method) for the random numbers. While drawn is a list, each (curve, value) draw
+    is added to it, as logged years keep them."""
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.drawn = None
         self.means = [None] * 8
         self.means[0] = self._gauss(6.0, 1.0,  4, 8)
         self.means[1] = self._gauss(6.5, 1.1,  4, 9)
@@ -717,10 +1180,29 @@ class Gaussian:
         self.means[7] = self._gauss(5.0, 2.0,  1, 9) # Births
 
     def _gauss(self, mean, dev, a, b):
-        return min(b, max(a, int(round(random.gauss(mean, dev)))))
+        return min(b, max(a, int(round(self.rng.gauss(mean, dev)))))
 
     def random(self, curve):
-        return self._gauss(0.5, 1.5, -3, 2) + self.means[curve-1]
+        x = self._gauss(0.5, 1.5, -3, 2) + self.means[curve-1]
+        if self.drawn is not None:
+            self.drawn.append((curve, x))
+        return x
+
+    def getstate(self):
+        return tuple(self.means), self.rng.getstate()
+
+    def setstate(self, state):
+        means, rng = state
+        self.means = list(means)
+        self.rng.setstate(rng)
+
+    def fork(self):
+        """A copy with its own generator, in the same state as this one's."""
+        gaussian = copy.copy(self)
+        gaussian.drawn = None
+        gaussian.means = self.means[:]
+        gaussian.rng = fork_rng(self.rng)
+        return gaussian
 
 
 class Talbot:
@@ -729,14 +1211,38 @@ class Talbot:
     of Dukedom. We have a (much) better Gaussian random number generator in Python, but I wanted
     to keep the option to use this around and I wanted to understand how Talbot's random number
     generation worked. I'm not sure how Talbot came up with this scheme - it doesn't seem based
-    on any of the Gaussian approximation algorithm's I've researched from around that period."""
+    on any of the Gaussian approximation algorithm's I've researched from around that period.
 
-    def __init__(self):
+    The uniform random numbers come from rng, the random module unless another generator is given, and drawn is
+    as for Gaussian."""
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.drawn = None
         self.table = [0] * 8
         self.init_table()
 
     def random(self, curve):
-        return self.fnx(curve - 1)
+        x = self.fnx(curve - 1)
+        if self.drawn is not None:
+            self.drawn.append((curve, x))
+        return x
+
+    def getstate(self):
+        return tuple(self.table), self.rng.getstate()
+
+    def setstate(self, state):
+        table, rng = state
+        self.table = list(table)
+        self.rng.setstate(rng)
+
+    def fork(self):
+        """A copy with its own generator, in the same state as this one's."""
+        talbot = copy.copy(self)
+        talbot.drawn = None
+        talbot.table = self.table[:]
+        talbot.rng = fork_rng(self.rng)
+        return talbot
 
     def fnr(self, a, b):
         """This function uses rounding to produce a very loose approximation of a normal distribution.
@@ -755,7 +1261,7 @@ class Talbot:
         fnr(-2, 2) will produce a distribution with mean 0.5 (not 0); fnr(4, 7) will produce a distribution
         with mean 6 (not 5.5).
         """
-        return int(round(random.random() * (1 + b - a) + a))
+        return int(round(self.rng.random() * (1 + b - a) + a))
 
     def init_table(self):
         """Different stochastic properties within the game - births, crop yield, chance of disease, etc. - want
@@ -792,7 +1298,7 @@ class Talbot:
             (1, 8): [(1, 345),  (2, 1114), (3, 949),  (4, 1969), (5, 1256), (6, 1939), (7, 993), (8, 1054), (9, 381)]
 
         Notice how some of the distributions - (1, 8) and (3, 6) for example - have decidedly non-gaussian profiles
-        with two peaks and a dip in between.
+        with two peaks and a dip in between. The exact distributions are worked out in curves.py.
         """
         pairs = [(4, 7), (4, 8), (4, 6), (3, 6), (5, 6), (3, 6), (3, 8), (1, 8)]
         for i, (a, b) in enumerate(pairs):
@@ -809,5 +1315,18 @@ class Talbot:
         return self.fnr(-2, 2) + self.table[a]
 
 
+class Scripted:
+
+    """Stands in for Gaussian or Talbot, drawing the values of the given (curve, value) draws from each curve in
+    turn: the draws of a year as an event log keeps them, or any made up for a test."""
+    def __init__(self, draws=()):
+        self.draws = collections.defaultdict(collections.deque)
+        for curve, x in draws:
+            self.draws[curve].append(x)
+
+    def random(self, curve):
+        return self.draws[curve].popleft()
+
+
 if __name__ == '__main__':
     main()
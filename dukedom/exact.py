@@ -0,0 +1,327 @@
+'''The exact distribution of how a year of Dukedom turns out, for a given state of the game and set of decisions.
+
+Everything random in a year is a draw from one of the curves, and once the game has started each curve's draws
+follow a small discrete distribution fixed by its mean (see curves.py). So rather than playing the year many
+times, the outcomes of each phase of the year can be enumerated, merging the paths that lead to the same state,
+and weighted by the chances of the draws:
+
+    >>> game = dukedom.GameState(rng=random.Random(1))
+    >>> outcomes = exact.year(game, dukedom.Decisions(food=14, plant=400, mercs=20))
+    >>> len(outcomes), exact.ended(outcomes)
+    (558, {})
+    >>> exact.expect(outcomes, lambda o: o.grain)
+    7634.836...
+
+An Outcome is the peasants, grain and land at the end of the year, with a reason of None, or the reason the
+game ended during the year, with the numbers None. The reasons are those of EndGame, 'invalid decision' when
+one of the decisions isn't allowed (which can depend on the draws - the price of land, for one), and 'error'
+when the game would divide by zero (see the TODO about curve 8 in dukedom). The checks at the start of a year
+are made at the start of this one, not the next.
+
+The rules are those of dukedom.year(), which remains the reference implementation; the tests enumerate every
+path through year() to check they agree. Wars are fought once for each combination of the enemy, the army and
+the grain to pay mercenaries with, and cached between calls, as are the crop and the changes in population.
+
+A quiet year takes one or two milliseconds. A year that may well bring war can have thousands of outcomes and
+take tens of milliseconds, which is still far quicker than playing it enough times to estimate them.
+'''
+
+import collections
+import functools
+import math
+
+import curves
+import dukedom
+
+
+Outcome = collections.namedtuple('Outcome', ['peasants', 'grain', 'land', 'reason'])
+
+# The state of the duchy part way through the year.
+State = collections.namedtuple('State', ['peasants', 'grain', 'land', 'buckets', 'resentment', 'king',
+                                         'crop_yield', 'harvest', 'looted'])
+
+
+def distributions(game):
+    """The distribution of a draw from each curve (the first being curve 1) in the game, given its means."""
+    source = game.distributions
+    if isinstance(source, dukedom.Talbot):
+        return [curves.draw(x, talbot=True) for x in source.table]
+    if isinstance(source, dukedom.Gaussian):
+        return [curves.draw(x) if x is not None else None for x in source.means]
+    raise ValueError('Can\'t tell the distribution of the draws from {}.'.format(type(source).__name__))
+
+
+def year(game, decisions, pmfs=None):
+    """The chance of each Outcome of playing the next year of game with decisions, as a dict. pmfs is the
+    distribution of the draws from each curve, taken from the game's Gaussian or Talbot by default. The game is
+    left as it is."""
+    pmfs = pmfs if pmfs is not None else distributions(game)
+    outcome = _start(game, decisions)
+    if isinstance(outcome, str):
+        return {Outcome(None, None, None, outcome): 1}
+    states = _spread({outcome: 1}, pmfs[0], functools.partial(_land_deals, decisions))
+    states = _spread(states, None, functools.partial(_plant, decisions))
+    states = _spread(states, pmfs[1], functools.partial(_crop, game.year + 1, decisions.plant))
+    states = _spread(states, pmfs[2], functools.partial(_hazards, decisions, pmfs[3]))
+    states = _spread(states, pmfs[4], functools.partial(_war, decisions, pmfs[5]))
+    states = _spread(states, None, _forget)
+    return _demographics(game, tuple(pmfs[7].items()), states)
+
+
+def expect(outcomes, f):
+    """The expected value of f of the outcome."""
+    return sum(p * f(outcome) for outcome, p in outcomes.items())
+
+
+def ended(outcomes):
+    """The chance of each reason the game could end during the year."""
+    reasons = collections.defaultdict(int)
+    for outcome, p in outcomes.items():
+        if outcome.reason:
+            reasons[outcome.reason] += p
+    return dict(reasons)
+
+
+def _start(game, decisions):
+    """The State after the peasants are fed, before anything is drawn, or the reason the game ends."""
+    this_year = game.year + 1
+    if game.peasants < 33:
+        return 'pop loss'
+    if game.land < 200:
+        return 'land loss'
+    if game.unrest > 88 or game.resentment > 99 or game.grain < 429:
+        return 'deposed'
+    if this_year > 45 and game.king == 0:
+        return 'retirement'
+
+    king = game.king
+    if king > 0:
+        king = 2 if decisions.pay_tax else -1
+
+    # Feed the peasants
+    food = decisions.food
+    if food < 0 or (food > game.grain if food > 100 else food * game.peasants > game.grain):
+        return 'invalid decision'
+    if food > 100:
+        food_per_capita = int(food / game.peasants)
+    else:
+        food_per_capita = food
+        food = food * game.peasants
+    grain    = game.grain - food
+    peasants = game.peasants
+    starved  = 0
+    if food_per_capita < 13:
+        starved = peasants - int(food / 13)
+        peasants -= starved
+    resentment = 3 * starved - 2 * min(4, food_per_capita - 14)
+    if resentment > 88:
+        return 'deposed'
+    elif peasants < 33:
+        return 'pop loss'
+
+    return State(peasants, grain, game.land, tuple(game.buckets), resentment, king, game.crop_yield, 0, False)
+
+
+def _spread(states, pmf, phase):
+    """The chance of each state after phase, which is passed each State (that the game hasn't ended in) and each
+    draw from pmf (or just the State if pmf is None) and returns a list of (probability, State or reason)."""
+    after = collections.defaultdict(int)
+    for state, p in states.items():
+        if isinstance(state, str):
+            after[state] += p
+            continue
+        for x, q in (pmf.items() if pmf is not None else [(None, 1)]):
+            for r, next_state in (phase(state, x) if pmf is not None else phase(state)):
+                after[next_state] += p * q * r
+    return after
+
+
+def _land_deals(decisions, state, draw):
+    bid = round(2 * state.crop_yield + draw - 5)
+    bought, grain, land, buckets = decisions.buy, state.grain, state.land, dukedom.Buckets(state.buckets)
+    if bought < 0 or bought * bid > grain:
+        return [(1, 'invalid decision')]
+    if bought == 0:
+        offer, sold = bid - 1, decisions.sell
+        if sold < 0 or sold > buckets.good() or sold * offer > 4000:
+            return [(1, 'invalid decision')]
+        if sold:
+            land -= sold
+            buckets.sell(sold)
+            received = offer * sold
+            if offer < 4:
+                received = round(received / 2)
+            grain += received
+    else:
+        land       += bought
+        buckets[2] += bought
+        grain      -= bid * bought
+    return [(1, state._replace(grain=grain, land=land, buckets=tuple(buckets)))]
+
+
+def _plant(decisions, state):
+    farmed = decisions.plant
+    if farmed < 0 or farmed > state.land or farmed * 2 > state.grain or farmed > state.peasants * 4:
+        return [(1, 'invalid decision')]
+    grain = state.grain - farmed * 2
+    if state.king == -2:
+        return [(1, 'victory' if math.floor(grain / 100) * 8 + state.peasants > 2399 else 'defeat')]
+    return [(1, state._replace(grain=grain))]
+
+
+def _crop(this_year, farmed, state, draw):
+    yld = draw + 9
+    if this_year % 7 == 0:
+        yld = round(yld * 0.65)
+    buckets, weighted = _sow(state.buckets, farmed)
+    crop_yield = round(yld * (weighted / farmed) * 100) / 100 if farmed > 0 else 0
+    return [(1, state._replace(buckets=buckets, crop_yield=crop_yield, harvest=round(crop_yield * farmed)))]
+
+
+@functools.lru_cache(maxsize=1024)
+def _sow(buckets, farmed):
+    """The buckets after the year's crop, and the weighted area sown."""
+    buckets  = dukedom.Buckets(buckets)
+    weighted = buckets.sow(farmed)
+    return tuple(buckets), weighted
+
+
+def _hazards(decisions, levies, state, draw):
+    crop_hazards = draw + 3
+    if crop_hazards <= 9:
+        return [(1, state)]
+    state = state._replace(grain=state.grain - round((crop_hazards * state.grain) / 83))
+    if state.peasants <= 66:
+        return [(1, state)]
+    outcomes = []
+    for levy, p in levies.items():
+        if levy >= state.peasants / 30:
+            outcomes.append((p, state))
+        elif decisions.supply_levy:
+            outcomes.append((p, state._replace(peasants=state.peasants - levy)))
+        else:
+            outcomes.append((p, state._replace(grain=state.grain - levy * 100)))
+    return outcomes
+
+
+def _war(decisions, enemies, state, roll):
+    desperation = max(2, round(11 - 1.5 * state.crop_yield))
+    if state.king == -1:
+        return [(1, state._replace(king=-2))]
+    if roll >= desperation:
+        return [(1, state)]
+    outcomes = []
+    for enemy, p in enemies.items():
+        strike = (desperation, roll) if decisions.attack_first else None
+        war = _fight(enemy, state.peasants, state.resentment, strike, decisions.mercs, state.grain)
+        if war is None:
+            outcomes.append((p, 'invalid decision'))
+            continue
+        king, buckets, grain = state.king, state.buckets, state.grain
+        crop = 0
+        if not war.ceasefire:
+            if war.won:
+                if war.annexed > 399:
+                    crop = round(war.annexed * 0.55)
+                    if king == 0:
+                        king = 1
+                else:
+                    crop = round(war.annexed * 0.67 * state.crop_yield)
+                buckets = _annexed(buckets, war.annexed)
+                grain += war.captured_grain
+            else:
+                if war.annexed < -round(state.land * 0.67):
+                    outcomes.append((p, 'overrun'))
+                    continue
+                buckets = _lost(buckets, -war.annexed)
+                crop = round(war.annexed * (decisions.plant / state.land) * state.crop_yield)
+            grain -= war.mercenary_pay
+        outcomes.append((p, state._replace(
+            peasants=state.peasants - war.casualties - war.looting_victims, grain=grain,
+            land=state.land + war.annexed, buckets=buckets, resentment=state.resentment + war.resentment,
+            king=king, harvest=state.harvest + crop, looted=bool(war.looting_victims))))
+    return outcomes
+
+
+@functools.lru_cache(maxsize=65536)
+def _fight(enemy, peasants, resentment, strike, mercs, grain):
+    """The War with enemy after any first strike (strike being its desperation and roll) and the campaign, or
+    None if there are too many mercenaries to hire."""
+    war = dukedom.War(enemy, peasants, resentment)
+    if strike is not None:
+        war.first_strike(*strike)
+    if not war.ceasefire:
+        if mercs < 0 or mercs > 75:
+            return None
+        war.campaign(mercs, grain)
+    return war
+
+
+def _annexed(buckets, annexed):
+    """The buckets after winning land from the enemy."""
+    buckets = dukedom.Buckets(buckets)
+    buckets.annex(annexed)
+    return tuple(buckets)
+
+
+@functools.lru_cache(maxsize=4096)
+def _lost(buckets, lost):
+    """The buckets after losing land to the enemy."""
+    buckets = dukedom.Buckets(buckets)
+    buckets.lose(lost)
+    return tuple(buckets)
+
+
+def _forget(state):
+    # The buckets, resentment and crop yield make no difference to the rest of the year, and the fewer states
+    # there are the quicker the rest of it is.
+    return [(1, state._replace(buckets=None, resentment=None, crop_yield=None))]
+
+
+def _demographics(game, curve, states):
+    """The chance of each Outcome at the end of the year, from the chance of each state after the war."""
+    outcomes = collections.defaultdict(int)
+    plague = game.cool_down - 1 == 0
+    for state, p in states.items():
+        if isinstance(state, str):
+            outcomes[None, None, None, state] += p
+            continue
+        milling  = round((state.harvest - 4000) * 0.1) if state.harvest > 4000 else 0
+        land_tax = round(state.land / 2) if state.king >= 0 else 0
+        if state.king >= 2:
+            land_tax *= 2
+        grain = state.grain + state.harvest - milling - land_tax
+        beggared = land_tax > state.grain
+        for peasants, q in _population(state.peasants, state.looted, plague, curve):
+            if isinstance(peasants, str):
+                outcomes[None, None, None, peasants] += p * q
+            elif beggared:
+                outcomes[None, None, None, 'beggared'] += p * q
+            else:
+                outcomes[peasants, grain, state.land, None] += p * q
+    return {Outcome._make(outcome): p for outcome, p in outcomes.items()}
+
+
+@functools.lru_cache(maxsize=65536)
+def _population(peasants, looted, plague, curve):
+    """The chance of each number of peasants at the end of the year, after disease, natural deaths and births,
+    or of an 'error'. plague is whether a plague can break out this year, and curve the items of the
+    distribution of draws from curve 8."""
+    after = collections.defaultdict(int)
+    for draw, p in curve:
+        chance_of_outbreak = draw + 1
+        alive = peasants
+        if chance_of_outbreak == 1 and plague:
+            alive -= round(alive / 3)
+        elif chance_of_outbreak < 4:
+            if chance_of_outbreak == 0:
+                after['error'] += p
+                continue
+            alive -= round(alive / (chance_of_outbreak * 5))
+        natural_deaths = round(0.3 - alive / 22)
+        for birth_mod, q in ([(4.5, 1)] if looted else [(x + 4, q) for x, q in curve]):
+            if birth_mod == 0:
+                after['error'] += p * q
+            else:
+                after[alive + round(alive / birth_mod) + natural_deaths] += p * q
+    return list(after.items())
@@ -0,0 +1,204 @@
+'''A precomputed index of how many mercenaries to hire when a neighbouring duke attacks.
+
+Once a war can't be avoided, how it goes is fixed by the strength of the enemy, your home army (the number of
+peasants and their mood), the casualties of any failed first strike, how many mercenaries you hire and how much
+grain you have to pay them. This module tabulates, for every combination in a bounded range, the fewest
+mercenaries that win the war and the number that lose you the fewest peasants (to fighting and to looting by
+unpaid mercenaries), so an advisor can answer the mercenary question in constant time instead of fighting all
+76 possible wars:
+
+    >>> index = mercenaries.load('mercs-index', rebuild=True)  # Building it first if need be, in about 30s
+    >>> war = dukedom.War(enemy_modifier, game.peasants, resentment)
+    >>> index.mercs_to_win(war), index.fewest_losses(war, game.grain)
+    (23, 31)
+
+The index is a directory of .npy files that are memory mapped rather than read, and records a hash of the War
+source it was built from. load() raises an error for an index that is missing or was built from different War
+formulas unless it's asked to rebuild it, which takes about 30 seconds, as does building it by running this
+module:
+
+    $ python3 dukedom/mercenaries.py mercs-index
+
+How the index is keyed
+----------------------
+
+War.campaign only depends on the enemy's strength and a failed first strike through the size of the enemy army
+(18 * enemy_modifier + 85 + 3 * casualties), and on the population and resentment through the size of the home
+army, so those two numbers are the key. The casualties of a failed first strike add the same number of dead to
+every outcome short of overrunning the enemy, and overrunning the enemy is better than any other outcome, so they
+don't change which choice is best. Grain only matters up to the 3000 HL it takes to pay 75 mercenaries, and the
+best choice changes a few dozen times over that range, so each entry is stored as runs of grain over which it's
+the same. Wars outside the index are fought all 76 ways with dukedom.War.
+'''
+
+import argparse
+import copy
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+import batch
+import dukedom
+
+
+MAX_MERCS = 75
+MAX_GRAIN = MAX_MERCS * 40  # With this much grain no mercenaries go unpaid, so more makes no difference.
+
+# The strongest enemy (9) after the worst failed first strike (2 + desperation 11 + roll 9).
+MAX_AWAY = 18 * 9 + 85 + 3 * 22
+
+# The most peasants a war in the index loses with no mercenaries (to that first strike, and to the campaign with
+# no home army), and so with the number that loses the fewest.
+MAX_LOSSES = 22 + round(round(MAX_AWAY * 1.95) / 10)
+
+FILES = ['win', 'offsets', 'grain', 'mercs']
+
+
+class MercenaryIndex:
+
+    """An index built by build(), memory mapped from the directory at path."""
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        for name in FILES:
+            setattr(self, name, np.load(os.path.join(path, name + '.npy'), mmap_mode='r'))
+        self.homes = range(self.meta['min_home'], self.meta['max_home'])
+
+    def mercs_to_win(self, war):
+        """The fewest mercenaries that win a war that hasn't been fought yet, or None if 75 aren't enough."""
+        cell = self.cell(war)
+        if cell is None:
+            return _mercs_to_win(war)
+        mercs = int(self.win.flat[cell])
+        return mercs if mercs >= 0 else None
+
+    def fewest_losses(self, war, grain):
+        """The number of mercenaries that loses the fewest peasants in a war that hasn't been fought yet, paying
+        them out of grain. Ties go to the fewest mercenaries."""
+        cell = self.cell(war)
+        if cell is None:
+            return _fewest_losses(war, grain)
+        start, stop = self.offsets[cell], self.offsets[cell+1]
+        i = start + np.searchsorted(self.grain[start:stop], min(grain, MAX_GRAIN), side='right') - 1
+        mercs = int(self.mercs[i])
+        # Losses can't be more than the whole population, so if the best choice loses everyone, every choice is as
+        # bad as each other. Only a population of MAX_LOSSES or fewer can be lost.
+        if mercs and war.population <= MAX_LOSSES and losses(war, mercs, grain) >= war.population:
+            return 0
+        return mercs
+
+    def cell(self, war):
+        """The position of a war in the index, or None if it's outside the index."""
+        if war.ceasefire:
+            raise ValueError('There is no war to fight in a ceasefire.')
+        away, remainder = divmod(war.away - 85, 3)
+        if remainder or not 0 <= away < self.win.shape[0] or war.home not in self.homes:
+            return None
+        return away * len(self.homes) + war.home - self.homes.start
+
+
+def load(path, rebuild=False):
+    """Load the index at path. If it's missing or out of date, raise FileNotFoundError or ValueError, or with
+    rebuild, build it first."""
+    try:
+        index = MercenaryIndex(path)
+    except FileNotFoundError:
+        if not rebuild:
+            raise
+        return build(path)
+    if index.meta['source'] != source_hash():
+        if not rebuild:
+            raise ValueError('The index at {} was built from different War formulas.'.format(path))
+        return build(path, index.meta['min_home'], index.meta['max_home'])
+    return index
+
+
+def build(path, min_home=0, max_home=512):
+    """Build the index for home armies in the range [min_home, max_home) into the directory at path, replacing
+    any index that's already there."""
+    homes  = np.arange(min_home, max_home)
+    mercs  = np.arange(MAX_MERCS + 1)
+    grain  = np.arange(MAX_GRAIN + 1, dtype=np.int16)
+    aways  = range(85, MAX_AWAY + 1, 3)
+    win    = np.full((len(aways), len(homes)), -1, dtype=np.int8)
+    counts = np.zeros(win.shape, dtype=np.int64)
+    starts, choices = [], []
+
+    for a, away in enumerate(aways):
+        # Every war of this size against every home army with every number of mercenaries, with more grain
+        # than anyone could need; the cost of any looting is added for each amount of grain below.
+        war = batch.War(0, 10**6, 0)
+        war.home = homes[:, None] + np.zeros_like(mercs)
+        war.away = away
+        war.campaign(mercs, 10**6)
+        win[a] = np.where(war.won.any(axis=1), war.won.argmax(axis=1), -1)
+
+        overrun = war.landslide.any(axis=1)
+        base    = war.casualties.astype(np.int16)
+        needed  = (mercs * 40 - war.captured_grain).astype(np.int16)
+        best    = np.zeros((len(homes), len(grain)), dtype=np.int8)
+        best[overrun] = war.landslide[overrun].argmax(axis=1)[:, None]
+        rows = np.flatnonzero(~overrun)
+        for i in range(0, len(rows), 16):
+            r = rows[i:i+16]
+            unpaid = needed[r, :, None] - grain
+            # round(unpaid / 7) + 1 mercenaries loot when they aren't paid (there are no ties to round).
+            best[r] = (base[r, :, None] + (unpaid + 10) // 7 * (unpaid > 0)).argmin(axis=1)
+
+        for row in best:
+            changes = np.flatnonzero(np.diff(row)) + 1
+            starts.append(np.concatenate([[0], changes]))
+            choices.append(row[starts[-1]])
+        counts[a] = [len(x) for x in starts[-len(homes):]]
+
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        'win':     win,
+        'offsets': np.concatenate([[0], np.cumsum(counts.ravel())]),
+        'grain':   np.concatenate(starts).astype(np.int16),
+        'mercs':   np.concatenate(choices).astype(np.int8)}
+    for name in FILES:
+        np.save(os.path.join(path, name + '.npy'), arrays[name])
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'source': source_hash(), 'min_home': min_home, 'max_home': max_home}, f)
+    return MercenaryIndex(path)
+
+
+def source_hash():
+    """A hash of the War formulas the index is built from."""
+    source = inspect.getsource(dukedom.War) + inspect.getsource(batch.War)
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+def losses(war, mercs, grain):
+    """The number of peasants lost fighting war with mercs, including to looting (negative if overrun)."""
+    war = copy.copy(war)
+    war.campaign(mercs, grain)
+    return war.casualties + war.looting_victims
+
+
+def _mercs_to_win(war):
+    for mercs in range(MAX_MERCS + 1):
+        if copy.copy(war).campaign(mercs, 0):
+            return mercs
+    return None
+
+
+def _fewest_losses(war, grain):
+    return min(range(MAX_MERCS + 1), key=lambda mercs: losses(war, mercs, grain))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the mercenary index.')
+    parser.add_argument('path')
+    parser.add_argument('--min-home', type=int, default=0)
+    parser.add_argument('--max-home', type=int, default=512)
+    args = parser.parse_args()
+    build(args.path, args.min_home, args.max_home)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import advisor
+import dukedom
+import random
+import time
+import unittest
+
+
+class AdvisorTests(unittest.TestCase):
+
+    def test_plans_are_allowed(self):
+        # Any plan answers every question with something the game accepts.
+        rng = random.Random(1)
+        for seed in range(100):
+            game = dukedom.GameState(dukedom.Talbot(random.Random(seed)))
+            try:
+                for _ in range(45):
+                    advisor.play(game, rng.choice(advisor.PLANS))
+            except (dukedom.EndGame, ZeroDivisionError):
+                pass
+
+    def test_deadline(self):
+        # The search looks at the clock before each year it plays, so stops within a year of the deadline.
+        class Clock:
+            now = 0
+            def monotonic(self):
+                self.now += 1
+                return self.now
+        clock, played = Clock(), []
+        def play(game, plan):
+            played.append(clock.now)
+            return original(game, plan)
+        original, advisor.time, advisor.play = advisor.play, clock, play
+        try:
+            game = dukedom.GameState(dukedom.Gaussian(random.Random(2)))
+            advisor.Search(seed=3).run(game.snapshot(), 50)
+        finally:
+            advisor.time, advisor.play = time, original
+        self.assertTrue(played)
+        self.assertLess(max(played), 50)
+
+    def test_within_budget(self):
+        game = dukedom.GameState(dukedom.Gaussian(random.Random(2)))
+        for processes in (1, 2):
+            with advisor.Advisor(budget=0.05, processes=processes, seed=3) as adviser:
+                start = time.monotonic()
+                plan = adviser.advise(game)
+                elapsed = time.monotonic() - start
+                self.assertIn(plan, advisor.PLANS)
+                # Well over the budget, to allow for a busy machine.
+                self.assertLess(elapsed, 0.5)
+
+    def test_table_kept(self):
+        game = dukedom.GameState(dukedom.Gaussian(random.Random(4)))
+        adviser = advisor.Advisor(budget=0.02, seed=5)
+        adviser.advise(game)
+        root = adviser.search.table[advisor._key(game)]
+        visits = root.visits
+        adviser.advise(game)
+        self.assertGreater(root.visits, visits)
+
+        # Once the year is played, the states of the year before are forgotten.
+        advisor.play(game, advisor.ROLLOUT)
+        adviser.advise(game)
+        self.assertNotIn(game.year - 1, {key[3] for key in adviser.search.table})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+import batch
+import dukedom
+import numpy as np
+import unittest
+
+from test_dukedom import FixedDistributions
+
+
+class FixedBatchDistributions:
+
+    """Stands in for batch.Gaussian/Talbot, always drawing the same value from each curve for each game."""
+    def __init__(self, values):
+        self.values = np.array(values).T
+
+    def random(self, curve, index):
+        return self.values[curve-1, index]
+
+
+class Policy:
+
+    """Decisions that depend on the state of the game when they're made, for one game at a time."""
+    def __init__(self, game, food, buy, sell, mercs, attack_first):
+        self.game = game
+        self._food = food
+        self.buy   = buy
+        self._sell = sell
+        self.mercs = mercs
+        self.attack_first = attack_first
+        self.pay_tax = True
+        self.supply_levy = False
+
+    @property
+    def food(self):
+        if self._food > 100:
+            return min(self._food, self.game.grain)
+        return min(self._food, self.game.grain // self.game.peasants)
+
+    @property
+    def sell(self):
+        return min(self._sell, sum(self.game.buckets[:3]))
+
+    @property
+    def plant(self):
+        return min(self.game.land, self.game.grain // 2, self.game.peasants * 4)
+
+
+class BatchPolicy:
+
+    """Policy for all the games at once."""
+    def __init__(self, food, buy, sell, mercs, attack_first):
+        self.food = np.array(food)
+        self.buy  = np.array(buy)
+        self.sell = np.array(sell)
+        self.mercs = np.array(mercs)
+        self.attack_first = np.array(attack_first)
+        self.pay_tax = True
+        self.supply_levy = False
+
+    def plant(self, d):
+        return np.minimum.reduce([d.land, d.grain // 2, d.peasants * 4])
+
+
+class BatchTests(unittest.TestCase):
+
+    def test_same_as_dukedom(self):
+        """Play the same games with the same draws and decisions in batch and one at a time with dukedom.step()."""
+        curves = [(0, 3, 4, 4, 9, 5, 5, 5), (2, 3, 7, 1, 1, 9, 5, 5), (1, 2, 7, 1, 3, 1, 4, 4),
+                  (-2, 0, 4, 3, 5, 3, 1, 2), (0, 3, 6, 2, 4, 1, 6, 0), (2, 2, 6, 1, 6, 4, 3, 3)]
+        policies = [(14, 0, 0, 0, False), (13, 0, 10, 20, True), (16, 5, 0, 75, False),
+                    (13, 0, 50, 10, True), (1500, 0, 20, 40, False), (18, 2, 0, 75, True)]
+        curves, policies = curves * len(policies), [p for p in policies for _ in range(len(curves))]
+
+        duchies = batch.Duchies(len(curves), FixedBatchDistributions(curves))
+        decisions = BatchPolicy(*zip(*policies))
+        games = [dukedom.GameState(FixedDistributions(c)) for c in curves]
+        reasons = [None] * len(games)
+
+        for _ in range(50):
+            batch.step(duchies, decisions)
+            for i, game in enumerate(games):
+                if reasons[i] is None:
+                    try:
+                        dukedom.step(game, Policy(game, *policies[i]))
+                    except dukedom.EndGame as e:
+                        reasons[i] = e.reason
+                    except ZeroDivisionError:
+                        reasons[i] = 'error'
+
+        self.assertEqual([batch.REASONS[i] if i >= 0 else None for i in duchies.ended], reasons)
+        self.assertGreater(len(set(reasons)), 3)
+        for i, game in enumerate(games):
+            msg = 'game {}'.format(i)
+            self.assertEqual(duchies.peasants[i],   game.peasants,   msg=msg)
+            self.assertEqual(duchies.grain[i],      game.grain,      msg=msg)
+            self.assertEqual(duchies.land[i],       game.land,       msg=msg)
+            self.assertEqual(duchies.crop_yield[i], game.crop_yield, msg=msg)
+            self.assertEqual(duchies.resentment[i], game.resentment, msg=msg)
+            self.assertEqual(duchies.king[i],       game.king,       msg=msg)
+            self.assertEqual(list(duchies.buckets[i]), game.buckets, msg=msg)
+
+    def test_buckets(self):
+        # The same as dukedom.Buckets, a game at a time.
+        rng = np.random.default_rng(1)
+        before  = rng.integers(0, 300, (1000, 6))
+        amounts = rng.integers(0, 1200, 1000)
+        for kernel in ['sell', 'sow', 'annex', 'lose']:
+            if kernel == 'sell':
+                x = np.minimum(amounts, before[:, :3].sum(axis=1))
+            else:
+                x = amounts
+            buckets  = before.copy()
+            weighted = getattr(batch, kernel)(buckets, x)
+            for i in range(len(before)):
+                game = dukedom.Buckets(before[i].tolist())
+                self.assertEqual(getattr(game, kernel)(int(x[i])), None if kernel != 'sow' else weighted[i])
+                self.assertEqual(buckets[i].tolist(), game, msg='{} of game {}'.format(kernel, i))
+
+    def test_clamps_decisions(self):
+        duchies = batch.Duchies(1, FixedBatchDistributions([(0, 3, 4, 4, 9, 5, 5, 5)]))
+        batch.step(duchies, dukedom.Decisions(food=50, plant=10000))
+        game = dukedom.GameState(FixedDistributions())
+        with self.assertRaises(dukedom.EndGame) as cm:
+            dukedom.step(game, dukedom.Decisions(food=41, plant=38))
+        self.assertEqual(batch.REASONS[duchies.ended[0]], cm.exception.reason)
+        self.assertEqual(duchies.grain[0], game.grain)
+        self.assertEqual(duchies.peasants[0], game.peasants)
+
+    def test_play(self):
+        duchies = batch.play(1000, dukedom.Decisions(food=14, plant=10000, mercs=30), rng=np.random.default_rng(1))
+        odds = batch.odds(duchies)
+        self.assertAlmostEqual(sum(odds.values()), 1)
+        self.assertNotIn('playing', odds)
+
+        duchies = batch.play(1000, dukedom.Decisions(food=14, plant=10000, mercs=30), use_talbot=True, years=3)
+        self.assertEqual(duchies.year, 3)
+
+
+class BufferedTests(unittest.TestCase):
+
+    def reference(self, seed, use_talbot, curve, n):
+        """The first n draws from curve, as documented in batch.Buffered."""
+        streams = np.random.SeedSequence(seed).spawn(9)
+        rng = np.random.default_rng(streams[curve])
+        if use_talbot:
+            table = batch.Talbot(1, np.random.default_rng(streams[0])).table[:, 0]
+            return (np.rint(rng.random(n) * 5 - 2) + table[curve-1]).astype(int).tolist()
+        means = batch.Gaussian(1, np.random.default_rng(streams[0])).means[:, 0]
+        return (np.clip(np.rint(rng.normal(0.5, 1.5, n)), -3, 2) + means[curve-1]).astype(int).tolist()
+
+    def test_reference_sequence(self):
+        curves = [1, 2, 3, 4, 5, 6, 8]
+        for use_talbot in (False, True):
+            for block in (1, 7, 256):
+                # The curves are drawn from in an irregular order, which mustn't make a difference.
+                distributions = batch.Buffered(12, use_talbot, block)
+                draws = {c: [] for c in curves}
+                for i in range(600):
+                    c = curves[i * i % len(curves)]
+                    draws[c].append(distributions.random(c))
+                for c in curves:
+                    self.assertEqual(draws[c], self.reference(12, use_talbot, c, len(draws[c])),
+                                     msg='curve {} block {} talbot {}'.format(c, block, use_talbot))
+
+    def test_range(self):
+        for use_talbot, (low, high) in [(False, (1, 11)), (True, (-1, 12))]:
+            distributions = batch.Buffered(3, use_talbot)
+            draws = [distributions.random(c) for c in (1, 2, 3, 4, 5, 6, 8) for _ in range(1000)]
+            self.assertTrue(all(type(x) is int for x in draws))
+            self.assertGreaterEqual(min(draws), low)
+            self.assertLessEqual(max(draws), high)
+
+    def test_game(self):
+        states = []
+        for _ in range(2):
+            game = dukedom.GameState(batch.Buffered(5))
+            for _ in range(5):
+                dukedom.step(game, dukedom.Decisions(food=14, plant=300, mercs=20))
+            states.append((game.peasants, game.land, game.grain, game.buckets))
+        self.assertEqual(states[0], states[1])
+
+
+class WarTests(unittest.TestCase):
+
+    ATTRS = ['won', 'casualties', 'annexed', 'captured_grain', 'looting_victims', 'mercenary_pay', 'resentment',
+             'ceasefire', 'home', 'away']
+
+    def assertSameAsDukedom(self, wars, index, war, shape):
+        for attr in self.ATTRS:
+            x = np.broadcast_to(getattr(wars, attr), shape)[index]
+            self.assertEqual(x, getattr(war, attr), msg='{} {}'.format(attr, index))
+        x = np.broadcast_to(wars.landslide, shape)[index]
+        self.assertEqual(x, getattr(war, 'landslide', False), msg='landslide {}'.format(index))
+
+    def test_campaign_grid(self):
+        """Sweep every enemy strength and mercenary count over a grid of populations, resentment and grain."""
+        enemy, pop, resentment, mercs, grain = np.ix_(range(1, 10), range(30, 400, 74), range(-8, 89, 16),
+                                                      range(0, 76, 15), [0, 100, 1000, 4000])
+        wars = batch.War(enemy, pop, resentment)
+        won = wars.campaign(mercs, grain)
+        self.assertEqual(wars.looting_victims.shape, (9, 5, 7, 6, 4))
+        self.assertTrue(won.any() and not won.all())
+        self.assertTrue(wars.landslide.any() and wars.looting_victims.any())
+
+        shape = wars.looting_victims.shape
+        for index in np.ndindex(shape):
+            args = [x.flat[i] for x, i in zip((enemy, pop, resentment, mercs, grain), index)]
+            war = dukedom.War(*[int(x) for x in args[:3]])
+            war.campaign(int(args[3]), int(args[4]))
+            self.assertSameAsDukedom(wars, index, war, shape)
+
+    def test_first_strike(self):
+        enemy, desperation, roll, strike = np.ix_(range(1, 10), range(2, 12), range(3, 10), [False, True])
+        wars = batch.War(enemy, 100, -8)
+        wars.first_strike(desperation, roll, strike)
+        wars.campaign(20, 500)
+        self.assertTrue(wars.ceasefire.any() and not wars.ceasefire.all())
+
+        shape = wars.casualties.shape
+        for index in np.ndindex(shape):
+            e, d, r, s = [int(x.flat[i]) for x, i in zip((enemy, desperation, roll, strike), index)]
+            war = dukedom.War(e, 100, -8)
+            if s:
+                war.first_strike(d, r)
+            if not war.ceasefire:
+                war.campaign(20, 500)
+            self.assertSameAsDukedom(wars, index, war, shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import calibration
+import curves
+import unittest
+
+
+class CalibrationTests(unittest.TestCase):
+
+    def test_gammaq(self):
+        # The 5% critical values of chi-square with 1, 4 and 10 degrees of freedom.
+        for dof, x in [(1, 3.841459), (4, 9.487729), (10, 18.307038)]:
+            self.assertAlmostEqual(calibration.gammaq(dof / 2, x / 2), 0.05, places=6)
+        self.assertAlmostEqual(calibration.gammaq(5, 2.5), 0.891178, places=6)
+        self.assertEqual(calibration.gammaq(3, 0), 1.0)
+
+    def test_generators(self):
+        for generator in ['batch.Gaussian', 'batch.Talbot', 'Gaussian', 'Talbot']:
+            n = 200000 if generator in calibration.VECTORISED else 20000
+            for curve in (2, 8):
+                stats = calibration.calibrate(generator, curve, n, seed=1)
+                self.assertGreater(stats['p'], 0.001, (generator, curve))
+                self.assertLess(stats['KS'], 1.63 / n ** 0.5, (generator, curve))
+                self.assertEqual(stats['range'], stats['exact range'])
+
+    def test_wrong_distribution(self):
+        # Draws from the Gaussian curves are told apart from Talbot's.
+        counted = calibration.counts(calibration.sample('batch.Gaussian', 3, 100000, seed=2))
+        self.assertEqual(calibration.chi_square(counted, curves.pmf(3, talbot=True))[2], 0.0)
+        self.assertGreater(calibration.ks(counted, curves.pmf(3, talbot=True)), 0.05)
+        self.assertEqual(calibration.chi_square({0: 5, 1: 5}, curves.pmf(3))[0], float('inf'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import collections
+import curves
+import dukedom
+import fractions
+import math
+import numpy as np
+import random
+import unittest
+
+
+class Grid:
+
+    """Stands in for the random module, returning the midpoints of n equal steps over [0, 1) in turn."""
+    def __init__(self, n):
+        self.n = n
+        self.i = 0
+
+    def random(self):
+        self.i += 1
+        return ((self.i - 1) % self.n + 0.5) / self.n
+
+
+class DistributionTestCase(unittest.TestCase):
+
+    def assertClose(self, pmf, counts, n):
+        """Within 5 standard errors of each probability."""
+        for x in set(pmf.values) | set(counts):
+            p = float(pmf[x])
+            self.assertLess(abs(counts[x] / n - p), 5 * math.sqrt(p * (1 - p) / n) + 1e-9, msg=x)
+
+
+class CurveTests(DistributionTestCase):
+
+    CURVES = [1, 2, 3, 4, 5, 6, 8]
+
+    def test_fnr(self):
+        # Every value of fnr(a, b) is a whole number of steps of 1 / (2n) wide, so a grid of 2n steps is exact.
+        for a, b in [(4, 7), (4, 8), (1, 8), (-2, 2)]:
+            n = 2 * (b + 1 - a)
+            talbot = dukedom.Talbot(Grid(n))
+            counts = collections.Counter(talbot.fnr(a, b) for _ in range(n))
+            self.assertEqual(curves.fnr(a, b), curves.PMF({x: fractions.Fraction(c, n) for x, c in counts.items()}))
+
+    def test_sums_to_one(self):
+        for c in self.CURVES:
+            self.assertEqual(sum(curves.table(c).probabilities), 1)
+            self.assertEqual(sum(curves.pmf(c, talbot=True).probabilities), 1)
+            self.assertAlmostEqual(sum(curves.pmf(c).probabilities), 1, places=12)
+        self.assertRaises(ValueError, curves.pmf, 7)
+
+    def test_talbot(self):
+        rng, n = random.Random(1), 20000
+        tables, draws = collections.defaultdict(collections.Counter), collections.defaultdict(collections.Counter)
+        for _ in range(n):
+            talbot = dukedom.Talbot(rng)
+            for c in self.CURVES:
+                tables[c][talbot.table[c-1]] += 1
+                draws[c][talbot.random(c)] += 1
+        for c in self.CURVES:
+            self.assertClose(curves.table(c), tables[c], n)
+            self.assertClose(curves.pmf(c, talbot=True), draws[c], n)
+
+    def test_gaussian(self):
+        rng, n = random.Random(2), 20000
+        means, draws = collections.defaultdict(collections.Counter), collections.defaultdict(collections.Counter)
+        for _ in range(n):
+            gaussian = dukedom.Gaussian(rng)
+            for c in self.CURVES:
+                means[c][gaussian.means[c-1]] += 1
+                draws[c][gaussian.random(c)] += 1
+        for c in self.CURVES:
+            self.assertClose(curves.mean(c), means[c], n)
+            self.assertClose(curves.pmf(c), draws[c], n)
+
+    def test_draw(self):
+        self.assertEqual(curves.draw(6, talbot=True).values, list(range(4, 10)))
+        self.assertEqual(curves.draw(6).values, list(range(3, 9)))
+        self.assertEqual(curves.draw(6, talbot=True).mean(), fractions.Fraction(13, 2))
+
+    def test_cdf(self):
+        pmf = curves.pmf(8, talbot=True)
+        self.assertEqual(pmf.cdf(-100), 0)
+        self.assertEqual(pmf.cdf(100), 1)
+        self.assertEqual(pmf.cdf(5), sum(pmf[x] for x in range(-100, 6)))
+
+
+class AliasTests(DistributionTestCase):
+
+    def test_sampler(self):
+        pmf = curves.pmf(8)
+        n = 40000
+        sampler = pmf.sampler(random.Random(3))
+        self.assertClose(pmf, collections.Counter(sampler.random() for _ in range(n)), n)
+        sample = sampler.sample(n, np.random.default_rng(4))
+        self.assertClose(pmf, collections.Counter(sample.tolist()), n)
+
+    def test_single_value(self):
+        sampler = curves.PMF({3: 1}).sampler()
+        self.assertEqual({sampler.random() for _ in range(100)}, {3})
+
+
+if __name__ == '__main__':
+    unittest.main()
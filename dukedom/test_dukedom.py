@@ -1,4 +1,6 @@
+import batch
 import dukedom
+import random
 import unittest
 
 
@@ -28,6 +30,37 @@ class Tests(unittest.TestCase):
         self.assertEqual(list(dukedom.allocate([10, 10, 10],  9, proportional=True)), [3, 5, 1])
         self.assertEqual(list(dukedom.allocate([10, 10, 10], 20, proportional=True)), [3, 5, 10])
 
+    def test_buckets(self):
+        # The same as the allocations the game made of each bucket before it had Buckets.
+        rng = random.Random(1)
+        for _ in range(2000):
+            before = [rng.randint(0, rng.choice([3, 300])) for _ in range(6)]
+            amount = rng.randint(0, sum(before) + 3)
+            good   = min(amount, sum(before[:3]))
+
+            buckets = dukedom.Buckets(before)
+            buckets.sell(good)
+            sold = list(reversed(list(dukedom.allocate(list(reversed(before[:3])), good))))
+            self.assertEqual(buckets, [a - b for a, b in zip(before, sold + [0, 0, 0])])
+
+            buckets = dukedom.Buckets(before)
+            weighted = buckets.sow(amount)
+            sown   = list(dukedom.allocate(before, amount))
+            fallow = [a - b for a, b in zip(before, sown)]
+            self.assertEqual(weighted, sum(area * (1.0 - (0.2 * i)) for i, area in enumerate(sown[:5])))
+            self.assertEqual(buckets, [a + b for a, b in zip([0] + sown[:4] + [sum(sown[4:])],
+                                                             [sum(fallow[:3])] + fallow[3:] + [0, 0])])
+
+            buckets = dukedom.Buckets(before)
+            buckets.lose(amount)
+            lost = list(dukedom.allocate(before[:3], amount, proportional=True))
+            self.assertEqual(buckets, [a - b for a, b in zip(before, lost + [0, 0, 0])])
+
+        buckets = dukedom.Buckets([10, 10, 10, 0, 0, 0])
+        buckets.annex(100)
+        self.assertEqual(buckets, [43, 44, 43, 0, 0, 0])
+        self.assertIs(type(buckets.copy()), dukedom.Buckets)
+
 
 class WarTests(unittest.TestCase):
 
@@ -169,6 +202,142 @@ class WarTests(unittest.TestCase):
         war.campaign(0, 0)
         self.assertEqual(war.casualties, 42)
 
+
+class FixedDistributions:
+
+    """Stands in for Gaussian/Talbot, always drawing the same value from each curve."""
+    def __init__(self, values=(0, 3, 4, 4, 9, 5, 5, 5)):
+        self.values = values
+
+    def random(self, curve):
+        return self.values[curve-1]
+
+
+class StepTests(unittest.TestCase):
+
+    def test_step_plays_one_year(self):
+        game = dukedom.GameState(FixedDistributions())
+        game, events = dukedom.step(game, dukedom.Decisions(food=14, plant=400))
+        self.assertEqual(game.year, 1)
+        self.assertEqual(game.peasants, 107)
+        self.assertEqual(game.land, 600)
+        self.assertEqual(game.grain, 6001)
+        self.assertEqual(game.buckets, [200, 216, 184, 0, 0, 0])
+        self.assertEqual(events, [dukedom.Event('crop_yield', (10.9,))])
+        self.assertEqual(dict(game.report)['Grain at end of year'], game.grain)
+
+    def test_step_answers_every_question(self):
+        game = dukedom.GameState(FixedDistributions((2, 3, 7, 1, 1, 9, 5, 5)))
+        decisions = dukedom.Decisions(food=14, sell=10, plant=400, supply_levy=True, attack_first=True, mercs=20)
+        game, events = dukedom.step(game, decisions)
+        self.assertEqual([e.name for e in events], ['crop_yield', 'rats', 'war_threat', 'first_strike_failed', 'lost_war'])
+        self.assertEqual(game.land, 600 - 10 - 191)
+        self.assertEqual(game.peasants, 100 - 1 - 41 - 2 + 6)
+        self.assertEqual(game.unrest, 82)
+
+    def test_invalid_decision(self):
+        game = dukedom.GameState(FixedDistributions())
+        with self.assertRaises(dukedom.NotEnoughGrain):
+            dukedom.step(game, dukedom.Decisions(food=50))
+        game = dukedom.GameState(FixedDistributions())
+        with self.assertRaises(dukedom.NotEnoughWorkers):
+            dukedom.step(game, dukedom.Decisions(food=13, plant=401))
+
+    def test_end_game_reason(self):
+        game = dukedom.GameState(FixedDistributions())
+        with self.assertRaises(dukedom.EndGame) as cm:
+            dukedom.step(game, dukedom.Decisions(food=5))
+        self.assertEqual(cm.exception.reason, 'deposed')
+
+
+class GameStateTests(unittest.TestCase):
+
+    def test_report(self):
+        report = dukedom.GameReport()
+        self.assertEqual(len(list(report)), 24)
+        report.record(report.KINGS_LEVY, -3)
+        report.record('Royal tax', -600)
+        self.assertEqual(report['King\'s levy'], -3)
+        self.assertEqual(report[report.ROYAL_TAX], -600)
+        self.assertEqual(report.LABELS[report.GRAIN_AT_END], 'Grain at end of year')
+        report.reset()
+        self.assertEqual((report[report.KINGS_LEVY], report[report.ROYAL_TAX]), (0, 0))
+        self.assertEqual(report[report.GRAIN_AT_END], 4177)
+        self.assertRaises(AttributeError, setattr, report, 'extra', 1)
+
+    def test_copy(self):
+        game = dukedom.GameState(FixedDistributions())
+        dukedom.step(game, dukedom.Decisions(food=14, plant=400))
+        copy = game.copy()
+        self.assertEqual({x: getattr(copy, x) for x in copy.__slots__ if x != 'report'},
+                         {x: getattr(game, x) for x in game.__slots__ if x != 'report'})
+        self.assertEqual(list(copy.report), list(game.report))
+        self.assertIs(copy.distributions, game.distributions)
+
+        dukedom.step(copy, dukedom.Decisions(food=14, plant=400))
+        self.assertEqual((game.year, game.buckets), (1, [200, 216, 184, 0, 0, 0]))
+        self.assertEqual(dict(game.report)['Grain at end of year'], 6001)
+        self.assertNotEqual(dict(copy.report)['Grain at end of year'], 6001)
+
+    def play(self, game, years=4):
+        """Play on for a few years, returning the state at the end."""
+        for _ in range(years):
+            try:
+                dukedom.step(game, dukedom.Decisions(food=14, plant=300, mercs=20))
+            except (dukedom.EndGame, ZeroDivisionError):
+                break
+        return game.snapshot()
+
+    def test_snapshot(self):
+        for distributions in (dukedom.Gaussian, dukedom.Talbot):
+            game = dukedom.GameState(distributions(random.Random(2)))
+            self.play(game, 1)
+            before = game.snapshot(rng=True)
+            after = self.play(game)
+            game.restore(before)
+            self.assertEqual(game.snapshot(rng=True), before)
+            self.assertEqual(self.play(game), after)
+
+            # Without the generator, the state is put back but the draws carry on.
+            other = dukedom.GameState(game.distributions)
+            other.restore(before[:-1])
+            self.assertEqual(other.snapshot(), before[:-1])
+            self.assertNotEqual(self.play(other), after)
+
+    def test_fork(self):
+        for distributions in (dukedom.Gaussian(random.Random(3)), dukedom.Talbot(random.Random(3)),
+                              dukedom.Gaussian(), batch.Buffered(3)):
+            game = dukedom.GameState(distributions)
+            self.play(game, 1)
+            fork = game.fork()
+            self.assertIsNot(fork.distributions, game.distributions)
+            self.assertEqual(self.play(fork), self.play(game))
+
+
+class RandomTests(unittest.TestCase):
+
+    def play(self, games, years=10):
+        """Play games a year at a time in turn, returning the state of each at the end."""
+        for _ in range(years):
+            for game in games:
+                try:
+                    dukedom.step(game, dukedom.Decisions(food=14, plant=300, mercs=20))
+                except (dukedom.EndGame, ZeroDivisionError):
+                    pass
+        return [(g.year, g.peasants, g.land, g.grain) for g in games]
+
+    def test_interleaved_games(self):
+        for distributions in (dukedom.Gaussian, dukedom.Talbot):
+            alone = [self.play([dukedom.GameState(distributions(random.Random(seed)))])[0] for seed in range(3)]
+            together = self.play([dukedom.GameState(distributions(random.Random(seed))) for seed in range(3)])
+            self.assertEqual(alone, together)
+
+    def test_random_module_not_used(self):
+        random.seed(1)
+        state = random.getstate()
+        self.play([dukedom.GameState(rng=random.Random(1))])
+        self.assertEqual(random.getstate(), state)
+
 if __name__ == '__main__':
     unittest.main()
 #     unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName('test_dukedom.WarTests.test_captured_grain_pays_mercenaries'))
\ No newline at end of file
@@ -0,0 +1,119 @@
+import curves
+import dukedom
+import exact
+import itertools
+import unittest
+
+from fractions import Fraction
+
+
+def pmf(*values):
+    """A distribution over values, each twice as likely as the one before."""
+    total = 2 ** len(values) - 1
+    return curves.PMF({x: Fraction(2 ** i, total) for i, x in enumerate(values)})
+
+
+# Small distributions for each curve that between them take every branch of a year.
+PMFS = [pmf(-1, 2),       # The price of land
+        pmf(-8, 5),       # The yield; the poor harvest makes war likely
+        pmf(3, 8),        # Crop hazards; 8 brings rats
+        pmf(1, 5),        # The King's levy
+        pmf(2, 9),        # The roll for war
+        pmf(1, 9),        # The enemy
+        None,
+        pmf(-4, -1, 0, 2, 5)]  # Disease and births, including the draws that divide by zero
+
+
+def enumerate_year(game, decisions, pmfs):
+    """The chance of each Outcome, found by playing every combination of draws with dukedom.step()."""
+    curves = [1, 2, 3, 4, 5, 6, 8, 8]
+    outcomes = {}
+    for draws in itertools.product(*[pmfs[c-1].values for c in curves]):
+        p = 1
+        for c, x in zip(curves, draws):
+            p *= pmfs[c-1][x]
+        played = game.copy()
+        played.distributions = dukedom.Scripted(zip(curves, draws))
+        try:
+            dukedom.step(played, decisions)
+            outcome = exact.Outcome(played.peasants, played.grain, played.land, None)
+        except dukedom.EndGame as e:
+            outcome = exact.Outcome(None, None, None, e.reason)
+        except ZeroDivisionError:
+            outcome = exact.Outcome(None, None, None, 'error')
+        except ValueError:
+            outcome = exact.Outcome(None, None, None, 'invalid decision')
+        outcomes[outcome] = outcomes.get(outcome, 0) + p
+    return outcomes
+
+
+class ExactTests(unittest.TestCase):
+
+    def game(self, **kwargs):
+        game = dukedom.GameState(dukedom.Scripted())
+        for name, value in kwargs.items():
+            setattr(game, name, value)
+        return game
+
+    def assertSameAsDukedom(self, game, decisions):
+        self.assertEqual(exact.year(game, decisions, PMFS), enumerate_year(game, decisions, PMFS))
+
+    def test_quiet_year(self):
+        self.assertSameAsDukedom(self.game(), dukedom.Decisions(food=14, plant=400, mercs=20))
+
+    def test_war(self):
+        for attack_first in (False, True):
+            for mercs in (0, 40, 75, 76):
+                decisions = dukedom.Decisions(food=13, plant=380, attack_first=attack_first, mercs=mercs)
+                self.assertSameAsDukedom(self.game(grain=2500), decisions)
+        # Overrunning the enemy, and mercenaries that can't be paid.
+        self.assertSameAsDukedom(self.game(peasants=300, grain=20000, land=2000, buckets=[700, 600, 500, 200, 0, 0]),
+                                 dukedom.Decisions(food=14, plant=800, mercs=75))
+        self.assertSameAsDukedom(self.game(grain=1500), dukedom.Decisions(food=13, plant=50, mercs=75))
+
+    def test_land_deals(self):
+        self.assertSameAsDukedom(self.game(), dukedom.Decisions(food=14, buy=300, plant=400))
+        self.assertSameAsDukedom(self.game(), dukedom.Decisions(food=14, sell=200, plant=300))
+        self.assertSameAsDukedom(self.game(crop_yield=0.5), dukedom.Decisions(food=14, sell=500, plant=50))
+
+    def test_king(self):
+        for king, pay_tax in [(1, True), (1, False), (-2, True), (-1, True)]:
+            self.assertSameAsDukedom(self.game(king=king), dukedom.Decisions(food=14, plant=400, pay_tax=pay_tax))
+        self.assertSameAsDukedom(self.game(king=-2, grain=40000), dukedom.Decisions(food=14, plant=400))
+
+    def test_levy(self):
+        for supply_levy in (False, True):
+            self.assertSameAsDukedom(self.game(peasants=200),
+                                     dukedom.Decisions(food=14, plant=600, supply_levy=supply_levy))
+
+    def test_plague_and_locusts(self):
+        self.assertSameAsDukedom(self.game(cool_down=1, year=6), dukedom.Decisions(food=14, plant=400))
+
+    def test_game_over(self):
+        self.assertSameAsDukedom(self.game(grain=400), dukedom.Decisions(food=14))
+        self.assertSameAsDukedom(self.game(land=150), dukedom.Decisions(food=14))
+        self.assertSameAsDukedom(self.game(peasants=40), dukedom.Decisions(food=10))
+        self.assertSameAsDukedom(self.game(peasants=45, land=200, buckets=[200, 0, 0, 0, 0, 0]),
+                                 dukedom.Decisions(food=14, plant=150))
+        self.assertSameAsDukedom(self.game(year=45), dukedom.Decisions(food=14))
+        self.assertSameAsDukedom(self.game(), dukedom.Decisions(food=5, plant=400))
+        self.assertSameAsDukedom(self.game(grain=900), dukedom.Decisions(food=8, plant=0))
+        self.assertSameAsDukedom(self.game(grain=1900, land=2000), dukedom.Decisions(food=13, plant=200))
+        self.assertSameAsDukedom(self.game(), dukedom.Decisions(food=14, plant=401))
+        self.assertSameAsDukedom(self.game(), dukedom.Decisions(food=-1))
+
+    def test_game_distributions(self):
+        game = dukedom.GameState(dukedom.Talbot())
+        outcomes = exact.year(game, dukedom.Decisions(food=14, plant=400, mercs=20))
+        self.assertEqual(sum(outcomes.values()), 1)
+        self.assertEqual(exact.distributions(game)[1], curves.draw(game.distributions.table[1], talbot=True))
+
+        game = dukedom.GameState(dukedom.Gaussian())
+        outcomes = exact.year(game, dukedom.Decisions(food=14, plant=400, mercs=20))
+        self.assertAlmostEqual(sum(outcomes.values()), 1)
+        self.assertEqual(set(exact.ended(outcomes)) - {'error'}, set())
+        self.assertRaises(ValueError, exact.distributions, self.game())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import dukedom
+import json
+import mercenaries
+import os
+import random
+import tempfile
+import unittest
+
+
+class MercenaryIndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'index')
+        cls.index = mercenaries.build(cls.path, 100, 150)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def wars(self):
+        """Wars against every enemy, with and without a failed first strike, most of them in the index."""
+        rng = random.Random(1)
+        for enemy in range(0, 10):
+            for _ in range(12):
+                war = dukedom.War(enemy, rng.randrange(70, 120), rng.randrange(-4, 8))
+                if rng.random() < 0.5:
+                    war.first_strike(11, 9)
+                if not war.ceasefire:
+                    yield war, rng.choice([0, 40, rng.randrange(0, 3600)])
+
+    def test_same_as_dukedom(self):
+        indexed = 0
+        for war, grain in self.wars():
+            indexed += self.index.cell(war) is not None
+            self.assertEqual(self.index.mercs_to_win(war), mercenaries._mercs_to_win(war))
+            self.assertEqual(self.index.fewest_losses(war, grain), mercenaries._fewest_losses(war, grain),
+                             msg='enemy {} home {} grain {}'.format(war.away, war.home, grain))
+        self.assertGreater(indexed, 50)
+
+    def test_every_grain(self):
+        war = dukedom.War(5, 100, 0)
+        self.assertIsNotNone(self.index.cell(war))
+        for grain in range(0, 3200, 3):
+            self.assertEqual(self.index.fewest_losses(war, grain), mercenaries._fewest_losses(war, grain))
+
+    def test_whole_population_lost(self):
+        # Every choice loses all 20 peasants, to fighting or to looting.
+        war = dukedom.War(9, 20, -64)
+        war.first_strike(11, 9)
+        self.assertIsNotNone(self.index.cell(war))
+        self.assertEqual(self.index.fewest_losses(war, 0), 0)
+        self.assertEqual(mercenaries.losses(war, 75, 0), 20)
+
+    def test_max_losses(self):
+        # The worst war in the index: the strongest enemy, the worst failed first strike and no home army.
+        war = dukedom.War(9, 0, 0)
+        war.first_strike(11, 9)
+        war.home, war.population = 0, 1000
+        self.assertEqual(war.away, mercenaries.MAX_AWAY)
+        self.assertEqual(mercenaries.losses(war, 0, 0), mercenaries.MAX_LOSSES)
+
+        # Bigger populations are answered from the index alone.
+        fought = []
+        losses = mercenaries.losses
+        mercenaries.losses = lambda *args: fought.append(args) or losses(*args)
+        try:
+            for war, grain in self.wars():
+                if self.index.cell(war) is not None and war.population > mercenaries.MAX_LOSSES:
+                    self.index.fewest_losses(war, grain)
+        finally:
+            mercenaries.losses = losses
+        self.assertEqual(fought, [])
+
+    def test_ceasefire(self):
+        war = dukedom.War(1, 140, -8)
+        war.first_strike(4, 3)
+        self.assertTrue(war.ceasefire)
+        self.assertRaises(ValueError, self.index.fewest_losses, war, 0)
+
+    def test_rebuild_when_stale(self):
+        path = os.path.join(self.tmp.name, 'stale')
+        mercenaries.build(path, 100, 102)
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        meta['source'] = 'out of date'
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        self.assertRaises(ValueError, mercenaries.load, path)
+        index = mercenaries.load(path, rebuild=True)
+        self.assertEqual(index.meta['source'], mercenaries.source_hash())
+        self.assertEqual(index.homes, range(100, 102))
+        self.assertRaises(FileNotFoundError, mercenaries.load, os.path.join(self.tmp.name, 'missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
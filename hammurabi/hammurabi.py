@@ -4,11 +4,16 @@ BUGS:
  - Mortality calc rates seem wrong at end of game.
 """
 
-from random import randint, choice, random
+import collections
+import random
 import textwrap
 import math
 
 
+YEARS  = 10   # The term of office
+PLAGUE = 0.15 # The chance of a plague each year
+
+
 class EndGame(RuntimeError):
 
     pass
@@ -26,7 +31,33 @@ class Resigns(EndGame):
         super().__init__('\nHammurabi: I cannot do what you wish.\nGet yourself another steward!!!')
 
 
-def hammurabi():
+def hammurabi(rng=random):
+    """Play a game at the terminal, drawing the random numbers from rng (the random module by default)."""
+    terminal(conversation(rng))
+
+
+# A line of input for the player to type, after being shown msg.
+Prompt = collections.namedtuple('Prompt', ['msg'])
+
+
+def terminal(conversation):
+    """Hold a conversation with the player at the terminal: it yields each line to show as a string, and a
+    Prompt for each line the player types, which is sent back to it."""
+    line = None
+    while True:
+        try:
+            x = conversation.send(line)
+        except StopIteration:
+            return
+        if type(x) is Prompt:
+            line = input(x.msg)
+        else:
+            print(x)
+            line = None
+
+
+def conversation(rng=random):
+    """The conversation with the player for a game (see terminal())."""
     harvest = 3000
     grain   = 2800
     ratfood = 200
@@ -42,18 +73,18 @@ def hammurabi():
     total_deaths   = 0
     mortality_rate = 0
 
-    print('Try your hand at governing ancient Sumeria\n'
-          'for a ten-year term of office.')
+    yield ('Try your hand at governing ancient Sumeria\n'
+           'for a ten-year term of office.')
 
     try:
-        for year in range(1, 11):
+        for year in range(1, YEARS + 1):
             if plague:
                 pop = int(pop / 2)
                 plague_text = '\na horrible plague struck! Half the people died,'
             else:
                 plague_text = ''
 
-            print(textwrap.dedent('''
+            yield textwrap.dedent('''
                 Hammurabi: I beg to report to you,
                 in year {}, {} people starved, {} came to the city,{}
                 population is now {}
@@ -61,69 +92,64 @@ def hammurabi():
                 You harvested {} bushels per acre.
                 Rats ate {} bushels.
                 You now have {} bushels in store.
-                ''').format(year, starved, born, plague_text, pop, acres, _yield, ratfood, grain))
+                ''').format(year, starved, born, plague_text, pop, acres, _yield, ratfood, grain)
 
-            price = randint(17, 26)
-            print('Land is trading at {} bushels per acre.'.format(price))
+            price = rng.randint(17, 26)
+            yield 'Land is trading at {} bushels per acre.'.format(price)
 
             def prompt(msg, is_valid, fail_msg):
                 while True:
                     try:
-                        amt = int(input(msg + ' '))
+                        amt = int((yield Prompt(msg + ' ')))
                     except ValueError:
                         continue
                     if amt < 0:
                         raise Resigns()
                     if is_valid(amt):
                         return amt
-                    print(fail_msg)
+                    yield fail_msg
 
-            buy = prompt('How many acres do you wish to buy (0-{})?'.format(int(grain / price)),
-                         lambda n: n * price <= grain,
-                         'Hammurabi: Think again. You have only {} bushels of grain. Now then,'.format(grain))
+            buy = yield from prompt('How many acres do you wish to buy (0-{})?'.format(int(grain / price)),
+                                    lambda n: n * price <= grain,
+                                    'Hammurabi: Think again. You have only {} bushels of grain. Now then,'.format(grain))
 
             if buy > 0:
                 acres += buy
                 grain -= price * buy
             elif buy == 0:
-                sell = prompt('How many acres do you wish to sell (0-{})?'.format(acres),
-                              lambda n: n <= acres,
-                              'Hammurabi: Think again. You own only {} acres. Now then,'.format(acres))
+                sell = yield from prompt('How many acres do you wish to sell (0-{})?'.format(acres),
+                                         lambda n: n <= acres,
+                                         'Hammurabi: Think again. You own only {} acres. Now then,'.format(acres))
                 if sell > 0:
                     acres -= sell
                     grain += (sell * price)
 
-            feed = prompt('How many bushels do you wish to feed your people (0-{})?'.format(grain),
-                          lambda n: n <= grain,
-                          'Hammurabi: Think again. You have only {} bushels of grain. Now then,'.format(grain))
+            feed = yield from prompt('How many bushels do you wish to feed your people (0-{})?'.format(grain),
+                                     lambda n: n <= grain,
+                                     'Hammurabi: Think again. You have only {} bushels of grain. Now then,'.format(grain))
             grain = grain - feed
 
             while True:
                 limit = min(acres, grain * 2, pop * 10)
-                planted = int(input('How many acres do you wish to plant (0-{})? '.format(limit)))
+                planted = int((yield Prompt('How many acres do you wish to plant (0-{})? '.format(limit))))
                 if planted < 0:
                     raise Resigns()
                 if planted > acres:
-                    print('Hammurabi: Think again. You own only {} acres. Now then,'.format(acres))
+                    yield 'Hammurabi: Think again. You own only {} acres. Now then,'.format(acres)
                     continue
                 if (planted / 2) > grain: # 1 bushel plants 2 acres
-                    print('Hammurabi: Think again. You have only {} bushels. Now then,'.format(grain))
+                    yield 'Hammurabi: Think again. You have only {} bushels. Now then,'.format(grain)
                     continue
                 if planted > (10 * pop): # 1 person can tend 10 acres
-                    print('Hammurabi: But you have only {} people to tend the fields! Now then,'.format(pop))
+                    yield 'Hammurabi: But you have only {} people to tend the fields! Now then,'.format(pop)
                     continue
                 break
 
-            grain -= int(math.ceil(planted / 2))
-            _yield  = randint(1, 6)
-            harvest = planted * _yield
-            ratfood = int(grain / choice([2, 4, 6])) if bool(choice([0, 1])) else 0
-            grain   = grain + harvest - ratfood
-            born    = int(randint(1, 6) * (20 * acres + grain) / float(pop) / 100.0 + 1)
-            fed     = int(feed / 20.0)
-            starved = pop - fed
-            pop     = pop - starved + born
-            plague  = random() < 0.15
+            _yield = rng.randint(1, 6)
+            rats   = rng.choice([2, 4, 6]) if bool(rng.choice([0, 1])) else 0
+            pop, grain, harvest, ratfood, born, starved = end_of_year(
+                pop, grain, acres, feed, planted, _yield, rats, rng.randint(1, 6))
+            plague  = rng.random() < PLAGUE
             total_deaths += starved
             mortality_rate = ((year - 1) * mortality_rate + starved * 100 / pop) / year
 
@@ -131,38 +157,167 @@ def hammurabi():
                 raise Impeached(starved)
 
     except Impeached as e:
-        print(e)
+        yield str(e)
         impeached = True
     except Resigns as e:
-        print(e)
+        yield str(e)
         return
 
     acres_per_person = acres / pop
 
-    print()
-    print('In your {}-year term of office, {} percent of the\n'
-          'population starved per year on the average, i.e. a total of\n'
-          '{} people died!!\n'.format(year, int(round(mortality_rate)), total_deaths))
+    yield ''
+    yield ('In your {}-year term of office, {} percent of the\n'
+           'population starved per year on the average, i.e. a total of\n'
+           '{} people died!!\n'.format(year, int(round(mortality_rate)), total_deaths))
+
+    score = rating(mortality_rate, acres_per_person, impeached)
+    if score == 0:
+        yield ('Due to your extreme mismanagement you have not only\n'
+               'been impeached and thrown out of office but you have\n'
+               'also been declared national fink!!!!')
+    elif score == 1:
+        yield ('Your heavy-handed performance smacks of Nero and Ivan IV.\n'
+               'The people (remaining) find you an unpleasant ruler, and,\n'
+               'frankly, hate your guts!!')
+    elif score == 2:
+        haters = int(pop * rng.random() * 0.8)
+        yield ('Your performance could have been somewhat better, but\n'
+               'really wasn\'t too bad at all. {} people\n'
+               'dearly like to see you assassinated but we all have our\n'
+               'trivial problems.'.format(haters))
+    else:
+        yield ('A fantastic performance!!! Charlemagne, Disraeli and\n'
+               'Jefferson combined could not have done better!')
+
+    yield '\nSo long for now.'
+
+
+def end_of_year(pop, grain, acres, feed, planted, _yield, rats, births):
+    """The harvest, rats, births and starvation at the end of a year, given the grain left in store after
+    feeding the people and the random draws for the year: the yield per acre, the fraction of the grain the
+    rats eat (1/rats, or none if rats is 0) and the birth rate (1 to 6).
+
+    Returns the new population and grain, and the harvest, rat food, births and starved for the report.
+    """
+    grain  -= int(math.ceil(planted / 2))
+    harvest = planted * _yield
+    ratfood = int(grain / rats) if rats else 0
+    grain   = grain + harvest - ratfood
+    born    = int(births * (20 * acres + grain) / float(pop) / 100.0 + 1)
+    fed     = int(feed / 20.0)
+    starved = pop - fed
+    pop     = pop - starved + born
+    return pop, grain, harvest, ratfood, born, starved
+
+
+class City(collections.namedtuple('City', ['year', 'pop', 'grain', 'acres', 'price', 'mortality', 'impeached'])):
+
+    """The state of the city at the start of a year, once the land price is known, for playing without a terminal.
+    mortality is the sum of the yearly percentages starved so far. A City can't be changed, so keeping one is a
+    snapshot of the game, and playing on from it forks the game; keep the generator's getstate() with it to play
+    the same years again.
+
+        >>> city = start(rng)
+        >>> while not city.over:
+        ...     city = next_year(city, buy=0, sell=0, feed=city.pop * 20, plant=city.acres, rng=rng)
+        >>> city.rating()
+    """
+    __slots__ = ()
+
+    @property
+    def over(self):
+        return self.impeached or self.year > YEARS
+
+    def rating(self):
+        return rating(self.mortality / (self.year - 1), self.acres / self.pop, self.impeached)
+
+
+def start(rng=random):
+    """The city in the first year."""
+    return City(1, 100, 2800, 1000, rng.randint(17, 26), 0, False)
+
+
+def next_year(city, buy, sell, feed, plant, rng=random, log=None):
+    """The city in the year after, having traded, fed and planted as given, drawing the year's yield, rats,
+    births and plague (and the next year's land price) from rng as hammurabi() does. The decisions aren't
+    checked. When the term is over, or the people impeach you, the price is None. With a log (anything with a
+    write method, such as an arena eventlog.Writer) the year is recorded in it."""
+    acres  = city.acres + buy - sell
+    grain  = city.grain + (sell - buy) * city.price - feed
+    _yield = rng.randint(1, 6)
+    rats   = rng.choice([2, 4, 6]) if rng.choice([0, 1]) else 0
+    births = rng.randint(1, 6)
+    pop, grain, _, _, _, starved = end_of_year(city.pop, grain, acres, feed, plant, _yield, rats, births)
+    mortality = city.mortality + starved * 100 / pop
+    if starved > pop * 0.45:
+        plague = None
+        after  = City(city.year + 1, pop, grain, acres, None, mortality, True)
+    else:
+        plague = rng.random() < PLAGUE and city.year < YEARS
+        if plague:
+            pop = int(pop / 2)
+        price = rng.randint(17, 26) if city.year < YEARS else None
+        after = City(city.year + 1, pop, grain, acres, price, mortality, False)
+    if log is not None:
+        log.write(('hammurabi year', tuple(city), (buy, sell, feed, plant), (_yield, rats, births, plague),
+                   tuple(after)))
+    return after
+
+
+# A decision for the player without a terminal: 'buy' or 'sell' (with the price of land as its argument),
+# 'feed' or 'plant'.
+Question = collections.namedtuple('Question', ['name', 'args'], defaults=[()])
+
+FEED  = Question('feed')
+PLANT = Question('plant')
+
+
+class InvalidDecision(ValueError):
 
+    pass
+
+
+def play(player, rng=random, log=None):
+    """Play a game with no terminal I/O, player answering each Question as it comes up, returning the City at
+    the end of the term (or when the people impeach you).
+
+    player is anything with an answer(city, question) method, which returns the answer given the City as it is
+    at the time, with the grain and acres after the land trade and the grain after feeding (arena/players.py
+    has some). The land is sold only if none is bought, as at the terminal. Raises InvalidDecision if an answer
+    isn't allowed. log is as for next_year()."""
+    answer = player.answer
+    city = start(rng)
+    while not city.over:
+        year, pop, grain, acres, price, mortality, _ = city
+        buy = answer(city, Question('buy', (price,)))
+        if buy < 0 or buy * price > grain:
+            raise InvalidDecision('Can\'t buy {} acres at {} with {} bushels'.format(buy, price, grain))
+        sell = 0
+        if buy == 0:
+            sell = answer(city, Question('sell', (price,)))
+            if sell < 0 or sell > acres:
+                raise InvalidDecision('Can\'t sell {} acres of {}'.format(sell, acres))
+        grain += (sell - buy) * price
+        acres += buy - sell
+        feed = answer(City(year, pop, grain, acres, price, mortality, False), FEED)
+        if feed < 0 or feed > grain:
+            raise InvalidDecision('Can\'t feed {} bushels of {}'.format(feed, grain))
+        plant = answer(City(year, pop, grain - feed, acres, price, mortality, False), PLANT)
+        if plant < 0 or plant > min(acres, (grain - feed) * 2, pop * 10):
+            raise InvalidDecision('Can\'t plant {} acres'.format(plant))
+        city = next_year(city, buy, sell, feed, plant, rng, log)
+    return city
+
+
+def rating(mortality_rate, acres_per_person, impeached=False):
+    """How the term of office is judged, from 0 (national fink) to 3 (a fantastic performance)."""
     if impeached or mortality_rate > 33 or acres_per_person < 7:
-        print('Due to your extreme mismanagement you have not only\n'
-              'been impeached and thrown out of office but you have\n'
-              'also been declared national fink!!!!')
+        return 0
     elif mortality_rate > 10 or acres_per_person < 9:
-        print('Your heavy-handed performance smacks of Nero and Ivan IV.\n'
-              'The people (remaining) find you an unpleasant ruler, and,\n'
-              'frankly, hate your guts!!')
+        return 1
     elif mortality_rate > 3 or acres_per_person < 10:
-        haters = int(pop * random() * 0.8)
-        print('Your performance could have been somewhat better, but\n'
-              'really wasn\'t too bad at all. {} people\n'
-              'dearly like to see you assassinated but we all have our\n'
-              'trivial problems.'.format(haters))
-    else:
-        print('A fantastic performance!!! Charlemagne, Disraeli and\n'
-              'Jefferson combined could not have done better!')
-
-    print('\nSo long for now.')
+        return 2
+    return 3
 
 
 if __name__ == '__main__':
@@ -0,0 +1,230 @@
+"""Work out how best to play Hammurabi, by backward induction over the ten year term.
+
+The game is judged at the end of the term on two numbers, the average percentage of the population that
+starved each year and the acres per person, which place you in one of four ratings from national fink (0) to
+fantastic (3) (see hammurabi.rating). The solver finds the decisions that maximise the expected rating.
+
+Each year the state of the city is its population, grain, acres and the sum of the yearly mortality rates
+so far. The land price is drawn before you decide, and the yield, rats, births and plague after. Working back
+from the last year, the value of every state on a grid is the expected value, over the land price, of the
+best decisions, and the value of a decision is the expected value of the states it can lead to in the year
+after:
+
+    >>> solver = Solver()
+    >>> solver.advise(1, pop=100, grain=2800, acres=1000, price=21)
+    Advice(buy=0, sell=0, feed=1600, plant=1000, rating=2.82...)
+
+The rating in the advice, like expected_rating(), is the solver's own estimate. It is biased upward: states
+are snapped to the nearest point on the grid, and the best of many snapped values tends to be too high. To
+find out how well the advice really does, play() plays games on it. On the default grid the mean rating over
+2,000 played games is about 2.5, not 2.82.
+
+Memoisation and pruning keep the solving to seconds:
+
+- Planting the most you can is always best, so it isn't a decision: the seed is 1 bushel for 2 acres, and
+  even the worst yield is a bushel per acre.
+
+- Deciding on the land trade and then feeding and planting are solved as two stages. Everything after the
+  land trade is the same whatever the price was, so the value of the state after trading is tabulated once
+  per year rather than once per price.
+
+- Land is traded to one of a few target acres per person, and the people are fed one of a few fractions of
+  what they need, rather than by the bushel and acre.
+
+- The value of each year is computed once and cached, and the grid for a year can be split across a pool of
+  processes.
+
+States between the points on the grid take the value of the nearest point, so the ratings are estimates. The
+advice is made for the actual state of the game, rather than the nearest point on the grid.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import random
+
+import numpy as np
+
+import hammurabi
+
+
+YEARS  = 10
+PRICES = np.arange(17, 27)
+
+# The random draws made after the decisions for the year: the yield, the rats (who don't come half the time, and
+# otherwise eat a half, a quarter or a sixth of the grain in store) and the birth rate, with their probabilities.
+YIELDS = np.arange(1, 7).reshape(6, 1, 1)
+RATS   = np.array([0, 2, 4, 6]).reshape(1, 4, 1)
+BIRTHS = np.arange(1, 7).reshape(1, 1, 6)
+CHANCE = np.full((6, 1, 1), 1 / 6) * np.array([1 / 2, 1 / 6, 1 / 6, 1 / 6]).reshape(1, 4, 1) * np.full((1, 1, 6), 1 / 6)
+PLAGUE = 0.15
+
+# The choices of how many people to feed (as a fraction of the population) and of how much land to own after
+# trading (in acres per person), with not trading at all.
+FEED = [0.8, 0.9, 1.0, 1.1, 1.25]
+LAND = [7, 9, 10, 10.5, 11, 12, 14]
+
+
+Advice = collections.namedtuple('Advice', ['buy', 'sell', 'feed', 'plant', 'rating'])
+
+
+class Grid:
+
+    """The points of the state space that are solved for: every combination of population, acres per person,
+    grain per person and the sum of the mortality rates so far."""
+    def __init__(self,
+                 pops=(10, 25, 45, 65, 85, 100, 120, 145, 175, 220, 280),
+                 acres=(0, 4, 6, 7, 8, 9, 10, 11, 12, 14, 17, 22),
+                 grain=(0, 6, 12, 18, 24, 30, 36, 45, 55, 70, 90, 120),
+                 mortality=(-50, -20, 0, 15, 30, 50, 75, 100, 160, 331)):
+        self.axes  = [np.array(x, dtype=float) for x in (pops, acres, grain, mortality)]
+        self.shape = tuple(len(x) for x in self.axes)
+        self.size  = int(np.prod(self.shape))
+        # Finding the nearest point by looking it up in a table of finely spaced steps is much faster than
+        # searching for it.
+        self._steps = []
+        for x in self.axes:
+            step = np.diff(x).min() / 8
+            fine = np.arange(x[0], x[-1] + step, step)
+            self._steps.append((x[0], step, np.searchsorted((x[1:] + x[:-1]) / 2, fine).astype(np.int32)))
+
+    def states(self):
+        """The population, acres, grain and mortality of every point, as flat arrays."""
+        pop, acres, grain, mortality = np.meshgrid(*self.axes, indexing='ij')
+        pop = pop.astype(int).ravel()
+        return pop, np.rint(acres.ravel() * pop).astype(int), np.rint(grain.ravel() * pop).astype(int), mortality.ravel()
+
+    def index(self, pop, acres, grain, mortality):
+        """The index of the (very nearly) nearest point to each state."""
+        pop = np.maximum(pop, 1).astype(np.float32)
+        index = 0
+        for (start, step, table), size, x in zip(self._steps, self.shape, (pop, acres / pop, grain / pop, mortality)):
+            fine = np.subtract(x, start, dtype=np.float32)
+            fine *= 1 / step
+            fine = np.minimum(np.maximum(fine, 0, out=fine), len(table) - 1, out=fine).astype(np.int32)
+            index = index * size + table[fine]
+        return index
+
+
+class Solver:
+
+    """The values of the states on grid in each year, computed as they are needed."""
+    def __init__(self, grid=None, processes=1):
+        self.grid = grid if grid is not None else Grid()
+        self.processes = processes
+
+    @functools.lru_cache(maxsize=None)
+    def value(self, year):
+        """The expected rating from the start of year (after any plague, before the land price is known) for
+        every point on the grid, playing the best decisions."""
+        pop, acres, grain, mortality = self.grid.states()
+        after_trade = self.after_trade(year)
+        best = np.zeros((len(PRICES), self.grid.size))
+        for i, price in enumerate(PRICES):
+            for target in _targets(pop, acres, grain, price):
+                bought = target - acres
+                index  = self.grid.index(pop, target, grain - bought * price, mortality)
+                best[i] = np.maximum(best[i], after_trade[index])
+        return best.mean(axis=0)
+
+    @functools.lru_cache(maxsize=None)
+    def after_trade(self, year):
+        """The expected rating from every point on the grid, after trading land in year."""
+        states = self.grid.states()
+        future = self.value_after(year + 1) if year < YEARS else None
+        chunks = np.array_split(np.arange(self.grid.size), max(1, self.processes) * 4)
+        jobs = [(year, [x[chunk] for x in states], future, self.grid) for chunk in chunks]
+        if self.processes > 1:
+            with concurrent.futures.ProcessPoolExecutor(self.processes) as pool:
+                results = list(pool.map(_feed_and_plant, jobs))
+        else:
+            results = [_feed_and_plant(job) for job in jobs]
+        return np.concatenate([r.max(axis=1) for r in results])
+
+    @functools.lru_cache(maxsize=None)
+    def value_after(self, year):
+        """The expected rating from every point on the grid at the end of the year before year, before
+        finding out if there's a plague."""
+        pop, acres, grain, mortality = self.grid.states()
+        halved = self.grid.index(pop // 2, acres, grain, mortality)
+        value = self.value(year)
+        return (1 - PLAGUE) * value + PLAGUE * np.where(pop // 2 > 0, value[halved], 0)
+
+    def advise(self, year, pop, grain, acres, price, mortality=0):
+        """The best decisions for the year, given the state of the game (mortality being the sum of the
+        percentage of the population that starved in each year so far)."""
+        future = self.value_after(year + 1) if year < YEARS else None
+        pop, grain, acres = np.array([pop]), np.array([grain]), np.array([acres])
+        best = None
+        for target in _targets(pop, acres, grain, price):
+            bought = int(target[0] - acres[0])
+            traded = grain - bought * price
+            values = _feed_and_plant((year, (pop, target, traded, np.array([mortality])), future, self.grid))[0]
+            fed = _fed(pop, traded)[:, 0]
+            for people, value in zip(fed, values):
+                if best is None or value > best.rating:
+                    feed  = int(people) * 20
+                    plant = int(min(target[0], 2 * (traded[0] - feed), 10 * pop[0]))
+                    best  = Advice(max(0, bought), max(0, -bought), feed, plant, float(value))
+        return best
+
+    def expected_rating(self, pop=100, grain=2800, acres=1000):
+        """The solver's estimate of the expected rating of the game, playing the advice from the start. This is
+        biased upward by the grid (see above); use play() to measure the real rating."""
+        return float(np.mean([self.advise(1, pop, grain, acres, price).rating for price in PRICES]))
+
+
+def play(solver, rng=None):
+    """Play a game of Hammurabi on the advice of solver, drawing from rng (a random.Random), and return the
+    rating it earns."""
+    rng  = rng if rng is not None else random.Random()
+    city = hammurabi.start(rng)
+    while not city.over:
+        advice = solver.advise(city.year, city.pop, city.grain, city.acres, city.price, city.mortality)
+        city = hammurabi.next_year(city, advice.buy, advice.sell, advice.feed, advice.plant, rng)
+    return city.rating()
+
+
+def _targets(pop, acres, grain, price):
+    """The acres that can be owned after trading, for each target acres per person and not trading."""
+    yield acres
+    for x in LAND:
+        target = np.rint(x * pop).astype(int)
+        yield np.minimum(target, acres + grain // price)
+
+
+def _fed(pop, grain):
+    """The number of people that can be fed with each of the FEED fractions."""
+    return np.minimum(np.rint(np.multiply.outer(FEED, pop)).astype(int), grain // 20)
+
+
+def _feed_and_plant(job):
+    """The expected rating of each state in year, for each fraction of the people fed."""
+    year, (pop, acres, grain, mortality), future, grid = job
+    fed = _fed(pop, grain).T[..., None, None, None]
+    pop, acres, grain, mortality = (x[:, None, None, None, None] for x in (pop, acres, grain, mortality))
+
+    grain   = grain - fed * 20
+    planted = np.minimum(np.minimum(acres, 2 * grain), 10 * pop)
+    grain   = grain - (planted + 1) // 2
+    ratfood = np.where(RATS > 0, grain // np.maximum(RATS, 1), 0)
+    grain   = grain + planted * YIELDS - ratfood
+    born    = (BIRTHS * (20 * acres + grain) / pop / 100.0 + 1).astype(int)
+    starved = pop - fed
+    pop     = pop - starved + born
+    mortality = mortality + starved * 100 / pop
+    impeached = starved > pop * 0.45
+
+    if future is None:
+        value = _rating(mortality / YEARS, acres / pop)
+    else:
+        value = future[grid.index(pop, acres, grain, mortality)]
+    value = np.where(impeached, 0, value)
+    return (value * CHANCE).sum(axis=(2, 3, 4))
+
+
+def _rating(mortality_rate, acres_per_person):
+    """hammurabi.rating for arrays."""
+    return np.select([(mortality_rate > 33) | (acres_per_person < 7),
+                      (mortality_rate > 10) | (acres_per_person < 9),
+                      (mortality_rate > 3) | (acres_per_person < 10)], [0, 1, 2], 3)
@@ -0,0 +1,35 @@
+import hammurabi
+import random
+import unittest
+
+
+class CityTests(unittest.TestCase):
+
+    def play(self, city, rng):
+        """Feed everyone and plant everything to the end of the term."""
+        while not city.over:
+            city = hammurabi.next_year(city, 0, 0, min(city.grain, city.pop * 20),
+                                       min(city.acres, 10 * city.pop), rng)
+        return city
+
+    def test_term(self):
+        city = self.play(hammurabi.start(random.Random(1)), random.Random(1))
+        self.assertEqual((city.year, city.price, city.impeached), (hammurabi.YEARS + 1, None, False))
+        self.assertIn(city.rating(), range(4))
+
+    def test_impeached(self):
+        city = hammurabi.next_year(hammurabi.start(random.Random(1)), 0, 0, 0, 0, random.Random(1))
+        self.assertTrue(city.impeached and city.over)
+        self.assertEqual(city.rating(), 0)
+
+    def test_fork(self):
+        rng = random.Random(2)
+        city = hammurabi.next_year(hammurabi.start(rng), 0, 0, 2000, 1000, rng)
+        state = rng.getstate()
+        first = self.play(city, rng)
+        rng.setstate(state)
+        self.assertEqual(self.play(city, rng), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import hammurabi
+import itertools
+import numpy as np
+import random
+import solver
+import unittest
+
+
+def small_grid():
+    return solver.Grid(pops=(20, 60, 100, 160), acres=(0, 7, 9, 10, 12), grain=(0, 15, 30, 60),
+                       mortality=(0, 30, 100, 331))
+
+
+class SolverTests(unittest.TestCase):
+
+    def test_rating(self):
+        for mortality_rate, acres_per_person in itertools.product([0, 3, 3.1, 10, 10.5, 33, 34], [6, 7, 8.9, 9, 10]):
+            self.assertEqual(solver._rating(np.array(mortality_rate), np.array(acres_per_person)),
+                             hammurabi.rating(mortality_rate, acres_per_person))
+
+    def test_last_year(self):
+        """The expected rating of the last year is exact, so check it against the game's own arithmetic."""
+        pop, grain, acres, mortality = 90, 2500, 950, 12.0
+        grid = small_grid()
+        values = solver._feed_and_plant((solver.YEARS, [np.array([x]) for x in (pop, acres, grain, mortality)],
+                                        None, grid))[0]
+        for fed, value in zip(solver._fed(np.array([pop]), np.array([grain]))[:, 0], values):
+            feed, expected = fed * 20, 0
+            plant = min(acres, 2 * (grain - feed), 10 * pop)
+            for _yield, (rats, p), births in itertools.product(
+                    range(1, 7), [(0, 1 / 2), (2, 1 / 6), (4, 1 / 6), (6, 1 / 6)], range(1, 7)):
+                new_pop, _, _, _, _, starved = hammurabi.end_of_year(
+                    pop, grain - feed, acres, feed, plant, _yield, rats, births)
+                total = mortality + starved * 100 / new_pop
+                impeached = starved > new_pop * 0.45
+                expected += p / 36 * hammurabi.rating(total / 10, acres / new_pop, impeached)
+            self.assertAlmostEqual(value, expected, msg='fed {}'.format(fed))
+
+    def test_advice_is_allowed(self):
+        rng = random.Random(2)
+        s = solver.Solver(small_grid())
+        for year in (1, 5, 10):
+            pop, grain, acres = rng.randrange(50, 150), rng.randrange(500, 4000), rng.randrange(300, 1500)
+            price = rng.randint(17, 26)
+            advice = s.advise(year, pop, grain, acres, price)
+            self.assertTrue(advice.buy == 0 or advice.sell == 0)
+            self.assertLessEqual(advice.buy * price, grain)
+            self.assertLessEqual(advice.sell, acres)
+            grain += (advice.sell - advice.buy) * price
+            acres += advice.buy - advice.sell
+            self.assertLessEqual(advice.feed, grain)
+            self.assertEqual(advice.plant, min(acres, 2 * (grain - advice.feed), 10 * pop))
+            self.assertTrue(0 <= advice.rating <= 3)
+
+    def test_processes(self):
+        self.assertTrue(np.array_equal(solver.Solver(small_grid()).value(8),
+                                       solver.Solver(small_grid(), processes=2).value(8)))
+
+    def test_play(self):
+        s = solver.Solver(small_grid())
+        rng = random.Random(1)
+        ratings = [solver.play(s, rng) for _ in range(50)]
+        self.assertGreater(np.mean(ratings), 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
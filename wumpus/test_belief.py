@@ -0,0 +1,103 @@
+import random
+import unittest
+
+import numpy as np
+
+import belief
+import wumpus
+
+
+class BeliefTests(unittest.TestCase):
+
+    def test_tables(self):
+        self.assertEqual(len(belief.PITS), 29070)
+        for i in [0, 1234, 29069]:
+            pits, bats = int(belief.PITS[i]), int(belief.BATS_AT[i])
+            self.assertEqual(bin(pits).count('1'), 2)
+            self.assertEqual(bin(bats).count('1'), 2)
+            self.assertFalse(pits & bats)
+            for room in belief.ROOMS:
+                self.assertEqual(belief.DRAUGHT[room, i], bool(pits & wumpus.TUNNELS[room]))
+                self.assertEqual(belief.BAT_NOISE[room, i], bool(bats & wumpus.TUNNELS[room]))
+
+    def test_paths(self):
+        for room in belief.ROOMS:
+            paths = belief.PATHS[room]
+            self.assertEqual(len(set(paths)), len(paths))
+            self.assertEqual([len(path) for path in paths], sorted(len(path) for path in paths))
+            for path in paths:
+                here = room
+                for i, to in enumerate(path):
+                    self.assertTrue(wumpus.tunnel(here, to))
+                    self.assertFalse(wumpus.crooked(room, path[:i], to))
+                    here = to
+
+    def test_flights(self):
+        # Through tunnels, an arrow hits each room on its path; otherwise it flies at random.
+        kill, suicide = belief.flights(1, [(2, 3), (5,), (2, 3, 4, 5, 1)])
+        np.testing.assert_array_equal(np.flatnonzero(kill[0]), [2, 3])
+        np.testing.assert_array_equal(np.flatnonzero(kill[1]), [5])
+        np.testing.assert_array_equal(suicide[:2], 0)
+        np.testing.assert_array_equal(np.flatnonzero(kill[2]), [2, 3, 4, 5])
+        np.testing.assert_array_equal(np.flatnonzero(suicide[2]), [i for i in range(21) if i not in (2, 3, 4, 5)])
+
+        # Shooting from room 1 to room 20, which isn't through a tunnel, it flies to 2, 5 or 8 without hitting
+        # anything, all of them a tunnel back to the hunter.
+        kill, suicide = belief.flights(1, [(20, 1)])
+        self.assertEqual(kill[0].tolist(), [0] * 21)
+        self.assertEqual(suicide[0].tolist(), [1] * 21)
+        # Only from 2 can it go on through a tunnel to 3.
+        kill, suicide = belief.flights(1, [(20, 3)])
+        self.assertEqual(np.flatnonzero(kill[0]).tolist(), [3])
+        self.assertAlmostEqual(kill[0, 3], 1 / 3)
+
+    def test_outcomes(self):
+        # The exact chances agree with shooting many arrows.
+        rng = random.Random(1)
+        where = np.zeros(21)
+        where[[3, 10, 19]] = [0.5, 0.3, 0.2]
+        paths = [(2, 3), (20, 3, 1), (7, 6, 15, 4, 5), (12, 10, 2, 1), (10, 11, 19)]
+        kill, suicide, miss = belief.outcomes(1, paths, where)
+        np.testing.assert_allclose(kill + suicide + miss, 1)
+        game = wumpus.GameState(rng)
+        for i, path in enumerate(paths):
+            counted = {'shot_wumpus': 0, 'shot_self': 0, 'missed': 0}
+            for _ in range(4000):
+                game.place(rng.choices(range(21), where)[0], 1, (17, 18), (13, 14))
+                game.playing, game.won, game.arrows = True, False, 5
+                counted[wumpus.shoot(game, path, rng)[0]] += 1
+            self.assertAlmostEqual(counted['shot_wumpus'] / 4000, kill[i], delta=0.03, msg=path)
+            self.assertAlmostEqual(counted['shot_self'] / 4000, suicide[i], delta=0.03, msg=path)
+
+        ranked = belief.Belief(wumpus.Observation(1, (2, 5, 8), False, False, False, 5)).shots()
+        self.assertEqual(len(ranked), len(belief.PATHS[1]))
+        self.assertEqual([shot[0] for shot in ranked], sorted((shot[0] for shot in ranked), reverse=True))
+
+    def test_truth_possible(self):
+        # Whatever happens, the belief never rules out the cave as it really is.
+        for seed in range(30):
+            env = wumpus.WumpusEnv(seed=seed)
+            observation = env.reset()
+            game = env.game
+            truth = np.flatnonzero((belief.PITS == wumpus.bits(game.pits)) &
+                                   (belief.BATS_AT == wumpus.bits(game.bats)))[0]
+            hunter = belief.Hunter(random.Random(seed))
+            question = wumpus.ACTION
+            for _ in range(200):
+                action = hunter.answer(observation, question)
+                self.assertTrue(hunter.belief.hazards[truth], msg=seed)
+                self.assertGreater(hunter.belief.wumpus[game.wumpus], 0, msg=seed)
+                self.assertAlmostEqual(hunter.belief.wumpus.sum(), 1)
+                observation, reward, done = env.step(action)
+                if done:
+                    break
+                question = wumpus.Question('action', tuple(env.events))
+
+    def test_hunter(self):
+        rewards = [wumpus.play(belief.Hunter(random.Random(i)), random.Random(i)) for i in range(100)]
+        self.assertNotIn(0, rewards)
+        self.assertGreater(rewards.count(1), 80)
+
+
+if __name__ == '__main__':
+    unittest.main()
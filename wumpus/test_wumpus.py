@@ -0,0 +1,136 @@
+import random
+import unittest
+import wumpus
+
+
+def setup(env, hunter, wumpus_room, bats=(19, 20), pits=(17, 18)):
+    """Start env's game over with the hunter, wumpus and hazards in the given rooms."""
+    env.reset()
+    env.game.place(wumpus_room, hunter, bats, pits)
+    return env.observe()
+
+
+class CaveTests(unittest.TestCase):
+
+    def test_tunnels(self):
+        for room, rooms in wumpus.cave.items():
+            for other in range(-1, 23):
+                self.assertEqual(wumpus.tunnel(room, other), other in rooms)
+
+    def test_distance(self):
+        self.assertEqual(wumpus.DISTANCE[1][1], 0)
+        self.assertEqual(wumpus.DISTANCE[1][2], 1)
+        self.assertEqual(wumpus.DISTANCE[1][3], 2)
+        self.assertEqual(max(max(row[1:]) for row in wumpus.DISTANCE[1:]), 5)
+        self.assertEqual(wumpus.DISTANCE[0], [None] * 21)
+        for a in range(1, 21):
+            self.assertIsNone(wumpus.DISTANCE[a][0])
+            for b in range(1, 21):
+                self.assertEqual(wumpus.DISTANCE[a][b], wumpus.DISTANCE[b][a])
+
+    def test_warnings(self):
+        """The warning masks agree with looking for the hazards in the tunnels from every room."""
+        rng = random.Random(1)
+        for _ in range(50):
+            game = wumpus.GameState(rng)
+            wumpus.move_wumpus(game, rng)
+            for room, rooms in wumpus.cave.items():
+                here = 1 << room
+                self.assertEqual(bool(game.near_wumpus & here), game.wumpus in rooms)
+                self.assertEqual(bool(game.near_bats & here), any(bat in rooms for bat in game.bats))
+                self.assertEqual(bool(game.near_pits & here), any(pit in rooms for pit in game.pits))
+
+
+class WumpusEnvTests(unittest.TestCase):
+
+    def test_warnings(self):
+        env = wumpus.WumpusEnv(seed=1)
+        observation = setup(env, 1, 2, bats=(5, 20), pits=(9, 17))
+        self.assertEqual(observation, wumpus.Observation(1, (2, 5, 8), True, True, False, 5))
+        observation, reward, done = env.step(wumpus.Move(8))
+        self.assertEqual(observation, wumpus.Observation(8, (1, 7, 9), False, False, True, 5))
+        self.assertEqual((reward, done), (0, False))
+
+    def test_shoot_wumpus(self):
+        env = wumpus.WumpusEnv(seed=1)
+        setup(env, 1, 3)
+        observation, reward, done = env.step(wumpus.Shoot([2, 3]))
+        self.assertEqual((reward, done), (1, True))
+        self.assertEqual(env.events, ['shot_wumpus'])
+        self.assertEqual(observation.arrows, 5)
+
+    def test_fall_in_pit(self):
+        env = wumpus.WumpusEnv(seed=1)
+        setup(env, 1, 20, pits=(2, 18))
+        observation, reward, done = env.step(wumpus.Move(2))
+        self.assertEqual((reward, done), (-1, True))
+        self.assertEqual(env.events, ['fell_in_pit'])
+
+    def test_out_of_arrows(self):
+        env = wumpus.WumpusEnv(seed=1)
+        setup(env, 1, 20, bats=(13, 16), pits=(14, 15))
+        env.game.arrows = 1
+        observation, reward, done = env.step(wumpus.Shoot([2]))
+        self.assertEqual((observation.arrows, reward, done), (0, -1, True))
+
+    def test_invalid_actions(self):
+        env = wumpus.WumpusEnv(seed=1)
+        setup(env, 1, 20)
+        self.assertRaises(wumpus.InvalidAction, env.step, wumpus.Move(3))
+        self.assertRaises(wumpus.InvalidAction, env.step, wumpus.Shoot([]))
+        self.assertRaises(wumpus.InvalidAction, env.step, wumpus.Shoot([2, 1]))
+        self.assertRaises(wumpus.InvalidAction, env.step, wumpus.Shoot([2, 3, 2]))
+
+    def test_seeded(self):
+        def episode(env, same_setup=False):
+            """Wander for a few moves, then shoot down the first tunnel until the game is over."""
+            observations = [env.reset(same_setup)]
+            done = False
+            while not done:
+                observation = observations[-1]
+                if len(observations) < 10:
+                    action = wumpus.Move(observation.tunnels[0])
+                else:
+                    action = wumpus.Shoot([observation.tunnels[0]])
+                observation, reward, done = env.step(action)
+                observations.append(observation)
+            return observations
+
+        self.assertEqual(episode(wumpus.WumpusEnv(seed=3)), episode(wumpus.WumpusEnv(seed=3)))
+        env = wumpus.WumpusEnv(seed=3)
+        first = episode(env)
+        self.assertEqual(episode(env, same_setup=True)[0], first[0])
+
+    def test_snapshot(self):
+        env = wumpus.WumpusEnv(seed=4)
+        observation = env.reset()
+        before = env.snapshot()
+
+        def wander():
+            """Walk down the first tunnel until the game is over, and what happened on the way."""
+            played, done, here = [], False, observation
+            while not done and len(played) < 50:
+                here, reward, done = env.step(wumpus.Move(here.tunnels[0]))
+                played.append((here, reward, env.events))
+            return played
+
+        first = wander()
+        env.restore(before)
+        self.assertEqual(wander(), first)
+
+    def test_copy(self):
+        game = wumpus.GameState(random.Random(2))
+        copy = game.copy()
+        self.assertEqual(copy.snapshot(), game.snapshot())
+        wumpus.move_wumpus(copy, random.Random(2))
+        self.assertNotEqual(copy.wumpus, game.wumpus)
+        self.assertEqual(game.near_wumpus, wumpus.TUNNELS[game.wumpus])
+
+    def test_not_an_action(self):
+        env = wumpus.WumpusEnv(seed=1)
+        env.reset()
+        self.assertRaises(wumpus.InvalidAction, env.step, 'm')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,21 @@ http://www.atariarchives.org/morebasicgames/showpage.php?page=179
 - Bugs (in the original game also):
   - You can repeatedly put the same room for the arrow
   - No range checking on the input for rooms for the arrow
+- Bugs fixed (from earlier versions of this implementation, not the original):
+  - Super bats could drop you in room 0, which doesn't exist, crashing the game. Like the original, they now
+    drop you in one of the rooms 1 to 20.
+
+The game itself is played by WumpusEnv, which has no terminal I/O of its own, so that hunting agents can play
+it directly:
+
+    >>> env = WumpusEnv(seed=1)
+    >>> observation = env.reset()
+    >>> observation, reward, done = env.step(Move(observation.tunnels[0]))
+
+hunt_the_wumpus() puts it to a player at the terminal.
 """
 
-from copy import deepcopy
+import collections
 import random
 import textwrap
 
@@ -35,6 +47,42 @@ cave = {
     20: (13,16,19)}
 
 
+def bits(rooms):
+    """A bitmask with bit n set for each room n."""
+    mask = 0
+    for room in rooms:
+        mask |= 1 << room
+    return mask
+
+
+def distances(cave):
+    """The number of tunnels on the shortest path between every pair of rooms, as DISTANCE[a][b]. The table is
+    indexed by room number, so it's 21 x 21 and row and column 0 (there is no room 0) are None."""
+    rooms = [0] + sorted(cave)
+    table = [[None] * len(rooms) for _ in rooms]
+    for start in cave:
+        table[start][start] = 0
+        frontier = [start]
+        while frontier:
+            room = frontier.pop(0)
+            for next_room in cave[room]:
+                if table[start][next_room] is None:
+                    table[start][next_room] = table[start][room] + 1
+                    frontier.append(next_room)
+    return table
+
+
+# The cave compiled for quick lookups: the tunnels from each room as a bitmask of the rooms they lead to,
+# and the distances between rooms.
+TUNNELS  = dict((room, bits(rooms)) for room, rooms in cave.items())
+DISTANCE = distances(cave)
+
+
+def tunnel(a, b):
+    """True if a tunnel leads from room a to room b."""
+    return 0 < b <= 20 and TUNNELS[a] & (1 << b) != 0
+
+
 instructions = textwrap.dedent("""
     Welcome to 'Hunt the Wumpus'.
 
@@ -82,25 +130,271 @@ instructions = textwrap.dedent("""
 
 class GameState:
 
-    def __init__(self):
-        rooms = range(1, 21)
-        random.shuffle(rooms)
+    """Where everything is in the cave. copy() is a quick copy for playing on from a state, and snapshot() is the
+    state as a tuple, which restore() writes back over a GameState. Both take well under a microsecond; the
+    hazards never move, so copies share them."""
+    __slots__ = ['wumpus', 'hunter', 'bats', 'pits', 'bat_rooms', 'pit_rooms', 'near_bats', 'near_pits',
+                 'near_wumpus', 'arrows', 'playing', 'won']
+
+    def __init__(self, rng=random):
+        rooms = list(range(1, 21))
+        rng.shuffle(rooms)
         spawn = iter(rooms)
-        self.wumpus = spawn.next()
-        self.hunter = spawn.next()
-        self.bats   = [spawn.next() for _ in range(2)]
-        self.pits   = [spawn.next() for _ in range(2)]
+        wumpus = next(spawn)
+        hunter = next(spawn)
+        bats   = [next(spawn) for _ in range(2)]
+        pits   = [next(spawn) for _ in range(2)]
+        self.place(wumpus, hunter, bats, pits)
         self.arrows  = 5
         self.playing = True
         self.won     = False
 
+    def place(self, wumpus, hunter, bats, pits):
+        """Put the wumpus, the hunter and the hazards in the given rooms."""
+        self.wumpus = wumpus
+        self.hunter = hunter
+        self.bats   = tuple(bats)
+        self.pits   = tuple(pits)
+
+        # The rooms with hazards, and the rooms that are within one tunnel of them and so get a warning, as
+        # bitmasks. Only the wumpus moves, and move_wumpus() keeps its mask up to date.
+        self.bat_rooms   = bits(self.bats)
+        self.pit_rooms   = bits(self.pits)
+        self.near_bats   = TUNNELS[self.bats[0]] | TUNNELS[self.bats[1]]
+        self.near_pits   = TUNNELS[self.pits[0]] | TUNNELS[self.pits[1]]
+        self.near_wumpus = TUNNELS[self.wumpus]
+
+    def copy(self):
+        game = GameState.__new__(GameState)
+        game.restore(self.snapshot())
+        return game
+
+    def snapshot(self):
+        return (self.wumpus, self.hunter, self.bats, self.pits, self.bat_rooms, self.pit_rooms, self.near_bats,
+                self.near_pits, self.near_wumpus, self.arrows, self.playing, self.won)
+
+    def restore(self, snapshot):
+        (self.wumpus, self.hunter, self.bats, self.pits, self.bat_rooms, self.pit_rooms, self.near_bats,
+         self.near_pits, self.near_wumpus, self.arrows, self.playing, self.won) = snapshot
+
+
+# What the hunter can see, smell and feel in their room: the room, the tunnels leading out of it, whether the
+# wumpus, bats or pits are one room away, and the arrows left.
+Observation = collections.namedtuple('Observation', ['room', 'tunnels', 'wumpus', 'bats', 'pits', 'arrows'])
+
+# The hunter's actions: move to a room through a tunnel, or shoot an arrow through a path of 1 to 5 rooms.
+Move  = collections.namedtuple('Move', ['room'])
+Shoot = collections.namedtuple('Shoot', ['rooms'])
+
+
+class InvalidAction(ValueError):
+
+    pass
+
+
+class WumpusEnv:
+
+    """Hunt the wumpus without a terminal, drawing from rng, or its own random number generator (seeded with
+    seed) if none is given.
+
+    step() takes a Move or a Shoot and returns the observation after it, the reward (1 for killing the wumpus,
+    -1 for losing, otherwise 0) and whether the game is over. What happened is in events, as names of MESSAGES.
+
+    snapshot() captures the game and the state of the random number generator, so that after restore() the
+    game plays out exactly as it would have from the snapshot. With a log (anything with a write method, such
+    as an arena eventlog.Writer) each game and action is recorded in it.
+    """
+    def __init__(self, seed=None, rng=None, log=None):
+        self.random = rng if rng is not None else random.Random(seed)
+        self.game   = None
+        self.events = []
+        self.log    = log
+        self._setup = None
+
+    def reset(self, same_setup=False):
+        """Start a new game, or the last game over again from the start if same_setup is True."""
+        if same_setup and self._setup is not None:
+            self.game = self._setup.copy()
+        else:
+            self.game = GameState(self.random)
+            self._setup = self.game.copy()
+        self.events = []
+        if self.log is not None:
+            self.log.write(('wumpus start', self.game.wumpus, self.game.hunter, self.game.bats, self.game.pits))
+        return self.observe()
+
+    def snapshot(self):
+        return self.game.snapshot(), self.random.getstate(), tuple(self.events)
+
+    def restore(self, snapshot):
+        game, rng, events = snapshot
+        self.game = GameState.__new__(GameState)
+        self.game.restore(game)
+        self.random.setstate(rng)
+        self.events = list(events)
+
+    def step(self, action):
+        if not self.game.playing:
+            raise InvalidAction('The game is over.')
+        if type(action) is Move:
+            if not tunnel(self.game.hunter, action.room):
+                raise InvalidAction('Not possible')
+            self.events = move(self.game, action.room, self.random)
+        elif type(action) is Shoot:
+            if not 1 <= len(action.rooms) <= 5:
+                raise InvalidAction('Arrows can go from 1 to 5 rooms')
+            for i, room in enumerate(action.rooms):
+                if crooked(self.game.hunter, action.rooms[:i], room):
+                    raise InvalidAction('Arrows aren\'t that crooked')
+            self.events = shoot(self.game, action.rooms, self.random)
+        else:
+            raise InvalidAction('Shoot or move')
+
+        reward = 0
+        if not self.game.playing:
+            reward = 1 if self.game.won else -1
+        if self.log is not None:
+            rooms = (action.room,) if type(action) is Move else tuple(action.rooms)
+            self.log.write(('wumpus step', 'move' if type(action) is Move else 'shoot', rooms, tuple(self.events),
+                            self.game.hunter, self.game.wumpus, self.game.arrows, reward))
+        return self.observe(), reward, not self.game.playing
+
+    def observe(self):
+        game = self.game
+        here = 1 << game.hunter
+        return Observation(game.hunter, cave[game.hunter], bool(game.near_wumpus & here),
+                           bool(game.near_bats & here), bool(game.near_pits & here), game.arrows)
+
+
+# The decision for the player without a terminal, which is answered with a Move or a Shoot. Its args are the
+# names of what happened after the last action (as env.events), which the terminal shows before asking.
+Question = collections.namedtuple('Question', ['name', 'args'], defaults=[()])
+
+ACTION = Question('action')
+
+
+def play(player, rng=None, actions=1000, log=None):
+    """Hunt the wumpus with no terminal I/O, player answering each Question as it comes up, returning the reward
+    at the end of the game (1 for killing the wumpus, -1 for losing), or 0 if it's still going after the given
+    number of actions.
+
+    player is anything with an answer(observation, question) method, which returns a Move or a Shoot given the
+    Observation after the last action (arena/players.py has some). Raises InvalidAction if the action isn't
+    allowed. rng and log are as for WumpusEnv."""
+    answer = player.answer
+    env = WumpusEnv(rng=rng, log=log)
+    step = env.step
+    observation = env.reset()
+    question = ACTION
+    for _ in range(actions):
+        observation, reward, done = step(answer(observation, question))
+        if done:
+            return reward
+        question = Question('action', tuple(env.events))
+    return 0
+
+
+def move(game, to, rng=random):
+    """Move the hunter to room to (which must be through a tunnel), returning the names of what happened."""
+    events = []
+    game.hunter = to
+    here = 1 << game.hunter
+    if game.bat_rooms & here:
+        events.append('bat_snatch')
+        game.hunter = rng.randrange(1, 21)
+    elif game.pit_rooms & here:
+        events.append('fell_in_pit')
+        game.playing = False
+    elif game.hunter == game.wumpus:
+        events.append('bumped_wumpus')
+        move_wumpus(game, rng)
+        if game.hunter == game.wumpus:
+            events.append('eaten')
+            game.playing = False
+    return events
+
+
+def shoot(game, path, rng=random):
+    """Shoot an arrow along path (which mustn't be crooked), returning the names of what happened."""
+    events = []
+    curr = game.hunter
+    for room in path:
+        if tunnel(curr, room):
+            if room == game.hunter:
+                events.append('shot_self')
+                game.playing = False
+                break
+            elif room == game.wumpus:
+                events.append('shot_wumpus')
+                game.playing = False
+                game.won = True
+                break
+            curr = room
+        else:
+            curr = rng.choice(cave[curr])
+    else:
+        events.append('missed')
+
+    if not game.won:
+        game.arrows -= 1
+        if not game.arrows:
+            game.playing = False
+
+        move_wumpus(game, rng)
+        if game.hunter == game.wumpus:
+            events.append('eaten_after_shot')
+            game.playing = False
+    return events
+
+
+def crooked(hunter, path, room):
+    """True if an arrow can't go on to room after path, because it would double straight back."""
+    return (len(path) == 1 and room == hunter) or (len(path) > 1 and room == path[-2])
+
+
+def move_wumpus(game, rng=random):
+    if rng.random() > 0.25:
+        game.wumpus = rng.choice(cave[game.wumpus])
+        game.near_wumpus = TUNNELS[game.wumpus]
+
+
+MESSAGES = {
+    'bat_snatch':       'Zap -- super bat snatch! Elsewhereville for you!',
+    'fell_in_pit':      'YYYIIIIEEEE... fell in pit',
+    'bumped_wumpus':    '... oops! Bumped a wumpus',
+    'eaten':            'Tsk, tsk, tsk - Wumpus got you!',
+    'shot_self':        'Ouch! Arrow got you!',
+    'shot_wumpus':      'Aha! You got the wumpus!',
+    'missed':           'Missed',
+    'eaten_after_shot': 'Tsk, tsk, tsk - wumpus got you!'}
+
+
+# A line of input for the player to type, after being shown msg.
+Prompt = collections.namedtuple('Prompt', ['msg'])
+
+
+def terminal(conversation):
+    """Hold a conversation with the player at the terminal: it yields each line to show as a string, and a
+    Prompt for each line the player types, which is sent back to it."""
+    line = None
+    while True:
+        try:
+            x = conversation.send(line)
+        except StopIteration:
+            return
+        if type(x) is Prompt:
+            line = input(x.msg)
+        else:
+            print(x)
+            line = None
+
 
 def prompt(msg, keys=None):
     """Prompt the player for char input, optionally restricted to a set of chars."""
     if keys:
         msg += ' ({0})'.format('-'.join(c for c in keys))
     while True:
-        val = raw_input(msg + '? ').lower()
+        val = (yield Prompt(msg + '? ')).lower()
         if val in keys or not keys:
             return val
 
@@ -111,129 +405,83 @@ def prompt_int(msg, rng=None):
         msg += ' ({0}-{1})'.format(*rng)
     while True:
         try:
-            val = int(raw_input(msg + '? '))
+            val = int((yield Prompt(msg + '? ')))
             if (rng and rng[0] <= val <= rng[1]) or not rng:
                 return val
         except ValueError:
             pass
 
 
-def move_wumpus(game):
-    if random.random() > 0.25:
-        game.wumpus = random.choice(cave[game.wumpus])
+def hunt_the_wumpus():
+    terminal(conversation())
 
 
-def hunt_the_wumpus():
-    quitting  = False
-    last_game = None
-    reset     = True
+def conversation(rng=None):
+    """The conversation with the player for as many games as they play (see terminal()), drawing the random
+    numbers from rng (see WumpusEnv)."""
+    quitting = False
+    reset    = True
+    env      = WumpusEnv(rng=rng)
 
-    if prompt('Instructions', 'yn') == 'y':
-        print instructions
+    if (yield from prompt('Instructions', 'yn')) == 'y':
+        yield instructions
 
     while not quitting:
-        if reset:
-            game = GameState()
-            last_game = deepcopy(game)
-        else:
-            game = deepcopy(last_game)
-
-        playing = True
-        won     = False
+        observation = env.reset(same_setup=not reset)
+        done = False
 
-        print
-        print 'Hunt the Wumpus'
-        print
+        yield ''
+        yield 'Hunt the Wumpus'
+        yield ''
 
-        while playing:
-            neighbouring_caves = cave[game.hunter]
-            if game.wumpus in neighbouring_caves:
-                print 'I smell a wumpus!'
-            if any(bat in neighbouring_caves for bat in game.bats):
-                print 'Bats nearby!'
-            if any(pit in neighbouring_caves for pit in game.pits):
-                print 'I feel a draught.'
-            print 'You are in room', game.hunter
-            print 'Tunnels lead to {0}, {1}, {2}'.format(*neighbouring_caves)
+        while not done:
+            if observation.wumpus:
+                yield 'I smell a wumpus!'
+            if observation.bats:
+                yield 'Bats nearby!'
+            if observation.pits:
+                yield 'I feel a draught.'
+            yield 'You are in room {}'.format(observation.room)
+            yield 'Tunnels lead to {0}, {1}, {2}'.format(*observation.tunnels)
 
-            command = prompt('Shoot, Move or Quit', 'smq')
+            command = yield from prompt('Shoot, Move or Quit', 'smq')
 
             if command == 'q':
-                playing = False
                 quitting = True
+                break
 
             if command == 'm':
                 while True:
-                    to = prompt_int('Where to')
-                    if to in neighbouring_caves:
-                        game.hunter = to
+                    to = yield from prompt_int('Where to')
+                    if tunnel(observation.room, to):
                         break
-                    else:
-                        print 'Not possible -'
-
-                if game.hunter in game.bats:
-                    print 'Zap -- super bat snatch! Elsewhereville for you!'
-                    game.hunter = random.randrange(0, 21)
-                elif game.hunter in game.pits:
-                    print 'YYYIIIIEEEE... fell in pit'
-                    playing = False
-                elif game.hunter == game.wumpus:
-                    print '... oops! Bumped a wumpus'
-                    move_wumpus(game)
-                    if game.hunter == game.wumpus:
-                        print 'Tsk, tsk, tsk - Wumpus got you!'
-                        playing = False
-
-                print
-
-            elif command.lower() == 's':
-                n = prompt_int('No. of rooms', [1, 5])
+                    yield 'Not possible -'
+                action = Move(to)
+
+            else:
+                n = yield from prompt_int('No. of rooms', [1, 5])
                 path = []
                 while len(path) < n:
-                    room = prompt_int('Room')
-                    if (len(path) == 1 and room == game.hunter) or (len(path) > 1 and room == path[-2]):
-                        print 'Arrows aren\'t that crooked - try another room'
+                    room = yield from prompt_int('Room')
+                    if crooked(observation.room, path, room):
+                        yield 'Arrows aren\'t that crooked - try another room'
                     else:
                         path.append(room)
+                action = Shoot(path)
 
-                curr = game.hunter
-                for room in path:
-                    if room in cave[curr]:
-                        if room == game.hunter:
-                            print 'Ouch! Arrow got you!'
-                            playing = False
-                            break
-                        elif room == game.wumpus:
-                            print 'Aha! You got the wumpus!'
-                            playing = False
-                            won = True
-                            break
-                        curr = room
-                    else:
-                        curr = random.choice(cave[curr])
-                else:
-                    print 'Missed'
-
-                if not won:
-                    game.arrows -= 1
-                    if not game.arrows:
-                        playing = False
-
-                    move_wumpus(game)
-                    if game.hunter == game.wumpus:
-                        print 'Tsk, tsk, tsk - wumpus got you!'
-                        playing = False
-
-                print
+            observation, reward, done = env.step(action)
+            for event in env.events:
+                yield MESSAGES[event]
+            yield ''
 
         if not quitting:
-            if won:
-                print 'Hee hee hee - the Wumpus\'ll getcha next time!!'
+            if reward > 0:
+                yield 'Hee hee hee - the Wumpus\'ll getcha next time!!'
             else:
-                print 'Ha ha ha - you lose!'
+                yield 'Ha ha ha - you lose!'
 
-            reset = prompt('Same set-up', 'yn') == 'n'
-            print
+            reset = (yield from prompt('Same set-up', 'yn')) == 'n'
+            yield ''
 
 
 if __name__ == '__main__':